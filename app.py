@@ -1,7 +1,6 @@
 """Main Streamlit application for VocalBrand Supreme."""
 from __future__ import annotations
 
-import base64
 import hashlib
 import json
 import logging
@@ -13,11 +12,10 @@ import threading
 import time
 import subprocess
 import platform
-from dataclasses import dataclass, field
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import streamlit as st
 from dotenv import load_dotenv
@@ -182,11 +180,23 @@ except Exception as _auth_err:  # Attempt self-heal (install passlib) then retry
         hash_backend_status = _fail  # type: ignore[assignment]
         init_db = lambda: None  # type: ignore[assignment]
         register_user = _fail  # type: ignore[assignment]
-from engine import DEFAULT_MODEL_ID, DEFAULT_OUTPUT_FORMAT, VocalBrandEngine
+from engine import DEFAULT_CHAR_LIMIT, DEFAULT_MODEL_ID, DEFAULT_OUTPUT_FORMAT, LONGFORM_MIN_CHARS, MODEL_CHAR_LIMITS, VocalBrandEngine
+from metrics import metrics_collector
 from payment import PaymentManager
 from utils.audio_utils import validate_audio_bytes, quality_score
+from utils.audio_analysis import AudioAnalysis, analyze_audio
+from utils.audio_decode import sniff_format
+from utils.analysis_cache import analyze_cached, waveform_peaks
+from utils.sample_store import SampleHandle, get_sample_store
+from utils.memory_governor import get_memory_governor
+from utils.asset_server import AssetServer, LiveAsset, get_asset_server
+from utils.renditions import get_preview_renditions
+from utils.jobs import TERMINAL_STATUSES as JOB_TERMINAL_STATUSES, JobContext, JobError, JobRunner, get_job_runner
+from utils.audio_conditioning import condition_for_clone
 from utils.ffmpeg_auto import attempt_auto_ffmpeg
-from utils.ui import inject_css, inject_mobile_nav_helpers
+from utils.ui import inject_css, inject_mobile_nav_helpers, render_waveform
+from utils.pro_recorder import payload_digest, pro_recorder
+from utils.recorder_bridge import get_recorder_bridge
 from utils.email_utils import send_contact_email, is_email_configured
 from utils.seo import inject_seo_meta
 
@@ -199,8 +209,18 @@ logging.basicConfig(
 logger = logging.getLogger("vocalbrand.app")
 
 FREE_LIMIT = int(os.getenv("VOCALBRAND_FREE_LIMIT", "3"))
-BRIDGE_HISTORY_LIMIT = int(os.getenv("VOCALBRAND_BRIDGE_HISTORY_LIMIT", "25"))
 BRIDGE_QUEUE: "queue.Queue[str]" = queue.Queue()
+# End-to-end budgets so a click never hangs on retries + cleanup (seconds)
+CLONE_DEADLINE_SEC = float(os.getenv("VOCALBRAND_CLONE_DEADLINE_SEC", "120"))
+TTS_DEADLINE_SEC = float(os.getenv("VOCALBRAND_TTS_DEADLINE_SEC", "90"))
+# Job status polling interval while a clone/generation runs in the background (seconds)
+JOB_POLL_SEC = float(os.getenv("VOCALBRAND_JOB_POLL_SEC", "1.0"))
+# Without a reachable asset server, a playable snapshot of a growing MP3 is published this often (seconds)
+TTS_SNAPSHOT_SEC = float(os.getenv("VOCALBRAND_TTS_SNAPSHOT_SEC", "3"))
+# How long a player waits for its preview rendition before falling back to the full file
+PREVIEW_WAIT_SEC = float(os.getenv("VOCALBRAND_PREVIEW_WAIT_MS", "1500")) / 1000.0
+# MIME subtype posted by the Pro Recorder -> decoder format hint
+_PRO_RECORDER_FORMATS = {"mp4": "mp4", "mpg4": "mp4", "m4a": "mp4", "aac": "aac", "mpeg": "mp3", "mp3": "mp3", "ogg": "ogg", "wav": "wav"}
 
 # Ensure recorder components are present on Streamlit Cloud before proceeding.
 try:
@@ -343,29 +363,8 @@ def safe_rerun(delay: float | None = None) -> None:
         logger.debug("rerun swallow", exc_info=True)
 
 
-@dataclass
-class BridgeState:
-    """Recorder bridge state shared between browser component and app."""
-
-    lock: threading.Lock = field(default_factory=threading.Lock)
-    latest: Dict[str, Any] = field(default_factory=dict)
-    history: List[Dict[str, Any]] = field(default_factory=list)
-    hits: int = 0
-
-    def push(self, payload: Dict[str, Any]) -> None:
-        with self.lock:
-            self.latest = payload
-            self.history.append(payload)
-            if len(self.history) > BRIDGE_HISTORY_LIMIT:
-                self.history.pop(0)
-            self.hits += 1
-
-    def snapshot(self) -> Dict[str, Any]:
-        with self.lock:
-            return dict(self.latest)
-
-
-BRIDGE_STATE = BridgeState()
+# Process-wide (survives reruns): ingest history and in-progress streamed takes
+BRIDGE_STATE = get_recorder_bridge()
 
 
 def _resolve_binary(name: str, env_key: str | None = None) -> Optional[str]:
@@ -500,6 +499,9 @@ else:
 engine = VocalBrandEngine(ELEVENLABS_KEY, voice_manager=voice_manager)
 if engine.offline:
     logger.warning("Engine operating in offline mode (%s)", engine.offline_reason)
+elif os.getenv("VOCALBRAND_HTTP_PREWARM", "0") == "1":
+    # Open a pooled keep-alive connection so the first clone/TTS skips DNS + TLS
+    engine.transport.prewarm()
 
 STRIPE_KEY = get_secret("STRIPE_API_KEY", os.getenv("STRIPE_API_KEY", "")) or ""
 STRIPE_PRICE_ID = get_secret("STRIPE_PRICE_ID")
@@ -541,7 +543,7 @@ SESSION_DEFAULTS: Dict[str, Any] = {
     "clone_timestamp": "",
     "clone_history": [],
     "tts_history": [],
-    "pending_audio_bytes": b"",
+    "pending_sample": None,  # SampleHandle of the spooled sample (bytes live on disk, not in session)
     "pending_audio_label": "",
     "pending_audio_meta": {},
     "latest_checkout_id": None,
@@ -550,6 +552,29 @@ SESSION_DEFAULTS: Dict[str, Any] = {
     "trim_silence_toggle": False,  # If enabled, trim leading/trailing silence before cloning
     "auto_clone_toggle": False,  # If enabled, auto-clone immediately after recording lock-in
     "last_auto_clone_hash": "",  # To avoid double auto-clone on reruns
+    "library_loaded_for": None,  # user_id whose DB voice library/history is in session
+    "tts_history_cursor": None,  # keyset cursor (before_id) for browsing older generations
+    "clone_job_id": None,  # background clone job being polled
+    "tts_job_id": None,  # background generation job being polled
+    "last_tts_result": None,  # result of the latest generation job (clip digest, mime, download name)
+    "tts_stream": None,  # live player of the latest generation ({"token", "url"}) when the asset server is reachable
+    "tts_snapshot": None,  # partial-audio snapshot ({"digest", "mime", "bytes"}) shown otherwise while generating
+}
+
+# Session keys measured by the memory governor, with what it may do to idle values
+# over budget. Samples are already spooled (handles) and history is metadata only;
+# the heavy values are recorder/uploader widget payloads, which are ingested into
+# the sample store in the run they arrive, so they are evicted once idle.
+MEMORY_POLICIES: Dict[str, str] = {
+    "pending_sample": "keep",
+    "pro_recorder_audio_preview": "keep",
+    "pending_audio_meta": "keep",
+    "clone_history": "keep",
+    "tts_history": "keep",
+    "pro_recorder": "evict",
+    "mr_fallback": "evict",
+    "native_recorder_component": "evict",
+    "clone_file_upload": "evict",
 }
 
 
@@ -579,6 +604,30 @@ def ensure_session_defaults() -> None:
             st.session_state[key] = default.copy() if isinstance(default, (list, dict)) else default
 
 
+def _session_is_alive(session_id: str) -> bool:
+    """Whether the Streamlit runtime still has this session (closed tabs are forgotten)."""
+    try:
+        from streamlit.runtime import Runtime
+        return not Runtime.exists() or Runtime.instance().is_active_session(session_id)
+    except Exception:  # noqa: BLE001 - runtime API moved between Streamlit versions
+        return True
+
+
+def govern_session_memory() -> None:
+    """Account this session's heavy keys and enforce the memory budgets."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:  # noqa: BLE001 - runtime API moved between Streamlit versions
+        return
+    if ctx is None:
+        return
+    try:
+        get_memory_governor(MEMORY_POLICIES, _session_is_alive).observe(ctx.session_id, ctx.session_state)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Memory governor failed: %s", e)
+
+
 def ensure_voice_reset_on_logout() -> None:
     if st.session_state.get("user_id"):
         return
@@ -588,9 +637,41 @@ def ensure_voice_reset_on_logout() -> None:
     st.session_state["clone_timestamp"] = ""
     st.session_state["clone_history"] = []
     st.session_state["tts_history"] = []
-    st.session_state["pending_audio_bytes"] = b""
+    st.session_state["pending_sample"] = None
     st.session_state["pending_audio_label"] = ""
     st.session_state["pending_audio_meta"] = {}
+    st.session_state["library_loaded_for"] = None
+    st.session_state["tts_history_cursor"] = None
+    st.session_state["clone_job_id"] = None
+    st.session_state["tts_job_id"] = None
+    st.session_state["last_tts_result"] = None
+    st.session_state["tts_stream"] = None
+    st.session_state["tts_snapshot"] = None
+
+
+def ensure_user_library_loaded() -> None:
+    """Restore a returning user's voices and recent generations from the DB (once per login)."""
+    user_id = st.session_state.get("user_id")
+    if not user_id or st.session_state.get("library_loaded_for") == user_id:
+        return
+    st.session_state["library_loaded_for"] = user_id
+    try:
+        from auth import list_tts_generations, list_user_voices
+        voices, _ = list_user_voices(user_id, limit=15)
+        generations, _ = list_tts_generations(user_id, limit=25)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Voice library load failed: %s", e)
+        return
+    # Session lists are oldest-first; pages come back newest-first
+    st.session_state["clone_history"] = voices[::-1]
+    st.session_state["tts_history"] = generations[::-1]
+    _restore_user_jobs(user_id)
+    if voices and not st.session_state.get("clone_voice_id"):
+        latest = voices[0]
+        st.session_state["clone_voice_id"] = latest["voice_id"]
+        st.session_state["clone_voice_label"] = latest.get("label") or ""
+        st.session_state["clone_status"] = "Restored from your voice library"
+        st.session_state["clone_timestamp"] = latest.get("at", "")
 
 
 def logout() -> None:
@@ -611,20 +692,39 @@ def format_timestamp(ts: str) -> str:
         return ts
 
 
-def _ingest_audio_bytes(raw_bytes: bytes, *, source: str, filename: str | None = None) -> Dict[str, Any]:
-    validation = validate_audio_bytes(raw_bytes)
-    digest = hashlib.sha1(raw_bytes).hexdigest()[:12]
+def _ingest_audio_bytes(
+    raw: Any,
+    *,
+    source: str,
+    filename: str | None = None,
+    analysis: Optional[AudioAnalysis] = None,
+) -> Dict[str, Any]:
+    """Spool ``raw`` (bytes or a file object) to the sample store and make it the pending sample.
+
+    Only the ``SampleHandle`` is kept in session state; analysis reads the
+    spooled file through an mmap view and is cached by digest.
+    """
+    sample = get_sample_store().put(raw)
+    view = sample.view()
+    entry = None
+    try:
+        entry = analyze_cached(view, digest=sample.digest, analysis=analysis)
+    except Exception as e:  # noqa: BLE001
+        logger.info("Audio decode failed at ingest: %s", e)
+    validation = entry.validation(view) if entry is not None else validate_audio_bytes(view)
+    digest = sample.digest[:12]
     quality = quality_score(validation["duration"], validation["loudness_dbfs"]) if validation["ok"] else None
     meta = {
         "source": source,
         "filename": filename or f"{source}_{digest}.wav",
         "hash": digest,
+        "digest": sample.digest,
         "ingested_at": datetime.utcnow().isoformat(),
         "quality": quality,
     }
     meta.update({k: v for k, v in validation.items() if k != "raw_bytes"})
     BRIDGE_STATE.push(meta)
-    st.session_state["pending_audio_bytes"] = raw_bytes
+    st.session_state["pending_sample"] = sample
     st.session_state["pending_audio_label"] = meta["filename"]
     st.session_state["pending_audio_meta"] = meta
     st.session_state["recording_locked_in"] = True
@@ -632,7 +732,7 @@ def _ingest_audio_bytes(raw_bytes: bytes, *, source: str, filename: str | None =
         "Ingested audio | source=%s hash=%s size=%sB ok=%s duration=%.2fs loudness=%s",
         source,
         digest,
-        len(raw_bytes),
+        sample.size,
         meta.get("ok"),
         meta.get("duration", 0.0),
         meta.get("loudness_dbfs"),
@@ -640,42 +740,137 @@ def _ingest_audio_bytes(raw_bytes: bytes, *, source: str, filename: str | None =
     return meta
 
 
-def _maybe_trim_silence(raw_bytes: bytes) -> Tuple[bytes, Optional[Dict[str, Any]]]:
-    """Optionally trim leading/trailing silence based on user toggle.
+def _pending_sample() -> Optional[SampleHandle]:
+    """The session's spooled sample, if its file is still present (resets its TTL)."""
+    sample = st.session_state.get("pending_sample")
+    if sample is None:
+        return None
+    if not sample.exists():
+        st.session_state["pending_sample"] = None
+        return None
+    get_sample_store().touch(sample.digest)
+    return sample
+
+
+def _sample_analysis(sample: SampleHandle) -> Optional[AudioAnalysis]:
+    try:
+        return analyze_cached(sample.view(), digest=sample.digest).analysis
+    except Exception as e:  # noqa: BLE001
+        logger.info("Audio decode failed: %s", e)
+        return None
+
+
+def _maybe_trim_silence(sample: SampleHandle, trim: bool) -> Tuple[SampleHandle, Optional[Dict[str, Any]], Optional[AudioAnalysis]]:
+    """Optionally trim leading/trailing silence (the user's toggle, passed as ``trim``).
 
-    Returns (bytes, info_dict|None). If no trimming applied, returns original bytes and None.
+    Returns (sample, info_dict|None, analysis). If no trimming applied, returns
+    the original sample, None and its analysis. Trimming slices the
+    already-decoded PCM and spools the result as a new sample; the returned
+    analysis describes the returned sample.
     """
-    if not st.session_state.get("trim_silence_toggle"):
-        return raw_bytes, None
+    if not trim:
+        return sample, None, _sample_analysis(sample)
+    analysis = None
     try:
-        from pydub import AudioSegment  # type: ignore
-        from pydub.silence import detect_nonsilent  # type: ignore
-        seg = AudioSegment.from_file(BytesIO(raw_bytes))
-        dur_ms = len(seg)
+        entry = analyze_cached(sample.view(), digest=sample.digest)
+        analysis = entry.analysis
+        dur_ms = int(round(analysis.duration * 1000))
         # Conservative silence threshold and window
         # Users in noisy rooms: raise threshold (less negative)
         thresh = -40  # dBFS
         window = 20  # ms
-        non_silent = detect_nonsilent(seg, min_silence_len=window, silence_thresh=thresh)
-        if not non_silent:
-            return raw_bytes, {"applied": False, "reason": "all_silent"}
-        start = max(0, non_silent[0][0] - 20)
-        end = min(dur_ms, non_silent[-1][1] + 20)
+        bounds = entry.silence_bounds(thresh_dbfs=thresh, window_ms=window, pad_ms=20)
+        if bounds is None:
+            return sample, {"applied": False, "reason": "all_silent"}, analysis
+        start, end = bounds
         if end <= start:
-            return raw_bytes, {"applied": False, "reason": "invalid_bounds"}
-        trimmed = seg[start:end]
-        out = BytesIO()
-        trimmed.export(out, format="wav")
-        return out.getvalue(), {
+            return sample, {"applied": False, "reason": "invalid_bounds"}, analysis
+        trimmed = analysis.trim(start, end)
+        trimmed_ms = int(round(trimmed.duration * 1000))
+        trimmed_sample = get_sample_store().put(trimmed.to_wav())
+        return trimmed_sample, {
             "applied": True,
             "orig_ms": dur_ms,
-            "trimmed_ms": len(trimmed),
-            "removed_ms": max(0, dur_ms - len(trimmed)),
+            "trimmed_ms": trimmed_ms,
+            "removed_ms": max(0, dur_ms - trimmed_ms),
             "threshold_dbfs": thresh,
-        }
+        }, trimmed
     except Exception as e:  # noqa: BLE001
         logger.warning("Silence trim failed: %s", e)
-        return raw_bytes, {"applied": False, "reason": str(e)}
+        return sample, {"applied": False, "reason": str(e)}, analysis
+
+
+def _clone_or_reuse(
+    sample: SampleHandle,
+    voice_label: str,
+    filename: str,
+    analysis: Optional[AudioAnalysis] = None,
+    *,
+    engine: VocalBrandEngine,
+    user_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Clone ``sample`` with ``engine`` unless this user already cloned the identical sample.
+
+    The registry maps (user_id, sha256 of the uploaded bytes) to a voice_id. A
+    hit is only reused after a cheap upstream check that the voice still
+    exists; a voice reported gone is forgotten and the sample is re-cloned.
+    """
+    view = sample.view()
+    digest = hashlib.sha256(view).hexdigest()
+    registry = None
+    if user_id:
+        try:
+            import auth as registry  # type: ignore[no-redef]
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Clone registry unavailable: %s", e)
+    if registry is not None and engine.voice_manager is not None and not engine.offline:
+        try:
+            existing = registry.find_cloned_voice(user_id, digest)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Clone registry lookup failed: %s", e)
+            existing = None
+        if existing:
+            exists = engine.voice_manager.voice_exists(existing["voice_id"], deadline=10)
+            if exists:
+                metrics_collector.incr("clone_registry_hit")
+                try:
+                    registry.touch_cloned_voice(user_id, digest)
+                except Exception:  # noqa: BLE001
+                    pass
+                return {
+                    "success": True,
+                    "voice_id": existing["voice_id"],
+                    "provider": "registry_reuse",
+                    "message": f"This sample was already cloned as '{existing.get('voice_label') or voice_label}' — reusing that voice.",
+                    "reused": True,
+                }
+            if exists is False:
+                metrics_collector.incr("clone_registry_stale")
+                try:
+                    registry.forget_cloned_voice(existing["voice_id"])
+                    registry.remove_user_voice(user_id, existing["voice_id"])
+                except Exception:  # noqa: BLE001
+                    pass
+
+    # Mono / resampled / normalized / compressed: upload time dominates clone latency
+    conditioned = condition_for_clone(view, filename=filename, analysis=analysis)
+    if conditioned.info.get("applied"):
+        buf = BytesIO(conditioned.data)
+        buf.name = conditioned.filename
+        result = engine.clone_voice(buf, voice_label, deadline=CLONE_DEADLINE_SEC)
+    else:
+        # Original sample: upload straight from the spooled file
+        with sample.open(name=filename) as fh:
+            result = engine.clone_voice(fh, voice_label, deadline=CLONE_DEADLINE_SEC)
+    result["conditioning"] = conditioned.info
+    if registry is not None and result.get("success") and result.get("voice_id"):
+        metrics_collector.incr("clone_registry_miss")
+        try:
+            registry.record_cloned_voice(user_id, digest, result["voice_id"], voice_label, result.get("provider"))
+            registry.save_user_voice(user_id, result["voice_id"], voice_label, result.get("provider"))
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Clone registry write failed: %s", e)
+    return result
 
 
 def render_file_upload_fallback() -> None:
@@ -685,12 +880,19 @@ def render_file_upload_fallback() -> None:
     )
     if not uploaded:
         return
-    raw_bytes = uploaded.read()
-    if not raw_bytes:
+    if not uploaded.size:
         st.warning("Uploaded file appears empty.")
         return
-    meta = _ingest_audio_bytes(raw_bytes, source="upload", filename=uploaded.name)
-    _render_audio_feedback(meta, raw_bytes)
+    head = uploaded.read(16)
+    uploaded.seek(0)
+    # Streamed into the sample store; no extra copy of the upload is kept in session
+    if sniff_format(head) == "wav":
+        meta = _ingest_audio_bytes(uploaded, source="upload", filename=uploaded.name)
+    else:
+        # Compressed: decoded by the shared ffmpeg pool (reruns join the same job)
+        with st.spinner("Decoding audio…"):
+            meta = _ingest_audio_bytes(uploaded, source="upload", filename=uploaded.name)
+    _render_audio_feedback(meta, st.session_state["pending_sample"])
 
 
 def render_audio_capture_area() -> None:
@@ -715,607 +917,76 @@ def render_audio_capture_area() -> None:
             % (RECORDER_MSG or "component missing"),
             icon="ℹ️",
         )
-        # Fallback with direct base64 injection + live loudness/duration estimation
-        fallback_id = "fallback_recorder"
-        js_template = """
-<div id="__FALLBACK_ID__"></div>
-<script>
-(function(){
-    const rootId = "__FALLBACK_ID__";
-        function init(){
-        const container = document.getElementById(rootId);
-        if (!container) { setTimeout(init, 50); return; }
-        if (container.dataset.vbInit === '1') return;
-        container.dataset.vbInit = '1';
-        container.innerHTML = `
-            <style>
-              /* Scope styles to this component only - SUPREME LIGHT THEME */
-              #${rootId} .vbrec-toolbar { display:flex; gap:0.75rem; align-items:center; flex-wrap:wrap; justify-content:center; margin-bottom:1rem; }
-              #${rootId} .vbrec-btn { 
-                padding:0.75rem 1.5rem; 
-                border:none; 
-                border-radius:10px; 
-                font-weight:600; 
-                cursor:pointer; 
-                transition:all 0.3s ease;
-                min-width:140px;
-                font-size:1rem;
-                box-shadow:0 4px 6px rgba(0,0,0,0.1);
-                display:inline-flex;
-                align-items:center;
-                justify-content:center;
-                gap:0.5rem;
-              }
-              #${rootId} .vbrec-btn--start { 
-                background: linear-gradient(135deg,#1a365d 0%, #2d3748 100%); 
-                color:#ffffff; 
-              }
-              #${rootId} .vbrec-btn--start:hover:not(:disabled) { 
-                background: linear-gradient(135deg,#2d3748 0%, #1a365d 100%); 
-                transform:translateY(-2px);
-                box-shadow:0 8px 12px rgba(0,0,0,0.15);
-              }
-              #${rootId} .vbrec-btn--stop { 
-                background:linear-gradient(135deg,#ef4444 0%, #dc2626 100%); 
-                color:#ffffff;
-                box-shadow:0 4px 6px rgba(239,68,68,0.2);
-              }
-              #${rootId} .vbrec-btn--stop:hover:not(:disabled) {
-                background:linear-gradient(135deg,#dc2626 0%, #ef4444 100%);
-                transform:translateY(-2px);
-                box-shadow:0 8px 12px rgba(239,68,68,0.3);
-              }
-              #${rootId} .vbrec-btn:disabled { opacity:0.6; cursor:not-allowed; transform:none; }
-              #${rootId} #vb_status { 
-                font-size:0.95rem; 
-                color:#0f172a; 
-                font-weight:600;
-                padding:0.5rem 1rem;
-                background:#f8fafc;
-                border-radius:8px;
-              }
-              #${rootId} #vb_level { 
-                font-size:0.95rem; 
-                color:#0f172a; 
-                font-weight:600;
-                padding:0.5rem 1rem;
-                background:#f8fafc;
-                border-radius:8px;
-              }
-              #${rootId} #vb_canvas { 
-                margin-top:1rem; 
-                width:100%; 
-                height:64px; 
-                background:#e2e8f0; 
-                border:2px solid #cbd5e1;
-                border-radius:8px; 
-                box-shadow:inset 0 2px 4px rgba(0,0,0,0.05);
-              }
-              #${rootId} #vb_download_wrap { 
-                margin-top:1rem; 
-                text-align:center; 
-              }
-              #${rootId} #vb_download_wrap a { 
-                display:inline-flex;
-                align-items:center;
-                gap:0.5rem;
-                background:#e2e8f0;
-                color:#1a365d; 
-                padding:0.75rem 1.5rem;
-                border-radius:10px;
-                text-decoration:none;
-                font-weight:600; 
-                border:2px solid #94a3b8;
-                transition:all 0.3s ease;
-                box-shadow:0 2px 6px rgba(0,0,0,0.05);
-              }
-              #${rootId} #vb_download_wrap a:hover {
-                background:#cbd5e1;
-                border-color:#1a365d;
-                transform:translateY(-2px);
-                box-shadow:0 4px 12px rgba(0,0,0,0.1);
-              }
-            </style>
-            <div class="vbrec-toolbar">
-                <button id="vb_start" class="vbrec-btn vbrec-btn--start">🎙️ Start</button>
-                <button id="vb_stop" class="vbrec-btn vbrec-btn--stop" disabled>⏹️ Stop</button>
-                <span id="vb_status">Idle</span>
-                <span id="vb_level">Level: -- dB | 0.0s</span>
-            </div>
-            <canvas id="vb_canvas" width="600" height="64"></canvas>
-                        <audio id="vb_play" controls style="margin-top:1rem;width:100%;display:none;background:#ffffff;border:1px solid #e2e8f0;border-radius:8px;padding:0.5rem;"></audio>
-                        <div id="vb_download_wrap" style="display:none;display:flex;gap:.5rem;align-items:center;justify-content:center;flex-wrap:wrap;margin-top:0.75rem;margin-bottom:0.75rem;">
-                            <a id="vb_download" download="vocalbrand_recording.webm">⬇️ Download recording</a>
-                            <button id="vb_use_btn" class="vbrec-btn vbrec-btn--start" style="min-width:180px;">✅ Use recording</button>
-                        </div>
-        `;
-        const statusEl = container.querySelector('#vb_status');
-        const levelEl = container.querySelector('#vb_level');
-        const startBtn = container.querySelector('#vb_start');
-        const stopBtn = container.querySelector('#vb_stop');
-        const audioEl = container.querySelector('#vb_play');
-        const canvas = container.querySelector('#vb_canvas');
-        const ctx = canvas.getContext('2d');
-        const STREAMLIT = window.Streamlit || null;
-        let mediaRecorder, chunks = [], analyser, dataArray, rafId, startedAt = 0;
-        const STORAGE_KEY = 'vb_pro_payload_v1';
-        let pendingPayload = null; // {b64, mime, size, filename, ext}
-        let currentObjectUrl = null;
-        let autoSendScheduled = false;
-        let sending = false;
-
-        function log(m){ statusEl.textContent = m; }
-        function postHeight(){
-            if (STREAMLIT && STREAMLIT.setFrameHeight) {
-                try { STREAMLIT.setFrameHeight(document.body.scrollHeight); } catch(_e) {}
-            } else {
-                try { window.parent.postMessage({isStreamlitMessage:true, type:'streamlit:setFrameHeight', height: document.body.scrollHeight }, '*'); } catch(_e) {}
-            }
-        }
-        function postReady(){
-            if (STREAMLIT && STREAMLIT.setComponentReady) {
-                try { STREAMLIT.setComponentReady(); } catch(_e) {}
-            } else {
-                try { window.parent.postMessage({isStreamlitMessage:true, type:'streamlit:componentReady'}, '*'); } catch(_e) {}
-            }
-        }
-        function postValue(val){
-            if (STREAMLIT && STREAMLIT.setComponentValue) {
-                try { STREAMLIT.setComponentValue(val); } catch(_e) {}
-            } else {
-                try { window.parent.postMessage({isStreamlitMessage:true, type:'streamlit:setComponentValue', value: val}, '*'); } catch(_e) {}
-            }
-        }
-
-        function computeExt(mime){
-            const m = (mime || '').toLowerCase();
-            if (m.includes('wav')) return 'wav';
-            if (m.includes('mp4') || m.includes('mpg4') || m.includes('m4a')) return 'mp4';
-            if (m.includes('aac')) return 'aac';
-            if (m.includes('mpeg') || m.includes('mp3')) return 'mp3';
-            if (m.includes('ogg')) return 'ogg';
-            return 'webm';
-        }
-
-        function savePayload(payload){
-            try { sessionStorage.setItem(STORAGE_KEY, JSON.stringify(payload)); } catch(_e){}
-        }
-
-        function loadPayload(){
-            try {
-                const raw = sessionStorage.getItem(STORAGE_KEY);
-                if (!raw) return null;
-                const parsed = JSON.parse(raw);
-                if (parsed && parsed.b64) return parsed;
-            } catch(_e){}
-            return null;
-        }
-
-        function revokeUrl(){
-            if (currentObjectUrl) {
-                try { URL.revokeObjectURL(currentObjectUrl); } catch(_e){}
-                currentObjectUrl = null;
-            }
-        }
-
-        function showPayload(payload){
-            if (!payload || !payload.b64) return;
-            try {
-                const bin = atob(payload.b64);
-                const len = bin.length;
-                const bytes = new Uint8Array(len);
-                for (let i = 0; i < len; i++) bytes[i] = bin.charCodeAt(i);
-                const blob = new Blob([bytes], {type: payload.mime || 'audio/webm'});
-                revokeUrl();
-                const url = URL.createObjectURL(blob);
-                currentObjectUrl = url;
-                audioEl.src = url;
-                audioEl.style.display = 'block';
-                const dw = container.querySelector('#vb_download_wrap');
-                const dl = container.querySelector('#vb_download');
-                if (dw && dl) {
-                    dw.style.display = 'flex';
-                    const ext = payload.ext || computeExt(payload.mime || '');
-                    const fname = payload.filename || `vocalbrand-recording.${ext}`;
-                    dl.href = url;
-                    dl.download = fname;
-                }
-                const kb = payload.size ? (payload.size / 1024) : (len / 1024);
-                statusEl.textContent = 'Captured ' + kb.toFixed(1) + ' kB';
-            } catch(err) {
-                console.warn('[VB] Failed to render payload', err);
-            }
-        }
-
-        function applyPayload(payload, opts = {}){
-            if (!payload || !payload.b64) return;
-            const ext = payload.ext || computeExt(payload.mime || '');
-            const filename = payload.filename || `vocalbrand-recording.${ext}`;
-            pendingPayload = {
-                b64: payload.b64,
-                mime: payload.mime || 'audio/webm',
-                size: payload.size || 0,
-                ext,
-                filename,
-            };
-            autoSendScheduled = false;
-            sending = false;
-            showPayload(pendingPayload);
-            savePayload(pendingPayload);
-            postHeight();
-            scheduleAutoSend(opts.forceRetry === true);
-        }
-
-        function scheduleAutoSend(force){
-            if (!pendingPayload) return;
-            if (autoSendScheduled && !force) return;
-            autoSendScheduled = true;
-            let attempts = 0;
-            const attempt = ()=>{
-                if (!pendingPayload) return;
-                attempts += 1;
-                sendPayload('auto');
-                if (attempts < 5 && pendingPayload) {
-                    setTimeout(attempt, 1200);
-                } else {
-                    autoSendScheduled = false;
-                }
-            };
-            setTimeout(attempt, force ? 100 : 450);
-        }
-
-        function sendPayload(origin){
-            if (!pendingPayload || sending) return;
-            sending = true;
-            try {
-                const ta = window.parent.document && window.parent.document.getElementById('pro_recorder_payload');
-                if (ta) {
-                    ta.value = 'data:' + (pendingPayload.mime || 'audio/webm') + ';base64,' + pendingPayload.b64;
-                    ta.dispatchEvent(new Event('input',{bubbles:true}));
-                }
-            } catch(_e) {}
-            try { postValue({b64: pendingPayload.b64, size: pendingPayload.size || 0, mime: pendingPayload.mime || 'audio/webm'}); } catch(_e) {}
-            pendingPayload.lastSent = Date.now();
-            savePayload(pendingPayload);
-            setTimeout(()=>{ sending = false; }, 1200);
-            log(origin === 'manual' ? 'Locking in recording...' : 'Locking in recording (auto)...');
-        }
-        function meter(){
-            if(!analyser) return;
-            analyser.getByteTimeDomainData(dataArray);
-            let peak=0; for(let i=0;i<dataArray.length;i++){ const v=(dataArray[i]-128)/128; const a=Math.abs(v); if(a>peak) peak=a; }
-            const db = (peak>0)? (20*Math.log10(peak)).toFixed(1) : '-inf';
-            const elapsed = ((performance.now()-startedAt)/1000).toFixed(1);
-            levelEl.textContent = `Level: ${db} dB | ${elapsed}s`;
-            // Draw waveform
-            const W = canvas.width, H = canvas.height;
-            ctx.fillStyle = '#e2e8f0'; ctx.fillRect(0,0,W,H);
-            ctx.strokeStyle = '#1a365d'; ctx.lineWidth = 2; ctx.beginPath();
-            for(let x=0; x<W; x++){
-                const i = Math.floor(x / W * dataArray.length);
-                const v = (dataArray[i]-128)/128;
-                const y = H/2 - v * (H/2 - 4);
-                if(x===0) ctx.moveTo(x, y); else ctx.lineTo(x, y);
-            }
-            ctx.stroke();
-            rafId = requestAnimationFrame(meter);
-        }
-        // Helper: encode an AudioBuffer to 16-bit PCM WAV (little-endian)
-        function encodeWAV(audioBuffer){
-            const numChannels = audioBuffer.numberOfChannels;
-            const sampleRate = audioBuffer.sampleRate;
-            const length = audioBuffer.length;
-            const bytesPerSample = 2; // 16-bit PCM
-            const blockAlign = numChannels * bytesPerSample;
-            const dataSize = length * blockAlign;
-            const buffer = new ArrayBuffer(44 + dataSize);
-            const view = new DataView(buffer);
-
-            function writeString(view, offset, string){
-                for (let i = 0; i < string.length; i++) {
-                    view.setUint8(offset + i, string.charCodeAt(i));
-                }
-            }
-
-            let offset = 0;
-            writeString(view, offset, 'RIFF'); offset += 4;
-            view.setUint32(offset, 36 + dataSize, true); offset += 4; // ChunkSize
-            writeString(view, offset, 'WAVE'); offset += 4;
-            // fmt chunk
-            writeString(view, offset, 'fmt '); offset += 4;
-            view.setUint32(offset, 16, true); offset += 4; // Subchunk1Size (16 for PCM)
-            view.setUint16(offset, 1, true); offset += 2;  // AudioFormat (1 = PCM)
-            view.setUint16(offset, numChannels, true); offset += 2;
-            view.setUint32(offset, sampleRate, true); offset += 4;
-            view.setUint32(offset, sampleRate * blockAlign, true); offset += 4; // ByteRate
-            view.setUint16(offset, blockAlign, true); offset += 2; // BlockAlign
-            view.setUint16(offset, bytesPerSample * 8, true); offset += 2; // BitsPerSample
-            // data chunk
-            writeString(view, offset, 'data'); offset += 4;
-            view.setUint32(offset, dataSize, true); offset += 4;
-
-            // Interleave channels
-            const channels = [];
-            for (let c = 0; c < numChannels; c++) {
-                channels.push(audioBuffer.getChannelData(c));
-            }
-            let pos = 44;
-            for (let i = 0; i < length; i++) {
-                for (let c = 0; c < numChannels; c++) {
-                    let sample = channels[c][i];
-                    // clamp
-                    sample = Math.max(-1, Math.min(1, sample));
-                    // scale to 16-bit signed int
-                    view.setInt16(pos, sample < 0 ? sample * 0x8000 : sample * 0x7FFF, true);
-                    pos += 2;
-                }
-            }
-            return buffer;
-        }
-
-        startBtn.onclick = async ()=>{
-            try{
-                const stream = await navigator.mediaDevices.getUserMedia({audio:true});
-                const actx = new (window.AudioContext||window.webkitAudioContext)();
-                const src = actx.createMediaStreamSource(stream);
-                analyser = actx.createAnalyser(); analyser.fftSize=1024;
-                dataArray = new Uint8Array(analyser.fftSize);
-                src.connect(analyser);
-                // Initialize MediaRecorder and capture chunks (PRO RECORDER — LIGHT THEME)
-                chunks = [];
-                // Pick a widely-supported MIME, preferring webm+opus but falling back to mp4/aac for iOS Safari
-                const mimeCandidates = [
-                    'audio/webm;codecs=opus',
-                    'audio/webm',
-                    'audio/mp4;codecs=mp4a.40.2',
-                    'audio/mp4',
-                    'audio/aac',
-                    'audio/mpeg',
-                    'audio/ogg',
-                    'audio/wav'
-                ];
-                let chosenMime = '';
-                try {
-                    const isSup = (m) => { try { return !!(window.MediaRecorder && MediaRecorder.isTypeSupported && MediaRecorder.isTypeSupported(m)); } catch(e){ return false; } };
-                    chosenMime = mimeCandidates.find(isSup) || '';
-                } catch(e) { chosenMime = ''; }
-                try {
-                    mediaRecorder = chosenMime ? new MediaRecorder(stream, { mimeType: chosenMime }) : new MediaRecorder(stream);
-                } catch(e) {
-                    // Fallback without mimeType if browser rejects the option
-                    mediaRecorder = new MediaRecorder(stream);
-                }
-                mediaRecorder.ondataavailable = (ev)=>{ if (ev.data && ev.data.size) { chunks.push(ev.data); } };
-                mediaRecorder.onstop = async ()=>{
-                    cancelAnimationFrame(rafId);
-                    // Prefer the recorder-reported type if present
-                    const effectiveMime = (mediaRecorder && mediaRecorder.mimeType) ? mediaRecorder.mimeType : (chosenMime || 'audio/webm');
-                    const blob = new Blob(chunks,{type: effectiveMime});
-                    const ab = await blob.arrayBuffer();
-                    // Try to decode in-browser and re-encode to WAV for maximum compatibility
-                    let wavBuffer = null;
-                    try {
-                        const ac = new (window.AudioContext||window.webkitAudioContext)();
-                        const decoded = await ac.decodeAudioData(ab.slice(0));
-                        wavBuffer = encodeWAV(decoded);
-                    } catch(e) {
-                        wavBuffer = null;
-                    }
-                    if (wavBuffer) {
-                        const wbytes = new Uint8Array(wavBuffer);
-                        let wbin=''; for(let i=0;i<wbytes.length;i++) wbin += String.fromCharCode(wbytes[i]);
-                        const wb64 = btoa(wbin);
-                        applyPayload({
-                            b64: wb64,
-                            mime: 'audio/wav',
-                            size: wbytes.length,
-                            filename: 'vocalbrand-recording.wav',
-                            ext: 'wav',
-                            sent: false,
-                        });
-                    } else {
-                        // Fallback to original blob path
-                        const bytes = new Uint8Array(ab);
-                        let binary=''; for(let i=0;i<bytes.length;i++) binary += String.fromCharCode(bytes[i]);
-                        const b64 = btoa(binary);
-                        applyPayload({
-                            b64,
-                            mime: effectiveMime,
-                            size: bytes.length,
-                            sent: false,
-                        });
-                    }
-                };
-                mediaRecorder.start(); startedAt = performance.now(); log('Recording...');
-                startBtn.disabled=true; stopBtn.disabled=false; meter();
-            }catch(err){ log('Error: '+err.message); }
-        };
-        stopBtn.onclick=()=>{ if(mediaRecorder && mediaRecorder.state!=='inactive') mediaRecorder.stop(); startBtn.disabled=false; stopBtn.disabled=true; log('Processing...'); };
-
-        // When user explicitly confirms, send payload to Streamlit and trigger rerun
-        container.addEventListener('click', (e)=>{
-            const t = e.target && e.target.closest ? e.target.closest('#vb_use_btn') : null;
-            if (!t) return;
-            if (!pendingPayload || !pendingPayload.b64) { log('No recording to use yet.'); return; }
-            sendPayload('manual');
-        }, {capture:true});
-        postReady(); postHeight();
-        window.addEventListener('message', (event)=>{
-            try {
-                if (!event || !event.data) return;
-                if (event.origin && event.origin !== window.location.origin) return;
-                const data = event.data;
-                if (typeof data !== 'object' || data === null) return;
-                if (data.source === 'vocalbrand' && data.type === 'VB_PRO_INGESTED') {
-                    pendingPayload = null;
-                    try { sessionStorage.removeItem(STORAGE_KEY); } catch(_e) {}
-                    revokeUrl();
-                    log('Recording locked in ✅');
-                }
-            } catch(_e) {}
-        });
-        const restored = loadPayload();
-        if (restored) {
-            applyPayload(restored, {forceRetry: true});
-        }
-    }
-    init();
-})();
-</script>
-    """
-        # Capture value posted back from the HTML component (via postMessage streamlit:setComponentValue)
-        pro_component_val = st.components.v1.html(
-            js_template.replace("__FALLBACK_ID__", fallback_id),
-            height=420,
-            scrolling=False,
+        # Binary recorder component: raw bytes + small header, no base64 round-trip
+        payload = pro_recorder(
+            key="pro_recorder",
+            ingested_seq=st.session_state.get("pro_ingested_seq"),
+            live_ack=st.session_state.get("pro_live_ack"),
         )
         st.caption(
             "Pro Recorder provides live timing + waveform. After stopping, a ‘Download recording’ link appears; if auto‑ingest doesn’t trigger, download and upload the file below to continue."
         )
-        # Hidden receiver for data URL (data:audio/<mime>;base64,....) — kept invisible
-        # Use text_area so the DOM creates a <textarea> element; JS fallback writes here
-        pro_val = st.text_area(
-            "pro_recorder_b64_hidden",
-            key="pro_recorder_payload",
-            label_visibility="collapsed",
-            height=1,
-        )
-        last_hash_key = "last_fallback_b64_hash"
-        # Prefer direct component value; fallback to hidden textarea if needed
-        b64_from_component: Optional[str] = None
-        mime_from_component: Optional[str] = None
-        if isinstance(pro_component_val, dict) and pro_component_val.get("b64"):
-            try:
-                size = int(pro_component_val.get("size") or 0)
-            except Exception:
-                size = 0
-            # basic sanity: accept if > 1KB
-            if size > 1024:
-                b64_from_component = str(pro_component_val["b64"])  # plain base64 without data URL prefix
-                if pro_component_val.get("mime"):
-                    mime_from_component = str(pro_component_val["mime"]).strip()
-        if b64_from_component:
-            # Compose a robust data URL using the provided MIME when available
-            if mime_from_component:
-                pro_val = f"data:{mime_from_component};base64," + b64_from_component
-            else:
-                pro_val = "data:audio/webm;base64," + b64_from_component
-        if pro_val:
+        just_ingested = False
+        if payload is not None and payload.kind == "pcm":
+            if not (payload.final and payload.seq == st.session_state.get("pro_ingested_seq")):
+                # Streamed while recording: fold the chunk into the running buffer/stats, ack the frame count
+                try:
+                    live, received = BRIDGE_STATE.receive_chunk(
+                        payload.rec, payload.rate, payload.channels, payload.start, payload.data
+                    )
+                except ValueError as e:
+                    # Acked with frames=0: the browser falls back to uploading the finished take
+                    live, received = None, 0
+                    logger.warning("Discarding live recorder chunk: %s", e)
+                st.session_state["pro_live_ack"] = {"rec": payload.rec, "frames": received}
+                if live is not None and not payload.final:
+                    stats = live.stats()
+                    loud = stats["loudness_dbfs"]
+                    st.caption(
+                        f"Receiving… {stats['duration']:.1f}s"
+                        + (f" | Loudness: {loud:.1f} dBFS" if loud is not None else "")
+                        + (" | speech detected" if stats["speech_start_ms"] is not None else "")
+                    )
+                elif live is not None and (received >= payload.total or live.full):
+                    # Already decoded and measured; lock-in is a WAV header + memcpy
+                    analysis = live.analysis()
+                    meta = _ingest_audio_bytes(analysis.to_wav(), source="pro_recorder", filename="recording.wav", analysis=analysis)
+                    st.session_state["pro_recorder_audio_preview"] = st.session_state["pending_sample"]
+                    _render_audio_feedback(meta, st.session_state["pending_sample"])
+                    BRIDGE_STATE.finish_live(payload.rec)
+                    st.session_state["pro_ingested_seq"] = payload.seq
+                    just_ingested = True
+                    st.success("Recording Locked In ✅", icon="✅")
+        elif payload is not None and payload.seq != st.session_state.get("pro_ingested_seq"):
+            # New recording: digest and decode once; reruns that return the same frame stop at the seq check
             try:
-                # Accept data URL or plain base64
-                b64 = pro_val
-                if b64.startswith("data:"):
-                    b64 = b64.split(",", 1)[1]
-                current_hash = hashlib.sha1(b64.encode("utf-8")).hexdigest()
-                auto_needed = st.session_state.get(last_hash_key) != current_hash
-                
-                # 🎯 SURGICAL FIX: Preserve audio bytes BEFORE processing
-                if auto_needed:
-                    try:
-                        # Detect MIME from data URL (if present)
-                        inferred_format = None
-                        if pro_val.startswith("data:"):
-                            try:
-                                header = pro_val.split(",",1)[0]  # data:audio/<mime>;base64
-                                if ";base64" in header:
-                                    header = header.split(";",1)[0]
-                                if header.startswith("data:"):
-                                    header = header[len("data:"):]
-                                # header now like "audio/webm" or "audio/mp4" etc
-                                if "/" in header:
-                                    inferred_format = header.split("/",1)[1]
-                            except Exception:
-                                inferred_format = None
-                        raw_blob = base64.b64decode(b64)
-                        from pydub import AudioSegment  # type: ignore
-                        # Map common mimetypes to pydub formats
-                        fmt = (inferred_format or "webm").lower()
-                        if fmt in ("mp4","mpg4","m4a"):
-                            fmt = "mp4"
-                        elif fmt in ("aac",):
-                            fmt = "aac"
-                        elif fmt in ("mpeg","mp3"):
-                            fmt = "mp3"
-                        elif fmt in ("ogg",):
-                            fmt = "ogg"
-                        elif fmt in ("wav",):
-                            fmt = "wav"
-                        else:
-                            fmt = "webm"
-                        seg = AudioSegment.from_file(BytesIO(raw_blob), format=fmt)
-                        wav_buf = BytesIO()
-                        seg.export(wav_buf, format="wav")
-                        wav_bytes = wav_buf.getvalue()
-                        # STORE IN SESSION STATE FIRST - survives reruns
-                        st.session_state["pro_recorder_audio_preview"] = wav_bytes
-                        # Auto-ingest just like the native recorder so flow continues without extra clicks
-                        meta = _ingest_audio_bytes(wav_bytes, source="pro_recorder", filename="recording.wav")
-                        _render_audio_feedback(meta, wav_bytes)
-                        st.session_state[last_hash_key] = current_hash
-                        st.session_state["pro_ingested_hash"] = current_hash
-                        st.success("Recording Locked In ✅", icon="✅")
-                        st.markdown(
-                            """
-                            <script>
-                            (function(){
-                                try { window.sessionStorage && window.sessionStorage.removeItem('vb_pro_payload_v1'); } catch (_e) {}
-                                try {
-                                    const frames = window.frames || [];
-                                    for (let i = 0; i < frames.length; i++) {
-                                        try { frames[i].postMessage({source:'vocalbrand', type:'VB_PRO_INGESTED'}, '*'); } catch (_err) {}
-                                    }
-                                } catch (_e) {}
-                            })();
-                            </script>
-                            """,
-                            unsafe_allow_html=True,
-                        )
-                    except Exception as e:
-                        st.warning(f"Pro Recorder decode failed: {str(e)[:220]}")
-                
-                # Show persistent audio player if we have bytes
-                if "pro_recorder_audio_preview" in st.session_state:
-                    preview_bytes = st.session_state["pro_recorder_audio_preview"]
-                    st.markdown("### 🎵 Your Recording")
-                    st.audio(preview_bytes, format="audio/wav")
-                    
-                already_locked = st.session_state.get("pro_ingested_hash") == current_hash
-                if already_locked:
-                    st.info("Recording already locked in.")
-                else:
-                    force = st.button("Use Recording (Pro)", key="use_recording_pro_btn")
-                    if force:
-                        if "pro_recorder_audio_preview" in st.session_state:
-                            wav_bytes = st.session_state["pro_recorder_audio_preview"]
-                            meta = _ingest_audio_bytes(wav_bytes, source="pro_recorder", filename="recording.wav")
-                            _render_audio_feedback(meta, wav_bytes)
-                            st.success("Recording Locked In ✅", icon="✅")
-                            # Clear preview after use
-                            del st.session_state["pro_recorder_audio_preview"]
-                            st.session_state["pro_ingested_hash"] = current_hash
-                            st.markdown(
-                                """
-                                <script>
-                                (function(){
-                                    try { window.sessionStorage && window.sessionStorage.removeItem('vb_pro_payload_v1'); } catch (_e) {}
-                                    try {
-                                        const frames = window.frames || [];
-                                        for (let i = 0; i < frames.length; i++) {
-                                            try { frames[i].postMessage({source:'vocalbrand', type:'VB_PRO_INGESTED'}, '*'); } catch (_err) {}
-                                        }
-                                    } catch (_e) {}
-                                })();
-                                </script>
-                                """,
-                                unsafe_allow_html=True,
-                            )
-                        else:
-                            st.error("No recording found. Please record again.")
+                digest = payload_digest(payload.data)
+                if digest != st.session_state.get("pro_ingested_hash"):
+                    subtype = payload.mime.split(";", 1)[0].strip().lower().split("/", 1)[-1]
+                    fmt = _PRO_RECORDER_FORMATS.get(subtype, "webm")
+                    # Single decode: the WAV rendition and all measurements come from this buffer
+                    with st.spinner("Decoding recording…"):
+                        analysis = analyze_audio(payload.data, fmt=fmt, key=digest)
+                    meta = _ingest_audio_bytes(analysis.to_wav(), source="pro_recorder", filename="recording.wav", analysis=analysis)
+                    # Handle to the spooled WAV - survives reruns without holding the bytes
+                    st.session_state["pro_recorder_audio_preview"] = st.session_state["pending_sample"]
+                    _render_audio_feedback(meta, st.session_state["pending_sample"])
+                    st.session_state["pro_ingested_hash"] = digest
+                st.session_state["pro_ingested_seq"] = payload.seq
+                just_ingested = True
+                st.success("Recording Locked In ✅", icon="✅")
             except Exception as e:  # noqa: BLE001
                 msg = str(e)
                 if len(msg) > 220:
                     msg = msg[:220] + "…"
                 st.warning(f"Pro Recorder decode failed: {msg}")
+        # Show persistent audio player if we have bytes
+        preview = st.session_state.get("pro_recorder_audio_preview")
+        if preview is not None and preview.exists():
+            st.markdown("### 🎵 Your Recording")
+            render_asset_audio(preview, mime="audio/wav")
+        if payload is not None and payload.seq and not just_ingested and st.session_state.get("pro_ingested_seq") == payload.seq:
+            st.info("Recording already locked in.")
         # Show upload option alongside Pro Recorder (no early return - allow cloning section)
         render_file_upload_fallback()
         # 🎯 CRITICAL FIX: Don't return early! Let cloning section render if audio is ready
@@ -1357,40 +1028,74 @@ def render_audio_capture_area() -> None:
 
     if raw_bytes:
         meta = _ingest_audio_bytes(raw_bytes, source="native_recorder")
-        _render_audio_feedback(meta, raw_bytes)
+        _render_audio_feedback(meta, st.session_state["pending_sample"])
     render_file_upload_fallback()
 
 
-def _render_audio_feedback(meta: Dict[str, Any], raw_bytes: bytes) -> None:
+def _asset_server() -> Optional[AssetServer]:
+    """The asset server, if this browser can reach it.
+
+    With ``VOCALBRAND_ASSET_BASE_URL`` the server is reachable by that URL;
+    without it, only browsers on this machine can use ``localhost`` URLs, so
+    the request's Host header must be a loopback name. Otherwise audio is
+    served inline.
+    """
+    server = get_asset_server()
+    if server is None or server.public:
+        return server
+    try:
+        host = st.context.headers.get("Host") or ""
+    except Exception:  # noqa: BLE001 - st.context is Streamlit >= 1.37
+        return None
+    hostname = host.rsplit(":", 1)[0] if not host.endswith("]") else host
+    return server if hostname.strip("[]").lower() in ("localhost", "127.0.0.1", "::1") else None
+
+
+def render_asset_audio(asset: SampleHandle, *, mime: str, download_name: Optional[str] = None, play: bool = True) -> None:
+    """Play (and optionally offer for download) a spooled asset.
+
+    The player gets the low-bitrate preview rendition once it is built; the
+    download is always the full-quality asset. With the asset server the
+    browser fetches files by URL (ranged, cacheable); otherwise the bytes
+    are inlined as before. ``play=False`` renders only the download.
+    """
+    played, played_mime = asset, mime
+    renditions = get_preview_renditions() if play else None
+    if renditions is not None:
+        try:
+            played = renditions.preview(asset, wait=PREVIEW_WAIT_SEC)
+            played_mime = mime if played is asset else renditions.mime
+        except Exception as e:  # noqa: BLE001
+            logger.info("Preview rendition unavailable: %s", e)
+    server = _asset_server()
+    if server is not None:
+        if play:
+            st.audio(server.url(played.digest), format=played_mime)
+        if download_name:
+            st.link_button("Download audio", server.url(asset.digest, download=download_name))
+        return
+    if play:
+        st.audio(played.path, format=played_mime)
+    if download_name:
+        with asset.open() as fh:
+            st.download_button("Download audio", data=fh.read(), file_name=download_name, mime=mime)
+
+
+def _render_audio_feedback(meta: Dict[str, Any], sample: SampleHandle) -> None:
     if meta.get("ok"):
         st.success("Sample captured and validated ✅")
     else:
         st.warning(meta.get("message", "Audio validation warning"))
-    st.audio(raw_bytes, format="audio/wav")
+    render_asset_audio(sample, mime="audio/wav")
     # Brief summary line
     dur = meta.get("duration")
     loud = meta.get("loudness_dbfs")
     qual = meta.get("quality", {})
     if dur is not None:
         st.caption(f"Duration: {dur:.1f}s | Loudness: {loud:.1f} dBFS" if isinstance(loud, (int, float)) else f"Duration: {dur:.1f}s")
-    # Post-capture waveform visualization (downsampled)
+    # Post-capture waveform: int8 min/max peaks (cached by sample hash), drawn client-side
     try:
-        import numpy as np  # type: ignore
-        from pydub import AudioSegment  # type: ignore
-        seg = AudioSegment.from_file(BytesIO(raw_bytes))
-        arr = np.array(seg.get_array_of_samples())
-        if seg.channels > 1:
-            arr = arr.reshape((-1, seg.channels)).mean(axis=1)
-        # Downsample to ~1200 points for light plotting
-        target = 1200
-        if len(arr) > target:
-            step = len(arr) // target
-            arr = arr[: target * step]
-            arr = arr.reshape(-1, step).mean(axis=1)
-        # Normalize to [-1, 1] for cleaner axis
-        maxv = float(np.max(np.abs(arr))) or 1.0
-        arr = (arr / maxv).astype("float32")
-        st.line_chart(arr, height=120)
+        render_waveform(waveform_peaks(sample.view(), digest=sample.digest), height=120)
     except Exception:
         pass
     if os.getenv("DEBUG_LOGGING", "0") == "1":
@@ -1399,6 +1104,79 @@ def _render_audio_feedback(meta: Dict[str, Any], raw_bytes: bytes) -> None:
             st.json(json.loads(json.dumps(safe_meta, default=str)))
 
 
+def _job_runner() -> JobRunner:
+    runner = get_job_runner()
+    # Registered once per process; handlers take the submitting session's engine
+    # from the job env, never from whichever script run registered them
+    if not runner.handles("clone"):
+        runner.register("clone", _run_clone_job)
+    if not runner.handles("tts"):
+        runner.register("tts", _run_tts_job)
+    return runner
+
+
+def _restore_user_jobs(user_id: int) -> None:
+    """Pick up this user's unfinished or unseen jobs (e.g. after a refresh)."""
+    keys = {"clone": "clone_job_id", "tts": "tts_job_id"}
+    try:
+        from auth import list_user_jobs
+        jobs = list_user_jobs(user_id)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Job restore failed: %s", e)
+        return
+    for job in jobs:  # newest first; older unseen jobs of the same kind are superseded
+        key = keys.get(job["kind"])
+        if key and not st.session_state.get(key):
+            st.session_state[key] = job["id"]
+        elif key and st.session_state.get(key) != job["id"] and job["status"] in JOB_TERMINAL_STATUSES:
+            _job_runner().mark_delivered(job["id"])
+
+
+def render_job_progress(
+    session_key: str,
+    on_done: Callable[[Dict[str, Any]], None],
+    render_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> None:
+    """Poll the job in ``session_key`` until it finishes, then hand it to ``on_done`` once.
+
+    While it runs, the job's interim result (``JobContext.progress(partial=...)``)
+    is passed to ``render_partial`` on every poll. Uses a periodically re-running fragment where Streamlit has one (only the
+    progress block reruns); otherwise the whole script reruns after
+    ``JOB_POLL_SEC`` (see ``main``).
+    """
+    job_id = st.session_state.get(session_key)
+    if not job_id:
+        return
+    runner = _job_runner()
+    job = runner.get(job_id)
+    if job is None:
+        st.session_state[session_key] = None
+        return
+    if job["status"] in JOB_TERMINAL_STATUSES:
+        st.session_state[session_key] = None
+        runner.mark_delivered(job_id)
+        on_done(job)
+        return
+
+    def poll() -> None:
+        current = runner.get(job_id)
+        if current is None or current["status"] in JOB_TERMINAL_STATUSES:
+            if fragment is not None:
+                safe_rerun()  # full rerun renders the result outside the fragment
+            return
+        label = current["message"] or ("Queued…" if current["status"] == "queued" else "Working…")
+        st.progress(current["progress"], text=label)
+        if render_partial is not None and current.get("result"):
+            render_partial(current["result"])
+
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if fragment is not None:
+        fragment(run_every=JOB_POLL_SEC)(poll)()
+    else:
+        poll()
+        st.session_state["_job_poll_pending"] = True
+
+
 def render_clone_section() -> None:
     st.subheader("Voice cloning")
     # Visual-only note (policy, not enforced by code)
@@ -1416,81 +1194,23 @@ def render_clone_section() -> None:
 
     render_audio_capture_area()
     meta = st.session_state.get("pending_audio_meta")
-    raw_bytes = st.session_state.get("pending_audio_bytes", b"")
-    if not raw_bytes:
+    sample = _pending_sample()
+    if sample is None:
         st.info("Provide a recording or upload a file to proceed.")
+        render_job_progress("clone_job_id", _apply_clone_result)
         return
     voice_label_default = st.session_state.get("clone_voice_label") or "My VocalBrand Voice"
     voice_label = st.text_input("Voice label", value=voice_label_default, key="clone_voice_label_input")
     col1, col2 = st.columns([2, 1])
+    clone_job = st.session_state.get("clone_job_id")
     with col1:
-        disabled = not meta or not meta.get("ok")
+        disabled = not meta or not meta.get("ok") or bool(clone_job)
         if st.button("Clone voice", type="primary", disabled=disabled):
-            # Apply optional silence trimming before send
-            bytes_to_send, trim_info = _maybe_trim_silence(raw_bytes)
-            buf = BytesIO(raw_bytes)
-            if bytes_to_send is not raw_bytes:
-                buf = BytesIO(bytes_to_send)
-            buf.name = meta.get("filename", "voice.wav")
-            with st.spinner("Contacting ElevenLabs..."):
-                result = engine.clone_voice(buf, voice_label.strip() or "VocalBrand Voice")
-            
-            # CRITICAL: Only save voice_id if cloning was actually successful
-            if result.get("success") and result.get("voice_id"):
-                st.session_state["clone_voice_id"] = result.get("voice_id")
-                st.session_state["clone_voice_label"] = voice_label
-                st.session_state["clone_status"] = result.get("message", "")
-                st.session_state["clone_timestamp"] = datetime.utcnow().isoformat()
-                history = st.session_state.get("clone_history", [])
-                history.append(
-                    {
-                        "voice_id": result.get("voice_id"),
-                        "label": voice_label,
-                        "provider": result.get("provider"),
-                        "message": result.get("message"),
-                        "at": st.session_state["clone_timestamp"],
-                        "trim": trim_info,
-                    }
-                )
-                st.session_state["clone_history"] = history[-15:]
-                st.success(f"✅ Voice cloned successfully! ID: {result.get('voice_id')}")
-            else:
-                # CRITICAL: Clear any previous voice_id on failure
-                st.session_state["clone_voice_id"] = ""
-                st.session_state["clone_status"] = ""
-                
-                error_msg = result.get("message", "Voice cloning failed")
-                error_detail = result.get("error_detail", "")
-                provider = result.get("provider", "unknown")
-                
-                st.error(f"❌ **Voice Cloning Failed**\n\n{error_msg}")
-                
-                if error_detail:
-                    with st.expander("🔍 Technical Details"):
-                        st.code(error_detail)
-                
-                # Provide actionable feedback based on error type
-                if provider == "quota_exceeded":
-                    st.info(
-                        "**Voice Quota Limit Reached**\n\n"
-                        "The system automatically attempted to clean up old voices and retry, "
-                        "but the operation still failed. This means:\n\n"
-                        "- You may have reached your ElevenLabs plan limit\n"
-                        "- Try again in a moment (automatic cleanup may need time)\n"
-                        "- Consider upgrading your ElevenLabs plan for more voice slots"
-                    )
-                else:
-                    st.warning(
-                        "**What to try:**\n"
-                        "- Ensure audio is at least 30 seconds long\n"
-                        "- Speak clearly in a quiet environment\n"
-                        "- Check microphone quality\n"
-                        "- Try recording again with better audio quality\n"
-                        "- Verify your ElevenLabs API key is valid"
-                    )
+            # Runs on the job pool; this session keeps rerunning and the result survives a refresh
+            clone_job = st.session_state["clone_job_id"] = _submit_clone_job(sample, meta, voice_label.strip() or "VocalBrand Voice")
     with col2:
         if st.button("Discard sample", key="discard_sample_btn"):
-            st.session_state["pending_audio_bytes"] = b""
+            st.session_state["pending_sample"] = None
             st.session_state["pending_audio_meta"] = {}
             st.session_state["pending_audio_label"] = ""
             st.info("Sample cleared.")
@@ -1503,37 +1223,131 @@ def render_clone_section() -> None:
         and meta.get("hash")
         and st.session_state.get("last_auto_clone_hash") != meta.get("hash")
         and meta.get("ok")
+        and not clone_job
     ):
         voice_label_aut = (st.session_state.get("clone_voice_label") or voice_label_default).strip() or "VocalBrand Voice"
-        bytes_to_send, trim_info = _maybe_trim_silence(raw_bytes)
-        buf = BytesIO(bytes_to_send)
-        buf.name = meta.get("filename", "voice.wav")
-        with st.spinner("Auto-cloning with ElevenLabs..."):
-            result = engine.clone_voice(buf, voice_label_aut)
-        
-        # CRITICAL: Only save voice_id if cloning was actually successful
-        if result.get("success") and result.get("voice_id"):
-            st.session_state["clone_voice_id"] = result.get("voice_id")
-            st.session_state["clone_voice_label"] = voice_label_aut
-            st.session_state["clone_status"] = result.get("message", "")
-            st.session_state["clone_timestamp"] = datetime.utcnow().isoformat()
-            st.session_state["last_auto_clone_hash"] = meta.get("hash")
-            history = st.session_state.get("clone_history", [])
-            history.append(
-                {
-                    "voice_id": result.get("voice_id"),
-                    "label": voice_label_aut,
-                    "provider": result.get("provider"),
-                    "message": result.get("message"),
-                    "at": st.session_state["clone_timestamp"],
-                    "auto": True,
-                    "trim": trim_info,
-                }
+        # Submitted once per sample, whatever the outcome
+        st.session_state["last_auto_clone_hash"] = meta.get("hash")
+        st.session_state["clone_job_id"] = _submit_clone_job(sample, meta, voice_label_aut, auto=True)
+    render_job_progress("clone_job_id", _apply_clone_result)
+
+
+def _submit_clone_job(sample: SampleHandle, meta: Dict[str, Any], voice_label: str, *, auto: bool = False) -> Optional[str]:
+    try:
+        return _job_runner().submit(
+            "clone",
+            {
+                "digest": sample.digest,
+                "label": voice_label,
+                "filename": meta.get("filename", "voice.wav"),
+                "trim": bool(st.session_state.get("trim_silence_toggle")),
+                "auto": auto,
+            },
+            user_id=st.session_state.get("user_id"),
+            env={"engine": engine},
+        )
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Clone job submit failed: %s", e)
+        st.error("Could not start cloning. Please try again.")
+        return None
+
+
+def _run_clone_job(job: JobContext) -> Dict[str, Any]:
+    """Job handler: trim (optionally) and clone a spooled sample. Runs on the job pool."""
+    params = job.params
+    sample = get_sample_store().get(params["digest"])
+    if sample is None:
+        raise JobError("The sample has expired. Please record or upload it again.")
+    job.progress(0.1, "Preparing sample…")
+    sample_to_send, trim_info, analysis = _maybe_trim_silence(sample, bool(params.get("trim")))
+    job.progress(0.3, "Contacting ElevenLabs…")
+    result = _clone_or_reuse(
+        sample_to_send, params["label"], params["filename"], analysis, engine=job.env["engine"], user_id=job.user_id
+    )
+    result["trim"] = trim_info
+    return result
+
+
+def _apply_clone_result(job: Dict[str, Any]) -> None:
+    """Show a finished clone job and adopt its voice (once per job)."""
+    params = job["params"]
+    result = job["result"] if job["status"] == "succeeded" else {"success": False, "message": job["message"], "provider": "job_failed"}
+    voice_label = params.get("label") or "VocalBrand Voice"
+    auto = bool(params.get("auto"))
+    # CRITICAL: Only save voice_id if cloning was actually successful
+    if result.get("success") and result.get("voice_id"):
+        st.session_state["clone_voice_id"] = result.get("voice_id")
+        st.session_state["clone_voice_label"] = voice_label
+        st.session_state["clone_status"] = result.get("message", "")
+        st.session_state["clone_timestamp"] = datetime.utcnow().isoformat()
+        entry = {
+            "voice_id": result.get("voice_id"),
+            "label": voice_label,
+            "provider": result.get("provider"),
+            "message": result.get("message"),
+            "at": st.session_state["clone_timestamp"],
+            "trim": result.get("trim"),
+            "conditioning": result.get("conditioning"),
+        }
+        if auto:
+            entry["auto"] = True
+        history = st.session_state.get("clone_history", [])
+        history.append(entry)
+        st.session_state["clone_history"] = history[-15:]
+        if auto:
+            st.success("Auto-clone complete ✅" if not result.get("reused") else f"{result.get('message')} ✅")
+        elif result.get("reused"):
+            st.success(f"✅ {result.get('message')} ID: {result.get('voice_id')}")
+        else:
+            st.success(f"✅ Voice cloned successfully! ID: {result.get('voice_id')}")
+    elif auto:
+        st.warning(result.get("message", "Auto-clone failed"))
+    else:
+        # CRITICAL: Clear any previous voice_id on failure
+        st.session_state["clone_voice_id"] = ""
+        st.session_state["clone_status"] = ""
+
+        error_msg = result.get("message", "Voice cloning failed")
+        error_detail = result.get("error_detail", "")
+        provider = result.get("provider", "unknown")
+
+        st.error(f"❌ **Voice Cloning Failed**\n\n{error_msg}")
+
+        if error_detail:
+            with st.expander("🔍 Technical Details"):
+                st.code(error_detail)
+
+        # Provide actionable feedback based on error type
+        if provider == "quota_exceeded":
+            st.info(
+                "**Voice Quota Limit Reached**\n\n"
+                "The system automatically attempted to clean up old voices and retry, "
+                "but the operation still failed. This means:\n\n"
+                "- You may have reached your ElevenLabs plan limit\n"
+                "- Try again in a moment (automatic cleanup may need time)\n"
+                "- Consider upgrading your ElevenLabs plan for more voice slots"
+            )
+        elif provider == "circuit_open":
+            st.info(
+                "**ElevenLabs is currently degraded.**\n\n"
+                "We paused requests to avoid long waits. Your sample is kept — "
+                "try cloning again shortly."
+            )
+        elif provider == "deadline_exceeded":
+            st.info(
+                "**ElevenLabs is responding slowly.**\n\n"
+                "The request was stopped so the app stays responsive. Your sample is kept — "
+                "try cloning again in a moment."
             )
-            st.session_state["clone_history"] = history[-15:]
-            st.success("Auto-clone complete ✅")
         else:
-            st.warning(result.get("message", "Auto-clone failed"))
+            st.warning(
+                "**What to try:**\n"
+                "- Ensure audio is at least 30 seconds long\n"
+                "- Speak clearly in a quiet environment\n"
+                "- Check microphone quality\n"
+                "- Try recording again with better audio quality\n"
+                "- Verify your ElevenLabs API key is valid"
+            )
 
 
 def render_generation_section() -> None:
@@ -1564,6 +1378,25 @@ def render_generation_section() -> None:
             st.rerun()
         return
     
+    # Voice library: switch between this user's saved voices (restored from the DB on login)
+    saved_voices: Dict[str, str] = {}
+    for entry in reversed(st.session_state.get("clone_history", [])):
+        if entry.get("voice_id"):
+            saved_voices.setdefault(entry["voice_id"], entry.get("label") or entry["voice_id"])
+    if len(saved_voices) > 1:
+        voice_ids = list(saved_voices)
+        picked = st.selectbox(
+            "Your voices",
+            voice_ids,
+            index=voice_ids.index(voice_id) if voice_id in voice_ids else 0,
+            format_func=lambda vid: f"{saved_voices[vid]} ({vid[:8]}…)",
+            key="voice_library_pick",
+        )
+        if picked != voice_id:
+            voice_id = picked
+            st.session_state["clone_voice_id"] = picked
+            st.session_state["clone_voice_label"] = saved_voices[picked]
+
     st.caption(f"✅ Voice ID: `{voice_id}`")
     voice_label = st.session_state.get("clone_voice_label", "Your Voice")
     if voice_label:
@@ -1596,43 +1429,219 @@ def render_generation_section() -> None:
             st.error("Free usage limit reached. Upgrade to continue.")
             disabled = True
 
-    if st.button("Generate speech", type="primary", disabled=disabled):
-        with st.spinner("Generating with ElevenLabs..."):
-            success, audio_buffer, status = engine.text_to_speech(
-                prompt.strip(),
-                voice_id,
-                model_id=model_id,
-                output_format=output_format,
+    tts_job = st.session_state.get("tts_job_id")
+    if st.button("Generate speech", type="primary", disabled=disabled or bool(tts_job)):
+        stream = _open_tts_stream(output_format)
+        try:
+            tts_job = st.session_state["tts_job_id"] = _job_runner().submit(
+                "tts",
+                {
+                    "text": prompt.strip(),
+                    "voice_id": voice_id,
+                    "model_id": model_id,
+                    "output_format": output_format,
+                    "subscription_active": bool(st.session_state.get("subscription_active")),
+                    "stream": stream["token"] if stream else None,
+                },
+                user_id=user_id,
+                env={"engine": engine},
             )
-        if not success or not audio_buffer:
-            st.error(f"Generation failed: {status}")
+            st.session_state["tts_stream"] = stream
+            st.session_state["tts_snapshot"] = None
+        except Exception as e:  # noqa: BLE001
+            logger.warning("TTS job submit failed: %s", e)
+            st.error("Could not start generation. Please try again.")
+            if stream:
+                _asset_server().get_live(stream["token"]).finish(None)
+    # One player per generation, rendered above the progress block: it starts while the
+    # audio is still arriving and is the same element (same URL) once the job finishes,
+    # so a listener is not cut off when the result replaces the progress bar.
+    stream = st.session_state.get("tts_stream")
+    last = st.session_state.get("last_tts_result")
+    if stream and (tts_job or (last and last.get("stream") == stream["token"])):
+        st.audio(stream["url"], format="audio/mpeg")
+    render_job_progress("tts_job_id", _apply_tts_result, _render_tts_snapshot)
+    last = st.session_state.get("last_tts_result")
+    clip = get_sample_store().get(last["digest"]) if last else None
+    if clip is not None:
+        streamed = bool(stream) and last.get("stream") == stream["token"]
+        render_asset_audio(clip, mime=last["mime"], download_name=last["download_name"], play=not streamed)
+
+
+def _render_tts_snapshot(partial: Dict[str, Any]) -> None:
+    """In-page progressive playback when there is no live player: the audio received so far.
+
+    A snapshot is a finished file, not a stream. The player keeps the snapshot
+    it was given, because swapping its source would restart playback; the
+    listener loads newer audio with the button.
+    """
+    if st.session_state.get("tts_stream") or not partial.get("digest"):
+        return
+    shown = st.session_state.get("tts_snapshot") or partial
+    if partial["digest"] != shown["digest"] and st.button(
+        f"Load latest preview ({partial['bytes'] / 1024:.0f} kB received)", key="tts_snapshot_refresh"
+    ):
+        shown = partial
+    st.session_state["tts_snapshot"] = shown
+    clip = get_sample_store().get(shown["digest"])
+    if clip is None:
+        return
+    st.caption(f"Preview: first {shown['bytes'] / 1024:.0f} kB. Generation is still running.")
+    st.audio(clip.path, format=shown["mime"])
+
+
+def _open_tts_stream(output_format: str) -> Optional[Dict[str, str]]:
+    """A live asset the generation job writes into, if the browser can play it while it grows.
+
+    MP3 frames decode independently, so the browser plays the response as it
+    arrives; WAV needs its full header and is only shown when finished.
+    """
+    server = _asset_server()
+    if server is None or "mp3" not in output_format:
+        return None
+    live = server.open_live("audio/mpeg")
+    return {"token": live.token, "url": server.live_url(live.token)}
+
+
+def _run_tts_job(job: JobContext) -> Dict[str, Any]:
+    """Job handler: synthesize, spool the clip and record usage. Runs on the job pool."""
+    server = get_asset_server()
+    live = server.get_live(job.params["stream"]) if server is not None and job.params.get("stream") else None
+    try:
+        result = _synthesize_clip(job, live)
+    except BaseException:
+        if live is not None:
+            live.finish(None)
+        raise
+    if live is not None:
+        live.finish(result["digest"])
+    return result
+
+
+def _snapshot_sink(job: JobContext, mime: str) -> Callable[[bytes], None]:
+    """Collect streamed audio and publish a playable snapshot every ``TTS_SNAPSHOT_SEC``.
+
+    The fallback for progressive playback when no live asset exists (the
+    browser cannot reach the asset server): each snapshot is spooled and
+    becomes the job's interim result, which ``_render_tts_snapshot`` plays.
+    """
+    received = BytesIO()
+    last_published = [time.monotonic()]
+
+    def append(chunk: bytes) -> None:
+        received.write(chunk)
+        now = time.monotonic()
+        if now - last_published[0] < TTS_SNAPSHOT_SEC:
             return
-        audio_bytes = audio_buffer.getvalue()
-        st.audio(audio_bytes, format="audio/mpeg" if "mp3" in output_format else "audio/wav")
-        st.download_button(
-            "Download audio",
-            data=audio_bytes,
-            file_name=f"vocalbrand_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{'mp3' if 'mp3' in output_format else 'wav'}",
-            mime="audio/mpeg" if "mp3" in output_format else "audio/wav",
+        last_published[0] = now
+        snapshot = get_sample_store().put(received.getvalue())
+        job.progress(
+            None,
+            f"Receiving audio… {received.tell() / 1024:.0f} kB",
+            partial={"digest": snapshot.digest, "mime": mime, "bytes": received.tell()},
         )
-        
-        # Increment persistent usage counter for free users
-        if user_id and not st.session_state.get("subscription_active"):
-            increment_free_usage(user_id)
-        
-        history = st.session_state.get("tts_history", [])
-        history.append(
-            {
-                "prompt": prompt.strip()[:180],
-                "voice_id": voice_id,
-                "status": status,
-                "generated_at": datetime.utcnow().isoformat(),
-                "format": output_format,
-                "bytes": len(audio_bytes),
-            }
+
+    return append
+
+
+def _synthesize_clip(job: JobContext, live: Optional[LiveAsset]) -> Dict[str, Any]:
+    params, engine = job.params, job.env["engine"]
+    text, voice_id, output_format = params["text"], params["voice_id"], params["output_format"]
+    audio_mime = "audio/mpeg" if "mp3" in output_format else "audio/wav"
+    # Where received audio goes while generating: the live asset's player, else in-page snapshots
+    sink: Optional[Callable[[bytes], None]] = None
+    if live is not None:
+        sink = live.append
+    elif "mp3" in output_format:
+        sink = _snapshot_sink(job, audio_mime)
+    single_request_limit = min(LONGFORM_MIN_CHARS, MODEL_CHAR_LIMITS.get(params["model_id"], DEFAULT_CHAR_LIMIT))
+    if len(text) > single_request_limit:
+        # Long scripts: parallel sentence-aligned chunks, stitched in order; each
+        # finished leading chunk goes to the player while later ones are generated
+        job.progress(0.05, "Generating long-form audio with ElevenLabs...")
+        success, audio_buffer, status = engine.text_to_speech_long(
+            text,
+            voice_id,
+            model_id=params["model_id"],
+            output_format=output_format,
+            deadline=TTS_DEADLINE_SEC,
+            on_audio=sink,
+        )
+        if not success or not audio_buffer:
+            raise JobError(f"Generation failed: {status}")
+        audio_bytes = audio_buffer.getvalue()
+    else:
+        job.progress(0.05, "Generating with ElevenLabs...")
+        success, chunks, status = engine.text_to_speech_stream(
+            text,
+            voice_id,
+            model_id=params["model_id"],
+            output_format=output_format,
+            deadline=TTS_DEADLINE_SEC,
         )
-        st.session_state["tts_history"] = history[-25:]
-        st.success("Audio generated and saved to history.")
+        if not success or chunks is None:
+            raise JobError(f"Generation failed: {status}")
+        # Progressive playback: each chunk goes straight to the sink (the live asset the
+        # session's player is already reading, or the snapshots) while the full clip is assembled here.
+        assembled = BytesIO()
+        try:
+            for chunk in chunks:
+                assembled.write(chunk)
+                if sink is not None:
+                    sink(chunk)
+                job.progress(None, f"Receiving audio… {assembled.tell() / 1024:.0f} kB")
+        except Exception as e:  # noqa: BLE001
+            raise JobError(f"Generation failed: stream_interrupted:{e}") from e
+        audio_bytes = assembled.getvalue()
+    if len(audio_bytes) < 50:
+        raise JobError(f"Generation failed: tiny_audio:{len(audio_bytes)}")
+    # Spooled by content digest; player and download both reference the one file
+    clip = get_sample_store().put(audio_bytes)
+    user_id = job.user_id
+    # Increment persistent usage counter for free users
+    if user_id and not params.get("subscription_active"):
+        increment_free_usage(user_id)
+    if user_id:
+        try:
+            from auth import record_tts_generation
+            record_tts_generation(user_id, voice_id, text[:180], status, output_format, len(audio_bytes))
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Generation history write failed: %s", e)
+    return {
+        "digest": clip.digest,
+        "mime": audio_mime,
+        "download_name": f"vocalbrand_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{'mp3' if 'mp3' in output_format else 'wav'}",
+        "prompt": text[:180],
+        "voice_id": voice_id,
+        "status": status,
+        "format": output_format,
+        "bytes": len(audio_bytes),
+        "stream": params.get("stream"),
+    }
+
+
+def _apply_tts_result(job: Dict[str, Any]) -> None:
+    """Show a finished generation job and add it to the session history (once per job)."""
+    st.session_state["tts_snapshot"] = None
+    if job["status"] != "succeeded":
+        st.session_state["tts_stream"] = None
+        st.error(job["message"] or "Generation failed")
+        return
+    result = job["result"]
+    st.session_state["last_tts_result"] = result
+    history = st.session_state.get("tts_history", [])
+    history.append(
+        {
+            "prompt": result.get("prompt"),
+            "voice_id": result.get("voice_id"),
+            "status": result.get("status"),
+            "generated_at": job.get("updated_at") or datetime.utcnow().isoformat(),
+            "format": result.get("format"),
+            "bytes": result.get("bytes"),
+        }
+    )
+    st.session_state["tts_history"] = history[-25:]
+    st.success("Audio generated and saved to history.")
 
 
 def render_upgrade_section(container: Any) -> None:
@@ -1852,6 +1861,13 @@ def render_account_panel() -> None:
                 f"- ElevenLabs key: {'configured' if ELEVENLABS_KEY else 'missing'}\n"
                 f"- Engine offline: {engine.offline} ({engine.offline_reason})"
             )
+            breaker = engine.breaker_status()
+            if breaker:
+                retry = f", retry in {breaker['retry_in_sec']}s" if breaker.get("retry_in_sec") else ""
+                st.markdown(
+                    f"- ElevenLabs circuit: **{breaker['state']}** "
+                    f"(errors {breaker['failure_rate']:.0%}, slow {breaker['slow_rate']:.0%}{retry})"
+                )
 
 
 def login_section() -> None:
@@ -1934,6 +1950,11 @@ def render_metrics_panel() -> None:
     with st.expander("Diagnostics", expanded=False):
         st.markdown("#### Hash backend")
         st.json(hash_backend_status())
+        st.markdown("#### Engine metrics")
+        st.json(metrics_collector.summary())
+        if engine.tts_cache is not None:
+            st.markdown("#### TTS cache")
+            st.json(engine.tts_cache.stats())
         st.markdown("#### Recorder status")
         st.json(
             {
@@ -1946,14 +1967,19 @@ def render_metrics_panel() -> None:
         )
         st.markdown("#### Recorder bridge history")
         if BRIDGE_STATE.history:
-            st.json(BRIDGE_STATE.history[-5:])
+            st.json(BRIDGE_STATE.recent(5))
         else:
             st.write("No captures yet.")
-        if not st.session_state.get("pending_audio_bytes") and BRIDGE_STATE.history:
+        if _pending_sample() is None and BRIDGE_STATE.history:
             if st.button("Adopt last capture (force)"):
-                # Try reconstructing using stored meta + (not stored raw bytes, so only meta adoption)
-                last = BRIDGE_STATE.history[-1]
-                st.warning("Adopted metadata only (raw bytes not cached). Re-record for full pipeline.")
+                # The spooled file outlives the session that captured it (until its TTL expires)
+                last = BRIDGE_STATE.recent(1)[-1]
+                spooled = get_sample_store().get(last["digest"]) if last.get("digest") else None
+                if spooled is not None:
+                    st.session_state["pending_sample"] = spooled
+                    st.success("Adopted last capture from the sample store.")
+                else:
+                    st.warning("Adopted metadata only (sample no longer spooled). Re-record for full pipeline.")
                 st.session_state["pending_audio_meta"] = last
 
 
@@ -2174,18 +2200,64 @@ def page_clone() -> None:
 
 def page_generate() -> None:
     render_generation_section()
-    if st.session_state.get("tts_history"):
+    user_id = st.session_state.get("user_id")
+    if user_id:
+        render_generation_history(user_id)
+    elif st.session_state.get("tts_history"):
         with st.expander("Generation history", expanded=False):
             st.json(st.session_state["tts_history"][::-1][:10])
 
 
+def render_generation_history(user_id: int, page_size: int = 10) -> None:
+    """Browse the persisted generation history one keyset page at a time."""
+    with st.expander("Generation history", expanded=False):
+        try:
+            from auth import list_tts_generations
+            rows, next_before = list_tts_generations(
+                user_id, before_id=st.session_state.get("tts_history_cursor"), limit=page_size
+            )
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Generation history read failed: %s", e)
+            st.json(st.session_state.get("tts_history", [])[::-1][:page_size])
+            return
+        if not rows:
+            st.caption("No generations yet.")
+        else:
+            st.json(rows)
+        col_new, col_old = st.columns(2)
+        with col_new:
+            if st.session_state.get("tts_history_cursor") is not None and st.button("Newest", key="tts_history_newest"):
+                st.session_state["tts_history_cursor"] = None
+                safe_rerun(0.05)
+        with col_old:
+            if next_before is not None and st.button("Older →", key="tts_history_older"):
+                st.session_state["tts_history_cursor"] = next_before
+                safe_rerun(0.05)
+
+
 def page_admin() -> None:
     st.subheader("Admin dashboard")
     st.write("Recent clones")
     st.json(st.session_state.get("clone_history", [])[-10:])
     st.write("Recorder hits", BRIDGE_STATE.hits)
+    breaker = engine.breaker_status()
+    if breaker:
+        st.write("ElevenLabs circuit breaker")
+        st.json(breaker)
+    if engine.transport.rate_limiter is not None:
+        st.write("Upstream rate limiter")
+        st.json(engine.transport.rate_limiter.snapshot())
     st.write("Latest bridge payload")
     st.json(BRIDGE_STATE.snapshot())
+    usage = get_memory_governor(MEMORY_POLICIES, _session_is_alive).snapshot()
+    st.write(
+        "Session memory",
+        f"{usage['total_resident_bytes'] / 1e6:.1f} MB resident / {usage['global_budget_bytes'] / 1e6:.0f} MB budget",
+        f"({usage['total_spilled_bytes'] / 1e6:.1f} MB spooled to disk)",
+    )
+    st.json(usage["sessions"][:20])
+    st.write("Sample store", get_sample_store().stats())
+    st.write("Background jobs", _job_runner().stats())
 
 
 def page_contact() -> None:
@@ -2441,6 +2513,8 @@ def main() -> None:
     ensure_demo_user()
     ensure_session_defaults()
     ensure_voice_reset_on_logout()
+    ensure_user_library_loaded()
+    govern_session_memory()
     inject_css()
     # Inject SEO meta tags for search engine optimization
     try:
@@ -2501,6 +2575,8 @@ def main() -> None:
         page_contact()
     elif current_page == "Admin":
         page_admin()
+    if st.session_state.pop("_job_poll_pending", False):
+        safe_rerun(JOB_POLL_SEC)  # no st.fragment: poll running jobs with full reruns
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ Supports both SQLite (local) and PostgreSQL (production).
 Not production hardened (no rate limiting / email verification)."""
 from __future__ import annotations
 import os
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 # Import database adapter
 from db_adapter import db_adapter, get_db_type, get_db_info
@@ -376,6 +376,285 @@ def mark_processed_session(
         # Already exists or other error
         return has_processed_session(session_id)
 
+
+# -------------------------
+# Voice clone registry (sample content hash -> voice_id)
+# -------------------------
+
+def find_cloned_voice(user_id: int, sample_hash: str) -> Optional[dict]:
+    """Return the voice previously cloned by this user from the same sample, if any."""
+    if not user_id or not sample_hash:
+        return None
+    
+    row = db_adapter.execute(
+        "SELECT voice_id, voice_label, provider, created_at FROM voice_clones WHERE user_id=? AND sample_hash=?",
+        (user_id, sample_hash),
+        fetch='one'
+    )
+    if row:
+        return {
+            "voice_id": row[0],
+            "voice_label": row[1],
+            "provider": row[2],
+            "created_at": row[3],
+        }
+    return None
+
+
+def record_cloned_voice(
+    user_id: int,
+    sample_hash: str,
+    voice_id: str,
+    voice_label: str | None = None,
+    provider: str | None = None,
+) -> bool:
+    """Map (user, sample hash) to a cloned voice_id, replacing any stale mapping.
+
+    Returns True if stored, False on failure.
+    """
+    if not user_id or not sample_hash or not voice_id:
+        return False
+    
+    try:
+        if find_cloned_voice(user_id, sample_hash):
+            # Same sample re-cloned after its voice vanished upstream: repoint the row
+            db_adapter.execute(
+                "UPDATE voice_clones SET voice_id=?, voice_label=?, provider=?, last_used_at=CURRENT_TIMESTAMP WHERE user_id=? AND sample_hash=?",
+                (voice_id, voice_label, provider, user_id, sample_hash)
+            )
+        else:
+            db_adapter.execute(
+                "INSERT INTO voice_clones (user_id, sample_hash, voice_id, voice_label, provider) VALUES (?, ?, ?, ?, ?)",
+                (user_id, sample_hash, voice_id, voice_label, provider)
+            )
+        return True
+    except Exception:
+        # Lost a race with a concurrent insert of the same mapping, or DB unavailable
+        return False
+
+
+def touch_cloned_voice(user_id: int, sample_hash: str) -> None:
+    """Record that a registered clone was reused."""
+    db_adapter.execute(
+        "UPDATE voice_clones SET last_used_at=CURRENT_TIMESTAMP WHERE user_id=? AND sample_hash=?",
+        (user_id, sample_hash)
+    )
+
+
+def forget_cloned_voice(voice_id: str) -> None:
+    """Drop registry entries for a voice that no longer exists upstream."""
+    if not voice_id:
+        return
+    
+    db_adapter.execute(
+        "DELETE FROM voice_clones WHERE voice_id=?",
+        (voice_id,)
+    )
+
+
+# -------------------------
+# Per-user voice library and generation history
+# -------------------------
+# Reads are keyset-paginated on the (user_id, id) index: pass the ``next_before``
+# cursor from one page as ``before_id`` to fetch the next (older) page.
+
+def save_user_voice(user_id: int, voice_id: str, voice_label: str | None = None, provider: str | None = None) -> bool:
+    """Add a voice to the user's library (re-saving an existing voice updates its label)."""
+    if not user_id or not voice_id:
+        return False
+    
+    try:
+        row = db_adapter.execute(
+            "SELECT id FROM user_voices WHERE user_id=? AND voice_id=?",
+            (user_id, voice_id),
+            fetch='one'
+        )
+        if row:
+            db_adapter.execute(
+                "UPDATE user_voices SET voice_label=?, provider=? WHERE id=?",
+                (voice_label, provider, row[0])
+            )
+        else:
+            db_adapter.execute(
+                "INSERT INTO user_voices (user_id, voice_id, voice_label, provider) VALUES (?, ?, ?, ?)",
+                (user_id, voice_id, voice_label, provider)
+            )
+        return True
+    except Exception:
+        return False
+
+
+def remove_user_voice(user_id: int, voice_id: str) -> None:
+    """Remove a voice from the user's library."""
+    db_adapter.execute(
+        "DELETE FROM user_voices WHERE user_id=? AND voice_id=?",
+        (user_id, voice_id)
+    )
+
+
+def list_user_voices(user_id: int, *, before_id: int | None = None, limit: int = 20) -> Tuple[List[dict], Optional[int]]:
+    """Return (voices newest first, next_before cursor or None when exhausted)."""
+    if before_id is None:
+        rows = db_adapter.execute(
+            "SELECT id, voice_id, voice_label, provider, created_at FROM user_voices WHERE user_id=? ORDER BY id DESC LIMIT ?",
+            (user_id, limit + 1),
+            fetch='all'
+        )
+    else:
+        rows = db_adapter.execute(
+            "SELECT id, voice_id, voice_label, provider, created_at FROM user_voices WHERE user_id=? AND id<? ORDER BY id DESC LIMIT ?",
+            (user_id, before_id, limit + 1),
+            fetch='all'
+        )
+    rows = rows or []
+    voices = [
+        {
+            "id": r[0],
+            "voice_id": r[1],
+            "label": r[2],
+            "provider": r[3],
+            "at": str(r[4]) if r[4] is not None else "",
+        }
+        for r in rows[:limit]
+    ]
+    next_before = voices[-1]["id"] if len(rows) > limit else None
+    return voices, next_before
+
+
+def record_tts_generation(
+    user_id: int,
+    voice_id: str,
+    prompt: str,
+    status: str,
+    output_format: str | None = None,
+    size_bytes: int | None = None,
+) -> None:
+    """Append a generation to the user's history."""
+    if not user_id:
+        return
+    
+    db_adapter.execute(
+        "INSERT INTO tts_generations (user_id, voice_id, prompt, status, output_format, bytes) VALUES (?, ?, ?, ?, ?, ?)",
+        (user_id, voice_id, prompt, status, output_format, size_bytes)
+    )
+
+
+def list_tts_generations(user_id: int, *, before_id: int | None = None, limit: int = 25) -> Tuple[List[dict], Optional[int]]:
+    """Return (generations newest first, next_before cursor or None when exhausted)."""
+    if before_id is None:
+        rows = db_adapter.execute(
+            "SELECT id, voice_id, prompt, status, output_format, bytes, created_at FROM tts_generations WHERE user_id=? ORDER BY id DESC LIMIT ?",
+            (user_id, limit + 1),
+            fetch='all'
+        )
+    else:
+        rows = db_adapter.execute(
+            "SELECT id, voice_id, prompt, status, output_format, bytes, created_at FROM tts_generations WHERE user_id=? AND id<? ORDER BY id DESC LIMIT ?",
+            (user_id, before_id, limit + 1),
+            fetch='all'
+        )
+    rows = rows or []
+    generations = [
+        {
+            "id": r[0],
+            "voice_id": r[1],
+            "prompt": r[2],
+            "status": r[3],
+            "format": r[4],
+            "bytes": r[5],
+            "generated_at": str(r[6]) if r[6] is not None else "",
+        }
+        for r in rows[:limit]
+    ]
+    next_before = generations[-1]["id"] if len(rows) > limit else None
+    return generations, next_before
+
+
+# -------------------------
+# Background jobs (clone / TTS), see utils/jobs.py
+# -------------------------
+_JOB_COLUMNS = "id, user_id, kind, status, progress, message, params, result, owner, delivered, created_at, updated_at"
+
+
+def _job_row(r) -> dict:
+    return {
+        "id": r[0],
+        "user_id": r[1],
+        "kind": r[2],
+        "status": r[3],
+        "progress": float(r[4] or 0.0),
+        "message": r[5] or "",
+        "params": r[6],
+        "result": r[7],
+        "owner": r[8],
+        "delivered": bool(r[9]),
+        "created_at": str(r[10]) if r[10] is not None else "",
+        "updated_at": str(r[11]) if r[11] is not None else "",
+    }
+
+
+def create_job(job_id: str, user_id: int | None, kind: str, params: str, owner: str) -> None:
+    """Insert a queued job (``params`` is a JSON string)."""
+    db_adapter.execute(
+        "INSERT INTO jobs (id, user_id, kind, status, params, owner) VALUES (?, ?, ?, 'queued', ?, ?)",
+        (job_id, user_id, kind, params, owner)
+    )
+
+
+def update_job(
+    job_id: str,
+    *,
+    status: str | None = None,
+    progress: float | None = None,
+    message: str | None = None,
+    result: str | None = None,
+) -> None:
+    """Update the given fields of a job (and its updated_at)."""
+    sets, params = [], []
+    for column, value in (("status", status), ("progress", progress), ("message", message), ("result", result)):
+        if value is not None:
+            sets.append(f"{column}=?")
+            params.append(value)
+    sets.append("updated_at=CURRENT_TIMESTAMP")
+    db_adapter.execute(f"UPDATE jobs SET {', '.join(sets)} WHERE id=?", (*params, job_id))
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    row = db_adapter.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id=?", (job_id,), fetch='one')
+    return _job_row(row) if row else None
+
+
+def list_user_jobs(user_id: int, *, undelivered_only: bool = True, limit: int = 10) -> List[dict]:
+    """Return the user's jobs, newest first (by default only those whose result was not shown yet)."""
+    where = "user_id=? AND delivered=0" if undelivered_only else "user_id=?"
+    rows = db_adapter.execute(
+        f"SELECT {_JOB_COLUMNS} FROM jobs WHERE {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+        (user_id, limit),
+        fetch='all'
+    )
+    return [_job_row(r) for r in rows or []]
+
+
+def mark_job_delivered(job_id: str) -> None:
+    """Record that a finished job's result has been shown to the user."""
+    db_adapter.execute("UPDATE jobs SET delivered=1 WHERE id=?", (job_id,))
+
+
+def purge_jobs(older_than_seconds: float) -> None:
+    """Delete jobs not updated within ``older_than_seconds``.
+
+    The cutoff is computed by the database from the same clock that sets
+    ``updated_at`` (``CURRENT_TIMESTAMP``), so app and server time zones
+    never have to agree.
+    """
+    seconds = max(0, int(older_than_seconds))
+    if db_adapter.use_postgres:
+        db_adapter.execute(
+            "DELETE FROM jobs WHERE updated_at < CURRENT_TIMESTAMP - (? * INTERVAL '1 second')", (seconds,)
+        )
+    else:
+        db_adapter.execute("DELETE FROM jobs WHERE updated_at < datetime('now', ?)", (f"-{seconds} seconds",))
+
 if __name__ == "__main__":
     init_db()
     ensure_demo_user()
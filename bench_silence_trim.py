@@ -0,0 +1,87 @@
+"""Benchmark silence detection + trimming: pydub (previous) vs. vectorized NumPy.
+
+Run: python bench_silence_trim.py [--repeat N]
+
+Synthetic mono 44.1 kHz samples from 5s to 120s (leading/trailing silence,
+speech-like bursts separated by pauses, low noise floor) are trimmed with
+  * pydub:  detect_nonsilent(window 20ms) + slice + WAV export (old path)
+  * numpy:  AudioAnalysis.silence_bounds() + trim() + to_wav() (current path)
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.audio_analysis import AudioAnalysis  # noqa: E402
+
+SR = 44100
+DURATIONS = (5, 15, 30, 60, 120)
+
+
+def synth(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SR)
+    pcm = rng.normal(0, 20, n)  # noise floor around -64 dBFS
+    t = np.arange(n) / SR
+    pos = SR  # 1s leading silence
+    while pos < n - SR:
+        burst = int(rng.uniform(0.3, 1.5) * SR)
+        end = min(pos + burst, n - SR)
+        f0 = rng.uniform(110, 240)
+        pcm[pos:end] += 8000 * np.sin(2 * math.pi * f0 * t[pos:end]) * np.hanning(end - pos)
+        pos = end + int(rng.uniform(0.1, 0.6) * SR)
+    return np.clip(pcm, -32768, 32767).astype(np.int16)
+
+
+def trim_pydub(analysis: AudioAnalysis) -> bytes:
+    from pydub.silence import detect_nonsilent  # type: ignore
+    seg = analysis.segment()
+    spans = detect_nonsilent(seg, min_silence_len=20, silence_thresh=-40)
+    if not spans:
+        return b""
+    out = BytesIO()
+    seg[max(0, spans[0][0] - 20):spans[-1][1] + 20].export(out, format="wav")
+    return out.getvalue()
+
+
+def trim_numpy(analysis: AudioAnalysis) -> bytes:
+    bounds = analysis.silence_bounds(thresh_dbfs=-40, window_ms=20, pad_ms=20)
+    if not bounds:
+        return b""
+    return analysis.trim(*bounds).to_wav()
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-pydub", action="store_true", help="only time the NumPy path")
+    args = parser.parse_args()
+
+    print(f"{'sample':>8} {'pydub (s)':>11} {'numpy (s)':>11} {'speedup':>9}")
+    for seconds in DURATIONS:
+        analysis = AudioAnalysis(synth(seconds), SR)
+        t_np = best_of(trim_numpy, analysis, args.repeat)
+        if args.skip_pydub:
+            print(f"{seconds:>7}s {'-':>11} {t_np:>11.4f} {'-':>9}")
+            continue
+        t_pd = best_of(trim_pydub, analysis, 1 if seconds >= 60 else args.repeat)
+        print(f"{seconds:>7}s {t_pd:>11.4f} {t_np:>11.4f} {t_pd / t_np:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
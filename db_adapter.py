@@ -122,8 +122,61 @@ class DatabaseAdapter:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
                 
+                CREATE TABLE IF NOT EXISTS voice_clones (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    sample_hash TEXT NOT NULL,
+                    voice_id TEXT NOT NULL,
+                    voice_label TEXT,
+                    provider TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (user_id, sample_hash)
+                );
+                
+                CREATE TABLE IF NOT EXISTS user_voices (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    voice_id TEXT NOT NULL,
+                    voice_label TEXT,
+                    provider TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (user_id, voice_id)
+                );
+                
+                CREATE TABLE IF NOT EXISTS tts_generations (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    voice_id TEXT,
+                    prompt TEXT,
+                    status TEXT,
+                    output_format TEXT,
+                    bytes INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id INTEGER,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    progress REAL DEFAULT 0,
+                    message TEXT,
+                    params TEXT,
+                    result TEXT,
+                    owner TEXT,
+                    delivered INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
                 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
                 CREATE INDEX IF NOT EXISTS idx_sessions_session_id ON processed_sessions(session_id);
+                CREATE INDEX IF NOT EXISTS idx_voice_clones_voice_id ON voice_clones(voice_id);
+                CREATE INDEX IF NOT EXISTS idx_user_voices_user_id ON user_voices(user_id, id);
+                CREATE INDEX IF NOT EXISTS idx_tts_generations_user_id ON tts_generations(user_id, id);
+                CREATE INDEX IF NOT EXISTS idx_jobs_user_id ON jobs(user_id, delivered);
+                CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
             """
         else:
             return """
@@ -151,6 +204,60 @@ class DatabaseAdapter:
                     details TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
+                
+                CREATE TABLE IF NOT EXISTS voice_clones (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    sample_hash TEXT NOT NULL,
+                    voice_id TEXT NOT NULL,
+                    voice_label TEXT,
+                    provider TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (user_id, sample_hash)
+                );
+                
+                CREATE TABLE IF NOT EXISTS user_voices (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    voice_id TEXT NOT NULL,
+                    voice_label TEXT,
+                    provider TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (user_id, voice_id)
+                );
+                
+                CREATE TABLE IF NOT EXISTS tts_generations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    voice_id TEXT,
+                    prompt TEXT,
+                    status TEXT,
+                    output_format TEXT,
+                    bytes INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id INTEGER,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    progress REAL DEFAULT 0,
+                    message TEXT,
+                    params TEXT,
+                    result TEXT,
+                    owner TEXT,
+                    delivered INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
+                CREATE INDEX IF NOT EXISTS idx_voice_clones_voice_id ON voice_clones(voice_id);
+                CREATE INDEX IF NOT EXISTS idx_user_voices_user_id ON user_voices(user_id, id);
+                CREATE INDEX IF NOT EXISTS idx_tts_generations_user_id ON tts_generations(user_id, id);
+                CREATE INDEX IF NOT EXISTS idx_jobs_user_id ON jobs(user_id, delivered);
+                CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
             """
     
     def column_exists(self, table: str, column: str) -> bool:
@@ -2,25 +2,103 @@
 from __future__ import annotations
 import time
 import os
+import random
+import threading
+import wave
 import requests
 from io import BytesIO
-from typing import Optional, Dict, Any, Tuple
-from metrics import metrics_collector
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Callable, Optional, Dict, Any, Iterable, Iterator, List, Sequence, Tuple, Union
+from metrics import LatencyTracker, metrics_collector
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import Deadline, DeadlineExceeded, bounded_sleep
+from utils.http_transport import HttpTransport, RateLimitTimeout, get_transport
+from utils.tts_cache import TTSCache, get_tts_cache, make_cache_key
+from utils.text_chunking import split_text
 import logging
 
 logger = logging.getLogger("vocalbrand.engine")
 
 ELEVEN_VOICE_ADD_URL = "https://api.elevenlabs.io/v1/voices/add"
 ELEVEN_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+ELEVEN_TTS_STREAM_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
 DEFAULT_MODEL_ID = "eleven_monolingual_v1"
 DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
+# Hard per-request character limits (conservative; unknown models use the default)
+MODEL_CHAR_LIMITS = {
+    "eleven_monolingual_v1": 5000,
+    "eleven_multilingual_v1": 5000,
+    "eleven_multilingual_v2": 10000,
+    "eleven_turbo_v2": 30000,
+    "eleven_turbo_v2_5": 40000,
+    "eleven_flash_v2_5": 40000,
+}
+DEFAULT_CHAR_LIMIT = 5000
+# Long-form chunk size: smaller chunks -> more parallelism, shorter wall-clock
+LONGFORM_CHUNK_CHARS = int(os.getenv("VOCALBRAND_LONGFORM_CHUNK_CHARS", "600"))
+# Texts up to this length go through one streamed request (first audio in ~1s);
+# only longer scripts are worth splitting into parallel chunks
+LONGFORM_MIN_CHARS = int(os.getenv("VOCALBRAND_LONGFORM_MIN_CHARS", "2500"))
+LONGFORM_MAX_WORKERS = int(os.getenv("VOCALBRAND_LONGFORM_WORKERS", "4"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("VOCALBRAND_BATCH_CONCURRENCY", "4"))
+# Transient-failure retries for TTS (timeouts, connection resets, 5xx)
+TTS_RETRIES = int(os.getenv("VOCALBRAND_TTS_RETRIES", "2"))
+TTS_BACKOFF_BASE = float(os.getenv("VOCALBRAND_TTS_BACKOFF_BASE", "0.5"))
+TTS_BACKOFF_CAP = float(os.getenv("VOCALBRAND_TTS_BACKOFF_CAP", "4"))
+# Hedging: after the observed p95 latency, race a duplicate request (off by default: it can double spend)
+TTS_HEDGE = os.getenv("VOCALBRAND_TTS_HEDGE", "0") == "1"
+TTS_HEDGE_PERCENTILE = float(os.getenv("VOCALBRAND_TTS_HEDGE_PERCENTILE", "95"))
+TTS_HEDGE_MIN_DELAY = float(os.getenv("VOCALBRAND_TTS_HEDGE_MIN_DELAY", "1.0"))
+
+
+@dataclass
+class TTSJob:
+    """One clip for ``text_to_speech_batch``."""
+    text: str
+    voice_id: str
+    model_id: Optional[str] = None
+    output_format: Optional[str] = None
+    job_id: Optional[str] = None
+
+
+@dataclass
+class TTSBatchResult:
+    """Outcome of one batch job; ``status`` follows ``text_to_speech`` conventions."""
+    index: int
+    job: TTSJob
+    success: bool
+    audio: Optional[bytes]
+    status: str
+    elapsed: float
+
+
+JobSpec = Union[TTSJob, Sequence[Any], Dict[str, Any]]
+
+
+def _coerce_job(spec: JobSpec) -> TTSJob:
+    if isinstance(spec, TTSJob):
+        return spec
+    if isinstance(spec, dict):
+        return TTSJob(**spec)
+    return TTSJob(*spec)
 
 class VocalBrandEngine:
-    def __init__(self, api_key: str, *, timeout: int = 40, retries: int = 3, voice_manager=None):
+    def __init__(self, api_key: str, *, timeout: int = 40, retries: int = 3, voice_manager=None, transport: Optional[HttpTransport] = None, tts_cache: Optional[TTSCache] = None):
         self.api_key = api_key
         self.timeout = timeout
         self.retries = retries
         self.voice_manager = voice_manager  # Optional VoiceManager for quota handling
+        # Shared keep-alive pool (process-wide unless a transport is injected)
+        self.transport = transport or get_transport()
+        # Content-addressed result cache (None when disabled via VOCALBRAND_TTS_CACHE=0)
+        self.tts_cache = tts_cache if tts_cache is not None else get_tts_cache()
+        self.tts_retries = TTS_RETRIES
+        self.hedge_enabled = TTS_HEDGE
+        # Time to response headers of successful TTS calls; drives the hedge threshold.
+        # Process-wide like the transport (app.py builds an engine per rerun), so the
+        # window actually fills; an injected transport gets its own.
+        self.tts_latency = _TTS_LATENCY if transport is None else LatencyTracker()
         # Updated fallback voices - using current ElevenLabs pre-built voice IDs
         # These are stable voice IDs that exist in all ElevenLabs accounts
         self.fallback_voices = [
@@ -48,9 +126,13 @@ class VocalBrandEngine:
         return {"xi-api-key": self.api_key}
 
     @metrics_collector.timing("clone_voice")
-    def clone_voice(self, audio_file, voice_name: str) -> Dict[str, Any]:
+    def clone_voice(self, audio_file, voice_name: str, *, deadline: Deadline | float | None = None) -> Dict[str, Any]:
         """Clone a voice from audio sample.
         
+        ``deadline`` (a ``Deadline`` or seconds) bounds the whole operation:
+        every upload attempt, backoff sleep and the quota cleanup share it,
+        and the call returns provider ``deadline_exceeded`` once it runs out.
+        
         Returns:
             Dict with keys:
                 - success: True if successfully cloned with ElevenLabs, False if fallback used
@@ -69,13 +151,18 @@ class VocalBrandEngine:
                 "error_detail": "API key not configured or offline mode enabled"
             }
         
+        deadline = Deadline.coerce(deadline)
         attempts = 0
         last_error: Optional[Exception] = None
         last_response_text = ""
         
         while attempts < self.retries:
             try:
-                raw_bytes = audio_file.getvalue() if hasattr(audio_file, "getvalue") else audio_file.read()
+                if hasattr(audio_file, "getvalue"):
+                    raw_bytes = audio_file.getvalue()
+                else:
+                    audio_file.seek(0)  # file-backed samples are re-read on retry
+                    raw_bytes = audio_file.read()
                 
                 # Validate audio data
                 if not raw_bytes or len(raw_bytes) < 4000:  # ~4 KB sanity (very short / invalid)
@@ -90,12 +177,14 @@ class VocalBrandEngine:
                 # Attempt to clone with ElevenLabs
                 files = {"files": (audio_file.name, raw_bytes)}
                 data = {"name": voice_name}
-                resp = requests.post(
+                resp = self.transport.post(
                     ELEVEN_VOICE_ADD_URL,
                     headers=self._headers(),
                     files=files,
                     data=data,
-                    timeout=self.timeout
+                    timeout=self.timeout,
+                    count_latency=False,
+                    deadline=deadline,
                 )
                 
                 last_response_text = resp.text[:500]  # Save for error reporting
@@ -142,7 +231,9 @@ class VocalBrandEngine:
                             
                             if self.voice_manager:
                                 # FORCE cleanup by calling cleanup_oldest_voices directly (not auto_cleanup_if_needed)
-                                cleanup_result = self.voice_manager.cleanup_oldest_voices(keep_count=25)
+                                cleanup_result = self.voice_manager.cleanup_oldest_voices(keep_count=25, deadline=deadline)
+                                if cleanup_result.get("deadline_exceeded"):
+                                    return self._deadline_result(deadline)
                                 
                                 deleted_count = cleanup_result.get("deleted", 0)
                                 confirmed = cleanup_result.get("confirmed", False)
@@ -154,12 +245,14 @@ class VocalBrandEngine:
                                     
                                     # Retry the clone request once
                                     try:
-                                        retry_resp = requests.post(
+                                        retry_resp = self.transport.post(
                                             ELEVEN_VOICE_ADD_URL,
                                             headers=self._headers(),
                                             files=files,
                                             data=data,
-                                            timeout=self.timeout
+                                            timeout=self.timeout,
+                                            count_latency=False,
+                                            deadline=deadline,
                                         )
                                         
                                         if retry_resp.status_code == 200:
@@ -177,6 +270,8 @@ class VocalBrandEngine:
                                                 }
                                         else:
                                             logger.error(f"Retry failed after cleanup: {retry_resp.status_code} - {retry_resp.text[:200]}")
+                                    except DeadlineExceeded:
+                                        return self._deadline_result(deadline)
                                     except Exception as retry_err:
                                         logger.error(f"Retry after cleanup failed: {retry_err}")
                                 else:
@@ -206,6 +301,11 @@ class VocalBrandEngine:
                         "error_detail": last_response_text
                     }
                 
+            except CircuitOpenError as e:
+                # Upstream known-bad: fail fast instead of burning retries and sleeps
+                return self._circuit_open_result(e)
+            except DeadlineExceeded:
+                return self._deadline_result(deadline)
             except requests.Timeout:
                 last_error = Exception(f"Request timeout after {self.timeout}s")
             except Exception as e:
@@ -213,7 +313,10 @@ class VocalBrandEngine:
             
             attempts += 1
             if attempts < self.retries:
-                time.sleep(min(2 ** attempts, 8))
+                try:
+                    bounded_sleep(deadline, min(2 ** attempts, 8))
+                except DeadlineExceeded:
+                    return self._deadline_result(deadline)
         
         # All retries exhausted
         return {
@@ -225,9 +328,12 @@ class VocalBrandEngine:
         }
 
     @metrics_collector.timing("tts")
-    def text_to_speech(self, text: str, voice_id: str, *, model_id: str | None = None, output_format: str | None = None) -> Tuple[bool, Optional[BytesIO], str]:
+    def text_to_speech(self, text: str, voice_id: str, *, model_id: str | None = None, output_format: str | None = None, deadline: Deadline | float | None = None) -> Tuple[bool, Optional[BytesIO], str]:
         """Generate speech from text using a voice ID.
         
+        ``deadline`` bounds the request including retries and backoff; when it
+        runs out the status is ``deadline_exceeded``.
+        
         Returns:
             Tuple of (success, audio_buffer, status_message)
         """
@@ -238,16 +344,16 @@ class VocalBrandEngine:
         if not voice_id or len(voice_id) < 15:
             return False, None, f"invalid_voice_id:{voice_id}"
         
+        cache_key = self._tts_cache_key(text, voice_id, model_id, output_format)
+        cached = self._tts_cache_get(cache_key, text)
+        if cached is not None:
+            return True, BytesIO(cached), "ok_cached"
+        
         payload = {"text": text, "model_id": model_id or DEFAULT_MODEL_ID}
         if output_format:
             payload["output_format"] = output_format
         try:
-            resp = requests.post(
-                ELEVEN_TTS_URL.format(voice_id=voice_id),
-                headers=self._headers(),
-                json=payload,
-                timeout=self.timeout,
-            )
+            resp = self._tts_request(ELEVEN_TTS_URL.format(voice_id=voice_id), payload, deadline=Deadline.coerce(deadline))
             ctype = resp.headers.get('Content-Type','')
             if resp.status_code == 200:
                 # Expect binary (audio/mpeg, audio/*, application/octet-stream)
@@ -261,40 +367,439 @@ class VocalBrandEngine:
                 if len(data) < 50:
                     return False, None, f"tiny_audio:{len(data)}"
                 # Minimal MP3 header sanity (0xFF 0xFB or 'ID3') optional
+                self._tts_cache_put(cache_key, data)
                 head4 = data[:4]
                 if not (head4.startswith(b'ID3') or head4[0] == 0xFF):
                     # Still allow but flag
                     return True, BytesIO(data), f"ok_unusual_header:{head4.hex()}"
                 return True, BytesIO(data), "ok"
-            # Non-200: attempt parse JSON error
-            body_snip = resp.text[:400]
-            err_tag = f"status={resp.status_code}"
-            if 'application/json' in ctype.lower():
-                try:
-                    j = resp.json()
-                    # surface error fields if present
-                    detail = j.get('detail', {})
-                    if isinstance(detail, dict):
-                        error_type = detail.get('status') or detail.get('message') or str(detail)
-                    else:
-                        error_type = str(detail)
-                    
-                    msg = j.get('message') or j.get('error') or error_type or body_snip
-                    
-                    # CRITICAL: Provide actionable error messages
-                    if "voice_not_found" in str(msg).lower() or resp.status_code == 404:
-                        return False, None, f"{err_tag} api_error: Voice ID not found in ElevenLabs account. Please re-clone your voice."
-                    
-                    return False, None, f"{err_tag} api_error: {msg}"[:300]
-                except Exception:
-                    pass
-            return False, None, f"{err_tag} body={body_snip}"[:420]
+            return False, None, self._tts_error_status(resp)
+        except CircuitOpenError as e:
+            return False, None, f"circuit_open:retry_in={e.retry_in:.0f}s"
+        except DeadlineExceeded:
+            metrics_collector.incr("deadline_exceeded")
+            return False, None, "deadline_exceeded"
         except Exception as e:  # noqa: BLE001
             return False, None, f"exception:{str(e)}"
 
+    @metrics_collector.timing("tts_stream_open")
+    def text_to_speech_stream(self, text: str, voice_id: str, *, model_id: str | None = None, output_format: str | None = None, chunk_size: int = 8192, deadline: Deadline | float | None = None) -> Tuple[bool, Optional[Iterator[bytes]], str]:
+        """Stream speech from the ElevenLabs streaming endpoint.
+
+        The request is issued (and its status checked) before returning, so
+        errors surface exactly like ``text_to_speech``. On success the iterator
+        yields audio chunks as they arrive; the connection returns to the pool
+        once the iterator is exhausted or closed. ``deadline`` bounds opening
+        the stream (time to first byte); reading is paced by the caller.
+
+        Returns:
+            Tuple of (success, chunk_iterator, status_message)
+        """
+        if self.offline:
+            return True, iter([self.emergency_sample().getvalue()]), f"offline-simulated:{self.offline_reason}"
+
+        if not voice_id or len(voice_id) < 15:
+            return False, None, f"invalid_voice_id:{voice_id}"
+
+        cache_key = self._tts_cache_key(text, voice_id, model_id, output_format)
+        cached = self._tts_cache_get(cache_key, text)
+        if cached is not None:
+            return True, iter([cached[i:i + chunk_size] for i in range(0, len(cached), chunk_size)]), "ok_cached"
+
+        payload = {"text": text, "model_id": model_id or DEFAULT_MODEL_ID}
+        if output_format:
+            payload["output_format"] = output_format
+        try:
+            resp = self._tts_request(ELEVEN_TTS_STREAM_URL.format(voice_id=voice_id), payload, stream=True, deadline=Deadline.coerce(deadline))
+            if resp.status_code != 200:
+                status = self._tts_error_status(resp)
+                resp.close()
+                return False, None, status
+            if 'json' in resp.headers.get('Content-Type', '').lower():
+                snippet = resp.text[:300]
+                resp.close()
+                return False, None, f"json_body_unexpected:{snippet}"
+            return True, self._iter_audio(resp, chunk_size, cache_key), "ok"
+        except CircuitOpenError as e:
+            return False, None, f"circuit_open:retry_in={e.retry_in:.0f}s"
+        except DeadlineExceeded:
+            metrics_collector.incr("deadline_exceeded")
+            return False, None, "deadline_exceeded"
+        except Exception as e:  # noqa: BLE001
+            return False, None, f"exception:{str(e)}"
+
+    def _tts_request(self, url: str, payload: Dict[str, Any], *, stream: bool = False, deadline: Optional[Deadline] = None) -> requests.Response:
+        """POST a TTS request, retrying transient failures with jittered backoff.
+
+        Timeouts, connection resets and 5xx responses are retried up to
+        ``self.tts_retries`` times (full-jitter exponential backoff). An open
+        circuit or local rate-limit timeout is raised immediately, as is
+        ``DeadlineExceeded`` once ``deadline`` has no budget left.
+        """
+        attempt = 0
+        while True:
+            try:
+                resp = self._tts_post_hedged(url, payload, stream, deadline)
+            except (CircuitOpenError, RateLimitTimeout):
+                raise
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if attempt >= self.tts_retries:
+                    raise
+                logger.info("TTS transient error (attempt %s): %s", attempt + 1, e)
+            else:
+                if resp.status_code < 500 or attempt >= self.tts_retries:
+                    return resp
+                logger.info("TTS upstream %s (attempt %s), retrying", resp.status_code, attempt + 1)
+                resp.close()
+            metrics_collector.incr("tts_retries")
+            bounded_sleep(deadline, random.uniform(0, min(TTS_BACKOFF_CAP, TTS_BACKOFF_BASE * (2 ** attempt))))
+            attempt += 1
+
+    def _tts_post_once(self, url: str, payload: Dict[str, Any], stream: bool, deadline: Optional[Deadline] = None) -> requests.Response:
+        """POST once; the body is read here unless ``stream``.
+
+        The request itself always streams, so the latency sample is time to
+        response headers whatever the caller asked for - the same thing the
+        hedge waits on.
+        """
+        start = time.perf_counter()
+        resp = self.transport.post(url, headers=self._headers(), json=payload, timeout=self.timeout, stream=True, deadline=deadline)
+        if resp.status_code == 200:
+            self.tts_latency.observe(time.perf_counter() - start)
+        if not stream:
+            resp.content  # noqa: B018 - download the body now, as a non-streamed request would
+        return resp
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before sending a hedge request, or None if hedging is off / not enough data."""
+        if not self.hedge_enabled:
+            return None
+        p = self.tts_latency.percentile(TTS_HEDGE_PERCENTILE)
+        return None if p is None else max(TTS_HEDGE_MIN_DELAY, p)
+
+    def _tts_post_hedged(self, url: str, payload: Dict[str, Any], stream: bool, deadline: Optional[Deadline] = None) -> requests.Response:
+        """Send the request; if it outlives the p95 threshold, race a duplicate.
+
+        Both requests use ``stream=True`` so the loser can be cancelled by
+        closing its response (the body is never downloaded).
+        """
+        delay = self.hedge_delay()
+        if delay is not None and deadline is not None and delay >= deadline.remaining():
+            delay = None  # a hedge fired this late could not finish inside the budget
+        if delay is None:
+            return self._tts_post_once(url, payload, stream, deadline)
+        pool = _hedge_executor()
+        primary = pool.submit(self._tts_post_once, url, payload, True, deadline)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        metrics_collector.incr("tts_hedged")
+        backup = pool.submit(self._tts_post_once, url, payload, True, deadline)
+        pending = {primary, backup}
+        fallback: Optional[Future] = None
+        last_error: Optional[BaseException] = None
+        winner: Optional[Future] = None
+        while pending and winner is None:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                try:
+                    resp = fut.result()
+                except Exception as e:  # noqa: BLE001
+                    last_error = e
+                    continue
+                if resp.status_code >= 500 and pending:
+                    # Keep a 5xx only as a last resort while the other request is still running
+                    fallback = fut
+                    continue
+                winner = fut
+                break
+        winner = winner or fallback
+        for fut in (primary, backup):
+            if fut is not winner:
+                fut.cancel()
+                fut.add_done_callback(_close_response)
+        if winner is None:
+            raise last_error or requests.ConnectionError("hedged TTS request failed")
+        if winner is backup:
+            metrics_collector.incr("tts_hedge_wins")
+        return winner.result()
+
+    def _iter_audio(self, resp, chunk_size: int, cache_key: Optional[str] = None) -> Iterator[bytes]:
+        parts = []
+        try:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        finally:
+            resp.close()
+        # Only reached when the stream completed; partial audio is never cached
+        data = b"".join(parts)
+        if len(data) >= 50:
+            self._tts_cache_put(cache_key, data)
+
+    def _tts_cache_key(self, text: str, voice_id: str, model_id: str | None, output_format: str | None) -> Optional[str]:
+        if self.tts_cache is None:
+            return None
+        return make_cache_key(voice_id, model_id or DEFAULT_MODEL_ID, output_format or DEFAULT_OUTPUT_FORMAT, text)
+
+    def _tts_cache_get(self, cache_key: Optional[str], text: str) -> Optional[bytes]:
+        if self.tts_cache is None or cache_key is None:
+            return None
+        data = self.tts_cache.get(cache_key)
+        if data is not None:
+            metrics_collector.incr("tts_cache_chars_saved", len(text))
+        return data
+
+    def _tts_cache_put(self, cache_key: Optional[str], data: bytes) -> None:
+        if self.tts_cache is not None and cache_key is not None:
+            self.tts_cache.put(cache_key, data)
+
+    @staticmethod
+    def _tts_error_status(resp) -> str:
+        """Build the status string for a non-200 TTS response."""
+        ctype = resp.headers.get('Content-Type','')
+        body_snip = resp.text[:400]
+        err_tag = f"status={resp.status_code}"
+        if 'application/json' in ctype.lower():
+            try:
+                j = resp.json()
+                # surface error fields if present
+                detail = j.get('detail', {})
+                if isinstance(detail, dict):
+                    error_type = detail.get('status') or detail.get('message') or str(detail)
+                else:
+                    error_type = str(detail)
+                
+                msg = j.get('message') or j.get('error') or error_type or body_snip
+                
+                # CRITICAL: Provide actionable error messages
+                if "voice_not_found" in str(msg).lower() or resp.status_code == 404:
+                    return f"{err_tag} api_error: Voice ID not found in ElevenLabs account. Please re-clone your voice."
+                
+                return f"{err_tag} api_error: {msg}"[:300]
+            except Exception:
+                pass
+        return f"{err_tag} body={body_snip}"[:420]
+
+    @metrics_collector.timing("tts_long")
+    def text_to_speech_long(
+        self,
+        text: str,
+        voice_id: str,
+        *,
+        model_id: str | None = None,
+        output_format: str | None = None,
+        chunk_chars: int | None = None,
+        max_workers: int | None = None,
+        deadline: Deadline | float | None = None,
+        on_audio: Optional[Callable[[bytes], None]] = None,
+    ) -> Tuple[bool, Optional[BytesIO], str]:
+        """Synthesize a long script as parallel sentence-aligned chunks.
+
+        Chunks are generated concurrently through a bounded worker pool, then
+        stitched back together in order. Each chunk is one ``text_to_speech``
+        call, so transient failures are retried there and nowhere else. Short
+        texts (a single chunk) go straight through ``text_to_speech``.
+        All chunks share one ``deadline``; if it runs out the whole call
+        reports ``deadline_exceeded``.
+
+        ``on_audio`` receives the stitched audio in order as soon as each
+        leading chunk is ready (MP3/PCM only), so playback can start before
+        the last chunk arrives. Formats that cannot be stitched are rejected
+        before any request is made.
+
+        Returns:
+            Tuple of (success, audio_buffer, status_message)
+        """
+        fmt = output_format or DEFAULT_OUTPUT_FORMAT
+        if not _stitchable(fmt):
+            return False, None, f"unsupported_longform_format:{fmt}"
+        limit = MODEL_CHAR_LIMITS.get(model_id or DEFAULT_MODEL_ID, DEFAULT_CHAR_LIMIT)
+        chunks = split_text(text, target_chars=chunk_chars or LONGFORM_CHUNK_CHARS, max_chars=limit)
+        deadline = Deadline.coerce(deadline)
+        if len(chunks) <= 1:
+            ok, buf, status = self.text_to_speech(text, voice_id, model_id=model_id, output_format=output_format, deadline=deadline)
+            if ok and buf is not None and on_audio is not None:
+                on_audio(buf.getvalue())
+            return ok, buf, status
+        progressive = on_audio is not None and not _is_wav(fmt)
+
+        def _synthesize(chunk: str) -> Tuple[bool, bytes, str]:
+            ok, buf, status = self.text_to_speech(chunk, voice_id, model_id=model_id, output_format=output_format, deadline=deadline)
+            return bool(ok and buf is not None), buf.getvalue() if ok and buf is not None else b"", status
+
+        workers = max(1, min(max_workers or LONGFORM_MAX_WORKERS, len(chunks)))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vb-tts-long")
+        parts: List[bytes] = []
+        try:
+            futures = [pool.submit(_synthesize, chunk) for chunk in chunks]
+            for idx, fut in enumerate(futures):  # in order: each finished prefix can be played
+                ok, data, status = fut.result()
+                if not ok:
+                    if status == "deadline_exceeded":
+                        return False, None, status
+                    return False, None, f"chunk_failed:{idx + 1}/{len(chunks)}:{status}"[:420]
+                parts.append(data)
+                if progressive:
+                    on_audio(_stitch_part(idx, data, fmt))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)  # after a failure, unstarted chunks are dropped
+        audio = stitch_audio(parts, fmt)
+        if on_audio is not None and not progressive:
+            on_audio(audio)
+        return True, BytesIO(audio), f"ok_long:{len(chunks)}_chunks"
+
+    def text_to_speech_batch(self, jobs: Iterable[JobSpec], *, max_concurrency: int | None = None, deadline: Deadline | float | None = None) -> Iterator[TTSBatchResult]:
+        """Run many TTS jobs concurrently, yielding results as they complete.
+
+        ``jobs`` may contain ``TTSJob`` objects, ``(text, voice_id, model_id,
+        output_format)`` tuples or dicts with the same keys. Results arrive in
+        completion order; use ``result.index`` (position in ``jobs``) to map
+        them back. Closing the iterator early cancels jobs not yet started.
+        A ``deadline`` covers the whole batch; jobs still queued when it runs
+        out finish immediately with ``deadline_exceeded``. Jobs and the
+        deadline are validated when this is called, not on the first ``next()``.
+        """
+        deadline = Deadline.coerce(deadline)
+        job_list = [_coerce_job(j) for j in jobs]
+        if not job_list:
+            return iter(())
+
+        def _run(index: int, job: TTSJob) -> TTSBatchResult:
+            start = time.perf_counter()
+            try:
+                ok, buf, status = self.text_to_speech(job.text, job.voice_id, model_id=job.model_id, output_format=job.output_format, deadline=deadline)
+            except Exception as e:  # noqa: BLE001
+                ok, buf, status = False, None, f"exception:{str(e)}"
+            return TTSBatchResult(
+                index=index,
+                job=job,
+                success=bool(ok and buf is not None),
+                audio=buf.getvalue() if (ok and buf is not None) else None,
+                status=status,
+                elapsed=time.perf_counter() - start,
+            )
+
+        workers = max(1, min(max_concurrency or BATCH_MAX_CONCURRENCY, len(job_list)))
+
+        def _results() -> Iterator[TTSBatchResult]:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vb-tts-batch")
+            try:
+                futures = [pool.submit(_run, i, job) for i, job in enumerate(job_list)]
+                for fut in as_completed(futures):
+                    yield fut.result()
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        return _results()
+
+    def _circuit_open_result(self, err: CircuitOpenError) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "voice_id": None,
+            "provider": "circuit_open",
+            "message": f"ElevenLabs is temporarily unavailable. Please try again in about {err.retry_in:.0f}s.",
+            "error_detail": str(err),
+        }
+
+    def _deadline_result(self, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        metrics_collector.incr("deadline_exceeded")
+        budget = f"{deadline.budget:.0f}s" if deadline is not None else "the time budget"
+        return {
+            "success": False,
+            "voice_id": None,
+            "provider": "deadline_exceeded",
+            "message": f"Voice cloning did not finish within {budget}. Please try again.",
+            "error_detail": "deadline_exceeded",
+        }
+
+    def breaker_status(self) -> Optional[Dict[str, Any]]:
+        """Snapshot of the upstream circuit breaker (None when disabled)."""
+        breaker = getattr(self.transport, "breaker", None)
+        return breaker.snapshot() if breaker is not None else None
+
     def _fallback_voice(self) -> str:
         return self.fallback_voices[0]
 
     def emergency_sample(self) -> BytesIO:
         # Very small silent placeholder or beep (placeholder bytes)
         return BytesIO(b"RIFF....VocalBrandFallback")
+
+
+_TTS_LATENCY = LatencyTracker()
+_HEDGE_POOL: Optional[ThreadPoolExecutor] = None
+_HEDGE_POOL_LOCK = threading.Lock()
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for hedged requests (engines come and go with reruns)."""
+    global _HEDGE_POOL
+    if _HEDGE_POOL is None:
+        with _HEDGE_POOL_LOCK:
+            if _HEDGE_POOL is None:
+                _HEDGE_POOL = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("VOCALBRAND_TTS_HEDGE_WORKERS", "8")),
+                    thread_name_prefix="vb-tts-hedge",
+                )
+    return _HEDGE_POOL
+
+
+def _close_response(fut: Future) -> None:
+    """Done-callback that releases the connection held by a losing hedge request."""
+    if fut.cancelled():
+        return
+    try:
+        fut.result().close()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _strip_id3v2(data: bytes) -> bytes:
+    """Drop a leading ID3v2 tag so concatenated MP3 parts stay a clean frame stream."""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return data[10 + size + footer:]
+    return data
+
+
+def _is_wav(fmt: str) -> bool:
+    return fmt.lower().startswith("wav")
+
+
+def _stitchable(fmt: str) -> bool:
+    return fmt.lower().startswith(("mp3", "pcm", "ulaw", "wav"))
+
+
+def _stitch_part(index: int, data: bytes, fmt: str) -> bytes:
+    """Bytes that part ``index`` contributes to the stitched stream (MP3/PCM)."""
+    if index and fmt.lower().startswith("mp3"):
+        return _strip_id3v2(data)
+    return data
+
+
+def stitch_audio(parts: List[bytes], output_format: str) -> bytes:
+    """Join ordered audio parts produced with the same output format.
+
+    MP3 frames and headerless PCM concatenate byte-wise; WAV parts are
+    rejoined under a single header. The result keeps ``output_format``;
+    other formats raise ValueError.
+    """
+    if not parts:
+        return b""
+    fmt = (output_format or "").lower()
+    if not _stitchable(fmt):
+        raise ValueError(f"cannot stitch {output_format!r} audio")
+    if not _is_wav(fmt):
+        return b"".join(_stitch_part(i, p, fmt) for i, p in enumerate(parts))
+    out = BytesIO()
+    with wave.open(out, "wb") as dst:
+        for i, p in enumerate(parts):
+            with wave.open(BytesIO(p), "rb") as src:
+                if i == 0:
+                    dst.setparams(src.getparams())
+                elif src.getparams()[:3] != dst.getparams()[:3]:
+                    raise ValueError("WAV parts differ in channels, sample width or rate")
+                dst.writeframes(src.readframes(src.getnframes()))
+    return out.getvalue()
@@ -1,8 +1,10 @@
 """Lightweight performance metrics collection for VocalBrand."""
 from __future__ import annotations
 import time
+import threading
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Callable, Any
+from typing import Deque, Dict, List, Callable, Any, Optional
 
 @dataclass
 class MetricRecord:
@@ -14,6 +16,9 @@ class MetricRecord:
 class MetricsCollector:
     def __init__(self):
         self.records: List[MetricRecord] = []
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
 
     def timing(self, name: str):
         def wrapper(func: Callable):
@@ -34,12 +39,49 @@ class MetricsCollector:
             return inner
         return wrapper
 
+    def incr(self, name: str, amount: float = 1) -> None:
+        """Increment a named counter (thread-safe)."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, value: float) -> None:
+        """Record the latest value of a named gauge (thread-safe)."""
+        with self._lock:
+            self.gauges[name] = value
+
     def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
         if not self.records:
-            return {"count": 0}
+            return {"count": 0, "counters": counters, "gauges": gauges}
         total = len(self.records)
         avg = sum(r.elapsed for r in self.records) / total
         failures = sum(1 for r in self.records if not r.success)
-        return {"count": total, "avg_sec": round(avg,3), "failures": failures}
+        return {"count": total, "avg_sec": round(avg,3), "failures": failures, "counters": counters, "gauges": gauges}
+
+class LatencyTracker:
+    """Rolling window of recent latencies with percentile lookup (thread-safe)."""
+
+    def __init__(self, maxlen: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile, or None until ``min_samples`` were observed."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+        return ordered[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
 
 metrics_collector = MetricsCollector()
@@ -0,0 +1,49 @@
+import os, sys, math
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pytest
+
+import utils.analysis_cache as ac  # type: ignore
+from metrics import metrics_collector  # type: ignore
+
+
+def _wav(seconds, sample_rate=16000, amp=0.25):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    data = (amp * 32767 * np.sin(2 * math.pi * 440 * t)).astype("<i2").tobytes()
+    header = (
+        b"RIFF" + (36 + len(data)).to_bytes(4, "little") + b"WAVEfmt "
+        + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+        + sample_rate.to_bytes(4, "little") + (sample_rate * 2).to_bytes(4, "little")
+        + (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+        + b"data" + len(data).to_bytes(4, "little")
+    )
+    return header + data
+
+
+def test_hit_does_no_audio_work(monkeypatch):
+    cache = ac.AnalysisCache(max_bytes=64 * 1024 * 1024)
+    raw = _wav(6.0)
+    first = cache.analyze(raw)
+    assert first.validation(raw)["ok"] and len(first.peaks(800)) == 1600
+    monkeypatch.setattr(ac, "analyze_audio", lambda *a, **k: pytest.fail("decoded on cache hit"))
+    monkeypatch.setattr(first.analysis, "peaks", lambda *a, **k: pytest.fail("peaks recomputed"))
+    hits = metrics_collector.counters.get("analysis_cache_hit", 0)
+    again = cache.analyze(raw)
+    assert again is first and again.peaks(800) == first.peaks(800)
+    assert metrics_collector.counters.get("analysis_cache_hit", 0) == hits + 1
+
+
+def test_evicts_lru_by_bytes():
+    one = ac.AnalysisCache(max_bytes=1).put("x", ac.analyze_audio(_wav(6.0))).nbytes
+    cache = ac.AnalysisCache(max_bytes=2 * one + 1)
+    a, b, c = _wav(6.0), _wav(6.0, amp=0.2), _wav(6.0, amp=0.3)
+    cache.analyze(a)
+    cache.analyze(b)
+    cache.analyze(a)  # a becomes most recent
+    cache.analyze(c)
+    assert cache.get(ac.sample_digest(b)) is None
+    assert cache.get(ac.sample_digest(a)) is not None and cache.stats()["bytes"] <= cache.max_bytes
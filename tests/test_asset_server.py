@@ -0,0 +1,95 @@
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+import requests
+
+from utils.asset_server import AssetServer, parse_range  # type: ignore
+from utils.sample_store import SampleStore  # type: ignore
+
+
+@pytest.fixture()
+def served(tmp_path):
+    store = SampleStore(tmp_path)
+    server = AssetServer(store, port=0).start()
+    try:
+        yield store, server
+    finally:
+        server.stop()
+
+
+def _mp3_like(n=100_000):
+    return b"ID3" + bytes(i % 251 for i in range(n - 3))
+
+
+def test_parse_range():
+    assert parse_range("", 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None  # multi-range: whole body
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+def test_full_and_ranged_responses(served):
+    store, server = served
+    data = _mp3_like()
+    clip = store.put(data)
+    url = server.url(clip.digest)
+    r = requests.get(url, timeout=5)
+    assert r.status_code == 200 and r.content == data
+    assert r.headers["Content-Type"] == "audio/mpeg"
+    assert r.headers["ETag"] == f'"{clip.digest}"'
+    assert "immutable" in r.headers["Cache-Control"] and r.headers["Accept-Ranges"] == "bytes"
+
+    r = requests.get(url, headers={"Range": "bytes=1000-1999"}, timeout=5)
+    assert r.status_code == 206 and r.content == data[1000:2000]
+    assert r.headers["Content-Range"] == f"bytes 1000-1999/{len(data)}"
+
+    r = requests.get(url, headers={"Range": f"bytes={len(data)}-"}, timeout=5)
+    assert r.status_code == 416
+
+    r = requests.get(url, headers={"If-None-Match": f'"{clip.digest}"'}, timeout=5)
+    assert r.status_code == 304 and not r.content
+
+
+def test_download_and_unknown_assets(served):
+    store, server = served
+    clip = store.put(_mp3_like(5000))
+    r = requests.head(server.url(clip.digest, download="my take?.mp3"), timeout=5)
+    assert r.status_code == 200 and r.headers["Content-Length"] == "5000"
+    assert r.headers["Content-Disposition"] == 'attachment; filename="my_take_.mp3"'
+    assert requests.get(server.url("0" * 40), timeout=5).status_code == 404
+    assert requests.get(f"{server.base_url}/a/{clip.digest}", timeout=5).status_code == 404  # unsigned
+    assert requests.get(f"{server.base_url}/a/{clip.digest}?sig={'0' * 32}", timeout=5).status_code == 404
+    assert requests.get(f"{server.base_url}/a/../../etc/passwd", timeout=5).status_code == 404
+
+
+def test_live_asset_streams_while_growing_then_redirects(served):
+    store, server = served
+    live = server.open_live("audio/mpeg")
+    live.append(b"ID3" + b"a" * 997)
+    r = requests.get(server.live_url(live.token), stream=True, timeout=5)
+    assert r.status_code == 200 and r.headers["Content-Type"] == "audio/mpeg"
+    body = r.raw.read(1000)  # the first chunk plays before the clip is complete
+    assert body[:3] == b"ID3" and not live.finished
+    live.append(b"b" * 1000)
+    clip = store.put(body + b"b" * 1000)
+    live.finish(clip.digest)
+    assert body + r.raw.read() == clip.view().tobytes()
+
+    again = requests.get(server.live_url(live.token), timeout=5)  # finished: served from the store
+    assert again.history[0].status_code == 302 and again.content == clip.view().tobytes()
+
+
+def test_abandoned_and_unknown_live_assets(served):
+    _, server = served
+    live = server.open_live("audio/mpeg")
+    live.finish(None)
+    assert requests.get(server.live_url(live.token), timeout=5).status_code == 404
+    assert requests.get(server.live_url("x" * 22), timeout=5).status_code == 404
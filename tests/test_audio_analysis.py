@@ -0,0 +1,83 @@
+import os, sys, math, struct
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pydub")
+
+from utils.audio_analysis import AudioAnalysis, analyze_audio  # type: ignore
+from utils.audio_utils import validate_audio_bytes  # type: ignore
+
+
+def _wav(samples, sample_rate=16000):
+    data = np.asarray(samples, dtype="<i2").tobytes()
+    header = (
+        b"RIFF" + (36 + len(data)).to_bytes(4, "little") + b"WAVEfmt "
+        + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+        + sample_rate.to_bytes(4, "little") + (sample_rate * 2).to_bytes(4, "little")
+        + (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+        + b"data" + len(data).to_bytes(4, "little")
+    )
+    return header + data
+
+
+def _tone(seconds, sample_rate=16000, amp=0.25):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amp * 32767 * np.sin(2 * math.pi * 440 * t)).astype(np.int16)
+
+
+def test_metrics_match_pydub():
+    from pydub import AudioSegment  # type: ignore
+    from io import BytesIO
+    raw = _wav(_tone(6.0))
+    a = analyze_audio(raw)
+    seg = AudioSegment.from_file(BytesIO(raw), format="wav")
+    assert a.channels == 1 and a.sample_rate == 16000
+    assert abs(a.duration - 6.0) < 1e-6
+    assert abs(a.dbfs - seg.dBFS) < 0.01 and abs(a.peak_dbfs - seg.max_dBFS) < 0.01
+    assert len(a.envelope(1200)) == 1200 and float(np.max(np.abs(a.envelope(1200)))) <= 1.0
+
+
+def test_validation_reuses_analysis():
+    raw = _wav(_tone(6.0))
+    a = analyze_audio(raw)
+    res = validate_audio_bytes(raw, analysis=a)
+    assert res["ok"] and abs(res["duration"] - 6.0) < 1e-6 and res["loudness_dbfs"] == a.dbfs
+
+
+def test_silence_bounds_and_slice():
+    sr = 16000
+    pcm = np.concatenate([np.zeros(sr, np.int16), _tone(2.0, sr), np.zeros(sr, np.int16)])
+    a = AudioAnalysis(pcm, sr)
+    start, end = a.silence_bounds(thresh_dbfs=-40, window_ms=20, pad_ms=20)
+    assert abs(start - 980) <= 25 and abs(end - 3020) <= 25
+    sliced = analyze_audio(a.to_wav(start, end))
+    assert abs(sliced.duration - (end - start) / 1000) < 0.01
+    assert AudioAnalysis(np.zeros(sr, np.int16), sr).silence_bounds() is None
+
+
+def test_silence_bounds_hysteresis_and_clicks():
+    sr = 16000
+    quiet_tail = (_tone(0.3, sr, amp=0.012)).astype(np.int16)  # ~-41 dBFS: below open, above close threshold
+    click = np.zeros(sr, np.int16)
+    click[8000:8080] = 20000  # 5 ms pop well before speech
+    pcm = np.concatenate([click, _tone(1.0, sr), quiet_tail, np.zeros(sr, np.int16)])
+    a = AudioAnalysis(pcm, sr)
+    start, end = a.silence_bounds(thresh_dbfs=-40, hysteresis_db=6, pad_ms=0)
+    assert abs(start - 1000) <= 25 and abs(end - 2300) <= 25
+    start, end = a.silence_bounds(thresh_dbfs=-40, hysteresis_db=0, pad_ms=0)
+    assert abs(end - 2000) <= 25
+    trimmed = a.trim(start, end)
+    assert abs(trimmed.duration - (end - start) / 1000) < 0.001
+    assert np.shares_memory(trimmed.pcm, a.pcm)
+
+
+def test_waveform_peaks_compact():
+    raw = _wav(_tone(3.0))
+    peaks = analyze_audio(raw).peaks(800)
+    assert peaks.dtype == np.int8 and peaks.shape == (800, 2)
+    assert int(peaks.max()) == 127 and np.all(peaks[:, 0] <= peaks[:, 1])
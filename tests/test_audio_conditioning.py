@@ -0,0 +1,48 @@
+import os, sys, math, struct
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+from utils.audio_conditioning import condition_for_clone  # type: ignore
+
+pytest.importorskip("pydub")
+
+
+def _stereo_wav(duration_sec=3.0, sample_rate=48000, amp=0.05):
+    frames = bytearray()
+    for i in range(int(duration_sec * sample_rate)):
+        v = int(32767 * amp * math.sin(2 * math.pi * 220 * i / sample_rate))
+        frames += struct.pack("<hh", v, v)
+    data = bytes(frames)
+    header = (
+        b"RIFF" + (36 + len(data)).to_bytes(4, "little") + b"WAVEfmt "
+        + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (2).to_bytes(2, "little")
+        + sample_rate.to_bytes(4, "little") + (sample_rate * 4).to_bytes(4, "little")
+        + (4).to_bytes(2, "little") + (16).to_bytes(2, "little")
+        + b"data" + len(data).to_bytes(4, "little")
+    )
+    return header + data
+
+
+def test_conditioning_shrinks_and_normalizes():
+    from pydub import AudioSegment  # type: ignore
+    raw = _stereo_wav()
+    out = condition_for_clone(raw, filename="take.wav", fmt="wav", target_rate=24000, target_dbfs=-16)
+    assert out.info["applied"] and out.filename == "take.wav"
+    # stereo 48 kHz -> mono 24 kHz: a quarter of the PCM bytes
+    assert out.info["bytes_out"] < len(raw) / 3
+    seg = AudioSegment.from_file(BytesIO(out.data), format="wav")
+    assert seg.channels == 1 and seg.frame_rate == 24000
+    assert abs(seg.dBFS - -16) < 1.0 and seg.max_dBFS <= -0.9
+
+
+def test_conditioning_passthrough_on_garbage(monkeypatch):
+    junk = b"\x01\x02" * 20000
+    out = condition_for_clone(junk, fmt="wav")
+    assert out.data is junk and out.info["applied"] is False
+    monkeypatch.setenv("VOCALBRAND_CLONE_CONDITIONING", "0")
+    raw = _stereo_wav(0.5)
+    assert condition_for_clone(raw).data is raw
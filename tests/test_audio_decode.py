@@ -0,0 +1,72 @@
+import os, sys, struct
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pytest
+
+from utils.audio_decode import WavFormatError, decode_wav, sniff_format  # type: ignore
+
+
+def _wav(payload: bytes, *, channels=1, rate=16000, bits=16, tag=1, extra_chunk=b"", data_size=None):
+    block = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", tag, channels, rate, rate * block, block, bits)
+    size = len(payload) if data_size is None else data_size
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra_chunk + b"data" + struct.pack("<I", size) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+@pytest.mark.parametrize("head, fmt", [
+    (b"RIFF\x00\x00\x00\x00WAVE", "wav"),
+    (b"\x1a\x45\xdf\xa3\x01\x00", "webm"),
+    (b"\x00\x00\x00\x20ftypisom", "mp4"),
+    (b"OggS\x00\x02", "ogg"),
+    (b"fLaC\x00\x00", "flac"),
+    (b"ID3\x04\x00\x00", "mp3"),
+    (b"\xff\xfb\x90\x64", "mp3"),
+    (b"hello world", None),
+])
+def test_sniff_format(head, fmt):
+    assert sniff_format(head) == fmt
+
+
+def test_pcm16_is_zero_copy_view():
+    samples = np.array([[0, 1], [-2, 3], [32767, -32768]], dtype="<i2")
+    data = _wav(samples.tobytes(), channels=2, extra_chunk=b"LIST" + struct.pack("<I", 3) + b"abc\x00")
+    pcm, rate = decode_wav(data)
+    assert rate == 16000 and pcm.shape == (3, 2)
+    assert np.array_equal(pcm, samples)
+    assert not pcm.flags.owndata  # a view onto ``data``, not a copy
+
+
+def test_other_encodings_convert_to_int16():
+    pcm24 = b"".join(struct.pack("<i", v)[:3] for v in (0, 256 * 1000, -256 * 1000))
+    pcm, _ = decode_wav(_wav(pcm24, bits=24))
+    assert pcm[:, 0].tolist() == [0, 1000, -1000]
+    floats = np.array([0.0, 0.5, -1.0], dtype="<f4").tobytes()
+    pcm, _ = decode_wav(_wav(floats, bits=32, tag=3))
+    assert pcm[:, 0].tolist() == [0, 16383, -32767]
+
+
+def test_streaming_size_placeholder_is_clamped():
+    payload = np.arange(10, dtype="<i2").tobytes()
+    pcm, _ = decode_wav(_wav(payload, data_size=0xFFFFFFFF))
+    assert pcm[:, 0].tolist() == list(range(10))
+
+
+def test_rejects_unsupported_layouts():
+    with pytest.raises(WavFormatError):
+        decode_wav(b"not a wav at all")
+    with pytest.raises(WavFormatError):
+        decode_wav(_wav(b"\x00" * 8, tag=0x55))  # MPEG-in-WAV
+
+
+def test_native_path_skips_ffmpeg():
+    from metrics import metrics_collector  # type: ignore
+    from utils.audio_analysis import analyze_audio  # type: ignore
+    before = metrics_collector.counters.get("audio_decode_ffmpeg", 0)
+    a = analyze_audio(_wav(np.zeros(16000, dtype="<i2").tobytes()))
+    assert a.duration == 1.0
+    assert metrics_collector.counters.get("audio_decode_ffmpeg", 0) == before
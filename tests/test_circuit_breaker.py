@@ -0,0 +1,40 @@
+import os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN  # type: ignore
+
+
+def test_trips_on_error_rate_and_fails_fast():
+    cb = CircuitBreaker(min_calls=4, failure_rate=0.5, open_seconds=60)
+    for ok in (True, False, True, False):
+        assert cb.allow()
+        cb.record(ok, 0.1)
+    assert cb.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        cb.check()
+
+
+def test_trips_on_latency_unless_exempt():
+    cb = CircuitBreaker(window=3, min_calls=3, slow_call_sec=1.0, slow_rate=0.6)
+    for _ in range(3):
+        cb.record(True, 5.0, count_latency=False)
+    assert cb.state == CLOSED
+    for _ in range(3):
+        cb.record(True, 5.0)
+    assert cb.state == OPEN
+
+
+def test_half_open_single_probe_recovers():
+    cb = CircuitBreaker(min_calls=2, open_seconds=0.05)
+    cb.record(False)
+    cb.record(False)
+    assert cb.state == OPEN
+    time.sleep(0.06)
+    assert cb.allow() and cb.state == HALF_OPEN
+    assert not cb.allow()  # only one probe at a time
+    cb.record(True, 0.1)
+    assert cb.state == CLOSED
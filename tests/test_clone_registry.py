@@ -0,0 +1,83 @@
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+import db_adapter  # type: ignore
+import auth  # type: ignore
+from voice_manager import VoiceManager  # type: ignore
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    if db_adapter.db_adapter.use_postgres:
+        pytest.skip("registry test runs against SQLite only")
+    monkeypatch.setattr(db_adapter, "DB_PATH", str(tmp_path / "registry.db"))
+    auth.init_db()
+
+
+def test_registry_roundtrip(temp_db):
+    assert auth.find_cloned_voice(1, "abc") is None
+    assert auth.record_cloned_voice(1, "abc", "voice_one", "Mine", "elevenlabs_primary")
+    assert auth.find_cloned_voice(1, "abc")["voice_id"] == "voice_one"
+    # Other users never see each other's clones
+    assert auth.find_cloned_voice(2, "abc") is None
+    # Re-cloning the same sample repoints the existing row
+    assert auth.record_cloned_voice(1, "abc", "voice_two", "Mine", "elevenlabs_primary")
+    assert auth.find_cloned_voice(1, "abc")["voice_id"] == "voice_two"
+    auth.forget_cloned_voice("voice_two")
+    assert auth.find_cloned_voice(1, "abc") is None
+
+
+class _Resp:
+    def __init__(self, status, text=""):
+        self.status_code = status
+        self.text = text
+
+
+class _Transport:
+    def __init__(self, resp):
+        self.resp = resp
+
+    def get(self, url, **kwargs):
+        if isinstance(self.resp, Exception):
+            raise self.resp
+        return self.resp
+
+
+def test_voice_exists_tristate():
+    assert VoiceManager("sk_test", transport=_Transport(_Resp(200))).voice_exists("v") is True
+    assert VoiceManager("sk_test", transport=_Transport(_Resp(404))).voice_exists("v") is False
+    assert VoiceManager("sk_test", transport=_Transport(_Resp(400, '{"detail":{"status":"voice_not_found"}}'))).voice_exists("v") is False
+    assert VoiceManager("sk_test", transport=_Transport(_Resp(503))).voice_exists("v") is None
+    assert VoiceManager("sk_test", transport=_Transport(ConnectionError("down"))).voice_exists("v") is None
+
+
+def test_voice_library_keyset_pages(temp_db):
+    for i in range(5):
+        assert auth.save_user_voice(7, f"voice_{i}", f"Voice {i}", "elevenlabs_primary")
+    auth.save_user_voice(8, "someone_else", "Other", None)
+    # Re-saving updates in place instead of duplicating
+    auth.save_user_voice(7, "voice_4", "Renamed", None)
+
+    page, cursor = auth.list_user_voices(7, limit=2)
+    assert [v["voice_id"] for v in page] == ["voice_4", "voice_3"] and page[0]["label"] == "Renamed"
+    page, cursor = auth.list_user_voices(7, before_id=cursor, limit=2)
+    assert [v["voice_id"] for v in page] == ["voice_2", "voice_1"]
+    page, cursor = auth.list_user_voices(7, before_id=cursor, limit=2)
+    assert [v["voice_id"] for v in page] == ["voice_0"] and cursor is None
+
+    auth.remove_user_voice(7, "voice_0")
+    assert len(auth.list_user_voices(7, limit=10)[0]) == 4
+
+
+def test_generation_history_keyset_pages(temp_db):
+    for i in range(3):
+        auth.record_tts_generation(7, "voice_1", f"prompt {i}", "ok", "mp3_44100_128", 1000 + i)
+    page, cursor = auth.list_tts_generations(7, limit=2)
+    assert [g["prompt"] for g in page] == ["prompt 2", "prompt 1"] and cursor is not None
+    page, cursor = auth.list_tts_generations(7, before_id=cursor, limit=2)
+    assert [g["prompt"] for g in page] == ["prompt 0"] and cursor is None
+    assert auth.list_tts_generations(8)[0] == []
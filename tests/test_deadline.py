@@ -0,0 +1,83 @@
+import os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+from utils.deadline import Deadline, DeadlineExceeded  # type: ignore
+from utils.http_transport import HttpTransport  # type: ignore
+from voice_manager import VoiceManager  # type: ignore
+
+
+def test_clip_and_expiry():
+    d = Deadline(0.2)
+    assert Deadline.coerce(d) is d and Deadline.coerce(None) is None
+    assert d.clip(10) <= 0.2
+    assert d.clip(0.05) == 0.05
+    time.sleep(0.25)
+    assert d.expired() and d.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        d.clip(1)
+
+
+def test_sleep_never_outlasts_budget():
+    d = Deadline(0.1)
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        d.sleep(5)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_transport_refuses_spent_deadline():
+    transport = HttpTransport()
+    d = Deadline(0)
+    with pytest.raises(DeadlineExceeded):
+        transport.get("http://127.0.0.1:9/", deadline=d)
+
+
+class _VoicesResponse:
+    status_code = 200
+
+    def json(self):
+        return {"voices": [{"voice_id": f"v{i}", "category": "cloned"} for i in range(30)]}
+
+
+class _VoicesTransport:
+    def get(self, url, **kwargs):
+        if kwargs.get("deadline") is not None:
+            kwargs["deadline"].check()
+        return _VoicesResponse()
+
+
+def test_quota_poll_stops_at_deadline():
+    vm = VoiceManager("sk_test", transport=_VoicesTransport())
+    start = time.perf_counter()
+    result = vm.wait_until_quota_below(keep_count=25, timeout=25, interval=0.05, deadline=0.3)
+    assert not result["within_limit"] and result["deadline_exceeded"]
+    assert result["final_count"] == 30
+    assert time.perf_counter() - start < 1.0
+
+
+class _SlowVoicesTransport:
+    """Listing outlives the budget: the deadline expires inside the call, not in the sleep."""
+
+    def get(self, url, **kwargs):
+        time.sleep(kwargs["deadline"].remaining() + 0.01)
+        kwargs["deadline"].check()
+        return _VoicesResponse()
+
+
+def test_quota_poll_abandoned_listing_is_not_a_confirmation():
+    vm = VoiceManager("sk_test", transport=_SlowVoicesTransport())
+    result = vm.wait_until_quota_below(keep_count=25, timeout=25, interval=0.05, deadline=0.2)
+    assert not result["within_limit"] and result["deadline_exceeded"]
+    assert result["reason"] == "deadline_exceeded" and result["final_count"] is None
+    assert result["attempts"] == 1
+
+
+def test_quota_poll_timeout_before_caller_deadline_is_a_timeout():
+    vm = VoiceManager("sk_test", transport=_SlowVoicesTransport())
+    result = vm.wait_until_quota_below(keep_count=25, timeout=0.2, interval=0.05, deadline=30)
+    assert not result["within_limit"] and result["final_count"] is None
+    assert not result["deadline_exceeded"] and result["reason"] == "timeout"
@@ -0,0 +1,60 @@
+import os, sys, stat, textwrap, threading
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils.decode_service import DecodeBusy, DecodeError, DecodeService, DecodeTimeout  # type: ignore
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    """Stand-in for ffmpeg: echoes stdin (or the -i file) to stdout after an optional delay."""
+    script = tmp_path / "ffmpeg"
+    script.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import os, sys, time
+        time.sleep(float(os.environ.get("FAKE_FFMPEG_DELAY", "0")))
+        args = sys.argv[1:]
+        src = args[args.index("-i") + 1]
+        data = sys.stdin.buffer.read() if src == "pipe:0" else open(src, "rb").read()
+        if data == b"bad":
+            sys.stderr.write("Invalid data found when processing input")
+            sys.exit(1)
+        sys.stdout.buffer.write(data)
+    """))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_decode_roundtrip_and_errors(fake_ffmpeg):
+    svc = DecodeService(workers=1, queue=1, timeout=10, ffmpeg=fake_ffmpeg)
+    assert svc.decode_to_wav(b"RIFFdata", "webm") == b"RIFFdata"
+    assert svc.decode_to_wav(b"ftypdata", "mp4") == b"ftypdata"  # spilled to a temp file
+    with pytest.raises(DecodeError, match="Invalid data"):
+        svc.decode_to_wav(b"bad")
+    svc.ffmpeg = None
+    with pytest.raises(DecodeError, match="not available"):
+        svc.decode_to_wav(b"x")
+
+
+def test_queue_bound_and_shared_inflight(fake_ffmpeg, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_DELAY", "0.5")
+    svc = DecodeService(workers=1, queue=1, timeout=10, ffmpeg=fake_ffmpeg)
+    first = svc.submit_decode(b"a", key="a")
+    assert svc.submit_decode(b"a", key="a") is first  # rerun joins the running job
+    second = svc.submit_decode(b"b", key="b")
+    with pytest.raises(DecodeBusy):
+        svc.submit_decode(b"c", key="c")
+    assert first.result(timeout=10) == b"a" and second.result(timeout=10) == b"b"
+    assert svc.decode_to_wav(b"c") == b"c"  # slots released
+
+
+def test_timeout_kills_process(fake_ffmpeg, monkeypatch):
+    monkeypatch.setenv("FAKE_FFMPEG_DELAY", "5")
+    svc = DecodeService(workers=1, queue=0, timeout=0.5, ffmpeg=fake_ffmpeg)
+    with pytest.raises(DecodeTimeout):
+        svc.decode_to_wav(b"slow")
+    assert svc.stats()["pending"] == 0
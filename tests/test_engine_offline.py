@@ -19,3 +19,21 @@ def test_offline_clone_and_tts():
     ok, audio, info = engine.text_to_speech("Hello world", result['voice_id'])
     assert ok and isinstance(audio, BytesIO)
     assert audio.getvalue().startswith(b"RIFF")
+
+
+def test_offline_tts_stream():
+    os.environ['VOCALBRAND_OFFLINE'] = '1'
+    engine = VocalBrandEngine(api_key="")
+    ok, chunks, info = engine.text_to_speech_stream("Hello world", "21m00Tcm4TlvDq8ikWAM")
+    assert ok and info.startswith("offline-simulated")
+    assert b"".join(chunks).startswith(b"RIFF")
+
+
+def test_offline_tts_batch():
+    os.environ['VOCALBRAND_OFFLINE'] = '1'
+    engine = VocalBrandEngine(api_key="")
+    jobs = [("Prompt %d" % i, "21m00Tcm4TlvDq8ikWAM", None, None) for i in range(5)]
+    results = list(engine.text_to_speech_batch(jobs, max_concurrency=2))
+    assert sorted(r.index for r in results) == list(range(5))
+    assert all(r.success and r.audio.startswith(b"RIFF") for r in results)
+    assert all(r.status.startswith("offline-simulated") for r in results)
@@ -0,0 +1,197 @@
+import os, sys, time, threading
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+import requests
+from engine import VocalBrandEngine  # type: ignore
+
+VOICE = "21m00Tcm4TlvDq8ikWAM"
+MP3 = b"ID3" + b"\x00" * 200
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=MP3):
+        self.status_code = status
+        self.headers = {"Content-Type": "audio/mpeg" if status == 200 else "application/json"}
+        self.content = body
+        self.text = body.decode("latin-1")
+        self.closed = False
+
+    def json(self):
+        return {"detail": {"status": "server_error"}}
+
+    def iter_content(self, chunk_size=1):
+        yield self.content
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport:
+    """Plays back a script of (delay, response-or-exception) per call."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.responses = []
+        self.lock = threading.Lock()
+        self.rate_limiter = None
+        self.breaker = None
+
+    def post(self, url, **kwargs):
+        if kwargs.get("deadline") is not None:
+            kwargs["deadline"].check()
+        with self.lock:
+            delay, outcome = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        resp = FakeResponse(outcome)
+        self.responses.append(resp)
+        return resp
+
+
+@pytest.fixture
+def online_env(monkeypatch):
+    monkeypatch.setenv("VOCALBRAND_OFFLINE", "0")
+    monkeypatch.setenv("VOCALBRAND_TTS_CACHE", "0")
+    monkeypatch.setattr("engine.TTS_BACKOFF_BASE", 0.0)
+
+
+def test_retries_transient_failures(online_env):
+    transport = FakeTransport([(0, requests.ConnectionError("reset")), (0, 503), (0, 200)])
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    ok, buf, status = eng.text_to_speech("hello", VOICE)
+    assert ok and status == "ok" and buf.getvalue() == MP3
+    assert transport.calls == 3
+
+
+def test_client_errors_not_retried(online_env):
+    transport = FakeTransport([(0, 400)])
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    ok, _buf, status = eng.text_to_speech("hello", VOICE)
+    assert not ok and status.startswith("status=400")
+    assert transport.calls == 1
+
+
+def test_hedge_races_slow_primary(online_env, monkeypatch):
+    monkeypatch.setattr("engine.TTS_HEDGE_MIN_DELAY", 0.05)
+    transport = FakeTransport([(0.5, 200), (0.0, 200)])
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    eng.hedge_enabled = True
+    for _ in range(eng.tts_latency.min_samples):
+        eng.tts_latency.observe(0.01)
+    start = time.perf_counter()
+    ok, buf, _status = eng.text_to_speech("hello", VOICE)
+    assert time.perf_counter() - start < 0.4
+    assert ok and buf.getvalue() == MP3
+    assert transport.calls == 2
+    time.sleep(0.6)
+    assert transport.responses[-1].closed  # slow primary finished last and was released
+
+
+def test_deadline_bounds_retries(online_env):
+    transport = FakeTransport([(0.05, 503)])
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    eng.tts_retries = 100
+    start = time.perf_counter()
+    ok, buf, status = eng.text_to_speech("hello", VOICE, deadline=0.3)
+    assert not ok and buf is None and status == "deadline_exceeded"
+    assert time.perf_counter() - start < 1.0
+
+
+def test_longform_chunks_retry_once_and_stream_in_order(online_env):
+    text = "First sentence here. Second sentence here. Third sentence here."
+    transport = FakeTransport([(0, 200)])
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    played = []
+    ok, buf, status = eng.text_to_speech_long(text, VOICE, chunk_chars=25, max_workers=2, on_audio=played.append)
+    assert ok and status == "ok_long:3_chunks"
+    assert b"".join(played) == buf.getvalue() and len(played) == 3
+
+    failing = FakeTransport([(0, 503)])
+    eng = VocalBrandEngine("sk_test", transport=failing)
+    ok, _buf, status = eng.text_to_speech_long(text, VOICE, chunk_chars=25, max_workers=1)
+    assert not ok and status.startswith("chunk_failed:1/3:status=503")
+    # Only the transport-level retries: no second retry loop per chunk
+    assert failing.calls <= 2 * (eng.tts_retries + 1)
+
+
+def test_longform_rejects_unstitchable_format(online_env):
+    transport = FakeTransport([(0, 200)])
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    ok, buf, status = eng.text_to_speech_long("One. " * 400, VOICE, output_format="opus_48000_64")
+    assert not ok and buf is None and status == "unsupported_longform_format:opus_48000_64"
+    assert transport.calls == 0
+
+
+class TimedTransport(FakeTransport):
+    """Succeeds after a per-text delay; records peak concurrency."""
+
+    def __init__(self, delays):
+        super().__init__([(0, 200)])
+        self.delays = delays
+        self.in_flight = 0
+        self.peak = 0
+
+    def post(self, url, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delays.get(kwargs["json"]["text"], 0.05))
+            return super().post(url, **kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_batch_yields_in_completion_order_within_concurrency(online_env):
+    transport = TimedTransport({"slow": 0.3})
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    jobs = [("slow", VOICE, None, None)] + [(f"fast {i}", VOICE, None, None) for i in range(5)]
+    results = list(eng.text_to_speech_batch(jobs, max_concurrency=2))
+    assert results[0].index != 0 and results[-1].index == 0  # the slow clip does not hold back the others
+    assert sorted(r.index for r in results) == list(range(6))
+    assert all(r.success and r.audio == MP3 for r in results)
+    assert transport.peak == 2
+
+
+def test_closing_batch_early_cancels_queued_jobs(online_env):
+    transport = TimedTransport({})
+    eng = VocalBrandEngine("sk_test", transport=transport)
+    results = eng.text_to_speech_batch([(f"clip {i}", VOICE, None, None) for i in range(8)], max_concurrency=1)
+    first = next(results)
+    results.close()
+    time.sleep(0.3)
+    assert first.success
+    assert transport.calls <= 2  # at most the job already picked up when the consumer stopped
+
+
+def test_batch_validates_jobs_and_deadline_when_called(online_env):
+    eng = VocalBrandEngine("sk_test", transport=TimedTransport({}))
+    with pytest.raises(TypeError):
+        eng.text_to_speech_batch([("only text",)])
+    with pytest.raises(ValueError):
+        eng.text_to_speech_batch([("clip", VOICE, None, None)], deadline="soon")
+    assert eng.transport.calls == 0 and list(eng.text_to_speech_batch([])) == []
+
+
+def test_latency_window_is_shared_and_measures_headers(online_env):
+    # app.py builds a new engine on every rerun: the hedge window must outlive it
+    assert VocalBrandEngine("sk_test").tts_latency is VocalBrandEngine("sk_test").tts_latency
+    seen = []
+
+    class Recording(FakeTransport):
+        def post(self, url, **kwargs):
+            seen.append(kwargs["stream"])
+            return super().post(url, **kwargs)
+
+    eng = VocalBrandEngine("sk_test", transport=Recording([(0, 200)]))
+    assert eng.text_to_speech("hello", VOICE)[0]
+    assert eng.text_to_speech_stream("hello", VOICE)[0]
+    assert seen == [True, True] and len(eng.tts_latency) == 2
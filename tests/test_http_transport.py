@@ -0,0 +1,78 @@
+import os, sys, time, threading
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from utils.circuit_breaker import CLOSED, CircuitBreaker  # type: ignore
+from utils.http_transport import HttpTransport, RateLimitTimeout  # type: ignore
+from utils.rate_limiter import AdaptiveRateLimiter  # type: ignore
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers from a script of (status, headers) instead of the network."""
+
+    def __init__(self, replies=()):
+        super().__init__()
+        self.replies = list(replies)
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.sent.append((request.method, request.url, time.monotonic()))
+            status, headers = self.replies.pop(0) if self.replies else (200, {})
+        resp = requests.Response()
+        resp.status_code = status
+        resp.headers.update(headers)
+        resp._content = b"ok"
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+def test_prewarm_sends_one_head_per_process():
+    adapter = FakeAdapter()
+    transport = HttpTransport(adapter=adapter)
+    transport.prewarm("https://api.example", background=False)
+    for _ in range(3):  # every rerun of every session calls this
+        transport.prewarm("https://api.example")
+    assert transport._prewarm_thread is None
+    assert [(m, u) for m, u, _ in adapter.sent] == [("HEAD", "https://api.example/")]
+
+
+def test_requests_take_rate_limiter_tokens():
+    adapter = FakeAdapter()
+    transport = HttpTransport(adapter=adapter, rate_limiter=AdaptiveRateLimiter(rate=1.0, burst=2))
+    assert transport.get("https://api.example/a").status_code == 200
+    assert transport.get("https://api.example/b").status_code == 200
+    with pytest.raises(RateLimitTimeout):
+        transport.get("https://api.example/c", timeout=0.05)
+    assert len(adapter.sent) == 2
+
+
+def test_429_waits_for_retry_after_then_succeeds():
+    adapter = FakeAdapter([(429, {"Retry-After": "0.2"}), (200, {})])
+    limiter = AdaptiveRateLimiter(rate=100.0, burst=5)
+    transport = HttpTransport(adapter=adapter, rate_limiter=limiter, breaker=CircuitBreaker(min_calls=1))
+    resp = transport.post("https://api.example/tts", timeout=5)
+    assert resp.status_code == 200 and len(adapter.sent) == 2
+    assert adapter.sent[1][2] - adapter.sent[0][2] >= 0.15
+    assert limiter.rate == pytest.approx(50.05)  # halved by the 429, nudged up by the success
+    assert transport.breaker.state == CLOSED  # throttling is not an upstream failure
+
+
+def test_429_returned_when_retries_spent_or_pause_too_long():
+    adapter = FakeAdapter([(429, {"Retry-After": "0"})] * 3)
+    transport = HttpTransport(adapter=adapter, rate_limiter=AdaptiveRateLimiter(rate=100.0, burst=5), max_429_retries=1)
+    assert transport.get("https://api.example/a").status_code == 429 and len(adapter.sent) == 2
+    adapter = FakeAdapter([(429, {"Retry-After": "60"})])
+    transport = HttpTransport(adapter=adapter, rate_limiter=AdaptiveRateLimiter(rate=100.0, burst=5))
+    assert transport.get("https://api.example/a", timeout=5).status_code == 429 and len(adapter.sent) == 1
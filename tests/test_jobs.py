@@ -0,0 +1,115 @@
+import os, sys, time, threading
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+import db_adapter  # type: ignore
+import auth  # type: ignore
+from utils.jobs import JobError, JobRunner  # type: ignore
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    if db_adapter.db_adapter.use_postgres:
+        pytest.skip("job tests run against SQLite only")
+    monkeypatch.setattr(db_adapter, "DB_PATH", str(tmp_path / "jobs.db"))
+    auth.init_db()
+
+
+def _wait(runner, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_job_lifecycle_progress_and_result(temp_db):
+    runner = JobRunner(workers=2)
+    release = threading.Event()
+
+    def handler(job):
+        job.progress(0.5, "halfway", partial={"preview": "abc"})
+        release.wait(5)
+        return {"voice_id": job.params["label"] + "_id"}
+
+    runner.register("clone", handler)
+    job_id = runner.submit("clone", {"label": "mine"}, user_id=7)
+    deadline = time.monotonic() + 5
+    while runner.get(job_id)["message"] != "halfway" and time.monotonic() < deadline:
+        time.sleep(0.02)
+    running = runner.get(job_id)
+    assert running["status"] == "running" and running["progress"] == 0.5
+    assert running["result"] == {"preview": "abc"} and running["params"] == {"label": "mine"}
+    release.set()
+    done = _wait(runner, job_id)
+    assert done["status"] == "succeeded" and done["progress"] == 1.0
+    assert done["result"] == {"voice_id": "mine_id"}
+
+
+def test_failures_are_recorded(temp_db):
+    runner = JobRunner(workers=1)
+
+    def expected(job):
+        raise JobError("The sample has expired.")
+
+    def crash(job):
+        raise KeyError("boom")
+
+    runner.register("clone", expected)
+    runner.register("tts", crash)
+    assert _wait(runner, runner.submit("clone", {}))["message"] == "The sample has expired."
+    failed = _wait(runner, runner.submit("tts", {}))
+    assert failed["status"] == "failed" and failed["message"].startswith("Unexpected error")
+    with pytest.raises(ValueError):
+        runner.submit("unknown", {})
+
+
+def test_results_survive_for_the_user_until_delivered(temp_db):
+    runner = JobRunner(workers=1)
+    runner.register("tts", lambda job: {"n": job.params["n"]})
+    first = _wait(runner, runner.submit("tts", {"n": 1}, user_id=3))["id"]
+    second = _wait(runner, runner.submit("tts", {"n": 2}, user_id=3))["id"]
+    _wait(runner, runner.submit("tts", {"n": 3}, user_id=4))
+    # A fresh runner (new session / restarted worker) still sees them, newest first
+    assert [j["id"] for j in auth.list_user_jobs(3)] == [second, first]
+    JobRunner(workers=1).mark_delivered(second)
+    assert [j["id"] for j in auth.list_user_jobs(3)] == [first]
+
+
+def test_jobs_of_dead_processes_are_reported_interrupted(temp_db):
+    runner = JobRunner(workers=1)
+    host = runner.owner.rsplit(":", 1)[0]
+    auth.create_job("orphan", 1, "clone", "{}", f"{host}:999999999")
+    auth.create_job("elsewhere", 1, "clone", "{}", "other-host:1")
+    assert runner.get("orphan")["status"] == "failed"
+    assert "Interrupted" in auth.get_job("orphan")["message"]
+    assert runner.get("elsewhere")["status"] == "queued"
+
+
+def test_env_reaches_handler_but_is_not_stored(temp_db):
+    runner = JobRunner(workers=1)
+    engine = object()
+    runner.register("tts", lambda job: {"same_engine": job.env["engine"] is engine})
+    job_id = runner.submit("tts", {"text": "hi"}, env={"engine": engine})
+    assert _wait(runner, job_id)["result"] == {"same_engine": True}
+    assert "engine" not in auth.get_job(job_id)["params"]
+
+
+def test_expired_rows_are_purged(temp_db):
+    runner = JobRunner(workers=1, retention_seconds=3600)
+    auth.create_job("old", 1, "tts", "{}", runner.owner)
+    auth.create_job("recent", 1, "tts", "{}", runner.owner)
+    auth.create_job("hour_old", 1, "tts", "{}", runner.owner)
+    db_adapter.db_adapter.execute("UPDATE jobs SET updated_at='2000-01-01 00:00:00' WHERE id='old'")
+    # Just inside retention by the database's own clock (CURRENT_TIMESTAMP, UTC on SQLite)
+    db_adapter.db_adapter.execute("UPDATE jobs SET updated_at=datetime('now', '-3500 seconds') WHERE id='hour_old'")
+    runner.purge_expired()
+    assert auth.get_job("old") is None and auth.get_job("recent") is not None
+    assert auth.get_job("hour_old") is not None
+    auth.purge_jobs(3000)
+    assert auth.get_job("hour_old") is None and auth.get_job("recent") is not None
@@ -0,0 +1,71 @@
+import os, sys, json, math, struct
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pytest
+
+from utils.audio_analysis import AudioAnalysis  # type: ignore
+from utils.live_recording import LiveRecording  # type: ignore
+from utils.pro_recorder import FRAME_MAGIC, parse_frame  # type: ignore
+from utils.recorder_bridge import RecorderBridge, get_recorder_bridge  # type: ignore
+
+
+def _take(sr=16000):
+    t = np.arange(int(2.0 * sr)) / sr
+    tone = (0.25 * 32767 * np.sin(2 * math.pi * 440 * t)).astype(np.int16)
+    return np.concatenate([np.zeros(sr, np.int16), tone, np.zeros(sr, np.int16)])
+
+
+def test_chunks_accumulate_idempotently():
+    sr = 16000
+    pcm = _take(sr)
+    rec = LiveRecording("r1", sr)
+    step = 7000
+    for start in range(0, len(pcm), step):
+        # Each send re-includes the previous chunk, as an unacknowledged browser would
+        lo = max(0, start - step)
+        assert rec.append(lo, pcm[lo:start + step].tobytes()) == min(len(pcm), start + step)
+    assert rec.append(len(pcm) + 10, pcm[:100].tobytes()) == len(pcm)  # gap: ignored, ack unchanged
+    stats = rec.stats()
+    whole = AudioAnalysis(pcm, sr)
+    assert np.array_equal(rec.analysis().pcm[:, 0], pcm)
+    assert abs(stats["duration"] - whole.duration) < 1e-9
+    assert abs(stats["loudness_dbfs"] - whole.dbfs) < 1e-6 and abs(stats["peak_dbfs"] - whole.peak_dbfs) < 1e-6
+    assert abs(stats["speech_start_ms"] - 1000) <= 20 and abs(stats["speech_end_ms"] - 3000) <= 20
+
+
+def test_max_frames_caps_buffer():
+    rec = LiveRecording("r2", 16000, max_frames=1000)
+    assert rec.append(0, np.ones(1500, np.int16).tobytes()) == 1000 and rec.full
+
+
+def _pcm_frame(rec, start, pcm, *, rate=16000, final=False, total=0):
+    header = json.dumps({"seq": 1, "kind": "pcm", "rec": rec, "start": start, "rate": rate,
+                         "channels": 1, "final": final, "total": total, "size": len(pcm)}).encode()
+    return FRAME_MAGIC + struct.pack("<I", len(header)) + header + pcm
+
+
+def test_consecutive_chunks_through_the_bridge_across_reruns():
+    sr = 16000
+    pcm = _take(sr)
+    half = len(pcm) // 2
+    # Each rerun looks the bridge up again; the take must still be there for chunk two
+    first = parse_frame(_pcm_frame("take-1", 0, pcm[:half].tobytes()))
+    _live, ack = get_recorder_bridge().receive_chunk(first.rec, first.rate, first.channels, first.start, first.data)
+    assert ack == half
+    second = parse_frame(_pcm_frame("take-1", half, pcm[half:].tobytes(), final=True, total=len(pcm)))
+    live, ack = get_recorder_bridge().receive_chunk(second.rec, second.rate, second.channels, second.start, second.data)
+    assert ack == len(pcm) == second.total
+    assert live.stats()["duration"] == len(pcm) / sr
+    get_recorder_bridge().finish_live("take-1")
+
+
+def test_bridge_rejects_invalid_format():
+    bridge = RecorderBridge()
+    with pytest.raises(ValueError):
+        bridge.receive_chunk("bad", 0, 1, 0, b"\x00\x00")
+    with pytest.raises(ValueError):
+        bridge.receive_chunk("bad", 16000, 0, 0, b"\x00\x00")
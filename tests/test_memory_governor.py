@@ -0,0 +1,124 @@
+import io, os, sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pytest
+
+from utils.memory_governor import MemoryGovernor, measure  # type: ignore
+from utils.sample_store import SampleHandle, SampleStore  # type: ignore
+
+
+class State(dict):
+    """Stand-in for a session's long-lived state mapping."""
+
+
+class RunWrapper:
+    """Like Streamlit's SafeSessionState: a new wrapper per script run around the same state."""
+
+    def __init__(self, state):
+        self._state = state
+
+    def __getitem__(self, key):
+        return self._state[key]
+
+    def __setitem__(self, key, value):
+        self._state[key] = value
+
+    def __delitem__(self, key):
+        del self._state[key]
+
+    def __contains__(self, key):
+        return key in self._state
+
+
+MB = 1024 * 1024
+
+
+def test_measure_counts_blobs_and_spooled_handles():
+    assert measure(b"x" * 1000) == (1000, 0)
+    assert measure(np.zeros(250, dtype=np.int32))[0] == 1000
+    assert measure(io.BytesIO(b"y" * 500)) == (500, 0)
+    assert measure(SampleHandle("d", 4096, "/nowhere")) == (0, 4096)
+    resident, spilled = measure({"a": b"z" * 2000, "b": [SampleHandle("e", 10, "/x")]})
+    assert resident >= 2000 and spilled == 10
+
+
+def test_session_budget_evicts_largest_idle_value_only():
+    gov = MemoryGovernor({"big": "evict", "small": "evict", "kept": "keep"}, session_budget=3 * MB, idle_seconds=30)
+    state = State(big=b"b" * (2 * MB), small=b"s" * MB, kept=b"k" * (2 * MB))
+    gov.observe("s1", state, now=0)
+    assert set(state) == {"big", "small", "kept"}  # over budget, but nothing idle yet
+    usage = gov.observe("s1", state, now=31)
+    assert "big" not in state and "small" in state and "kept" in state
+    assert usage["resident"] == 3 * MB and gov.evictions == 1
+
+
+def test_reassigned_value_is_not_idle():
+    gov = MemoryGovernor({"big": "evict"}, session_budget=MB, idle_seconds=30)
+    state = State(big=b"1" * (2 * MB))
+    gov.observe("s1", state, now=0)
+    state["big"] = b"2" * (2 * MB)
+    gov.observe("s1", state, now=31)
+    assert "big" in state
+    gov.observe("s1", state, now=62)
+    assert "big" not in state
+
+
+def test_fresh_wrapper_per_run_keeps_idle_clock_and_session():
+    gov = MemoryGovernor({"big": "evict"}, session_budget=MB, global_budget=3 * MB, idle_seconds=30)
+    state = State(big=b"x" * (2 * MB))
+    gov.observe("s1", RunWrapper(state), now=0)
+    # Widget values are re-deserialized each rerun: equal content, new object
+    state["big"] = bytes(state["big"])
+    gov.observe("s1", RunWrapper(state), now=20)
+    assert "big" in state
+    gov.observe("other", State(), now=25)  # the first session's wrapper is gone, its state is not
+    assert gov.snapshot()["total_resident_bytes"] == 2 * MB
+    gov.observe("s1", RunWrapper(state), now=31)
+    assert "big" not in state and gov.evictions == 1
+
+
+def test_global_budget_marks_other_sessions_until_their_next_run(tmp_path):
+    store = SampleStore(tmp_path)
+    gov = MemoryGovernor({"audio": "spill"}, session_budget=10 * MB, global_budget=3 * MB, idle_seconds=30, spill=store.put)
+    idle = State(audio=b"a" * (2 * MB))
+    active = State(audio=b"b" * (2 * MB))
+    gov.observe("idle", RunWrapper(idle), now=0)
+    gov.observe("active", RunWrapper(active), now=40)
+    # Another session's state is never written from this session's run
+    assert isinstance(idle["audio"], bytes) and isinstance(active["audio"], bytes)
+    assert {s["session"]: s["pending"] for s in gov.snapshot()["sessions"]} == {"idle": ["audio"], "active": []}
+    gov.observe("idle", RunWrapper(idle), now=41)
+    assert isinstance(idle["audio"], SampleHandle) and bytes(idle["audio"].view()[:1]) == b"a"
+    assert isinstance(active["audio"], bytes)
+    snap = gov.snapshot()
+    assert snap["total_resident_bytes"] == 2 * MB and snap["total_spilled_bytes"] == 2 * MB and snap["spills"] == 1
+
+
+def test_marked_key_reassigned_before_next_run_is_kept():
+    gov = MemoryGovernor({"audio": "evict"}, session_budget=10 * MB, global_budget=3 * MB, idle_seconds=30)
+    idle = State(audio=b"a" * (2 * MB))
+    gov.observe("idle", idle, now=0)
+    gov.observe("active", State(audio=b"b" * (2 * MB)), now=40)
+    idle["audio"] = b"c" * (2 * MB)
+    gov.observe("idle", idle, now=41)
+    assert idle["audio"][:1] == b"c" and gov.evictions == 0
+
+
+def test_closed_and_stale_sessions_are_dropped():
+    alive = {"gone": False, "other": True, "quiet": True}
+    gov = MemoryGovernor({"audio": "keep"}, stale_seconds=3600, is_alive=lambda sid: alive.get(sid, True))
+    gov.observe("gone", State(audio=b"x" * 100), now=0)
+    gov.observe("quiet", State(), now=0)
+    gov.observe("other", State(), now=10)
+    assert sorted(s["session"] for s in gov.snapshot()["sessions"]) == ["other", "quiet"]
+    gov.observe("other", State(), now=4000)
+    assert [s["session"] for s in gov.snapshot()["sessions"]] == ["other"]
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        MemoryGovernor({"audio": "compress"})
@@ -0,0 +1,43 @@
+import os, sys, json, struct, hashlib
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils.pro_recorder import FRAME_MAGIC, parse_frame, payload_digest  # type: ignore
+
+
+def _frame(audio: bytes, **header) -> bytes:
+    head = json.dumps({"seq": 7, "mime": "audio/wav", "size": len(audio), **header}).encode("utf-8")
+    return FRAME_MAGIC + struct.pack("<I", len(head)) + head + audio
+
+
+def test_parse_frame_is_zero_copy():
+    audio = bytes(range(256)) * 40
+    buf = _frame(audio, filename="take.wav")
+    p = parse_frame(buf)
+    assert (p.seq, p.mime, p.filename, p.size) == (7, "audio/wav", "take.wav", len(audio))
+    assert p.data.obj is buf and bytes(p.data) == audio
+
+
+@pytest.mark.parametrize("buf", [b"", b"RIFF0000", FRAME_MAGIC + struct.pack("<I", 99) + b"{}"])
+def test_parse_frame_rejects_garbage(buf):
+    with pytest.raises(ValueError):
+        parse_frame(buf)
+
+
+def test_parse_frame_rejects_size_mismatch():
+    with pytest.raises(ValueError):
+        parse_frame(_frame(b"abc", size=4))
+
+
+def test_incremental_digest_matches_one_shot():
+    data = os.urandom(3 * (1 << 20) + 123)
+    assert payload_digest(memoryview(data)) == hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def test_parse_live_pcm_frame():
+    p = parse_frame(_frame(b"\x00\x01" * 50, kind="pcm", rec="abc", start=4800, rate=48000, final=True, total=4850))
+    assert (p.kind, p.rec, p.start, p.rate, p.channels, p.final, p.total) == ("pcm", "abc", 4800, 48000, 1, True, 4850)
@@ -0,0 +1,35 @@
+import os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.rate_limiter import AdaptiveRateLimiter, parse_retry_after  # type: ignore
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+
+
+def test_burst_then_timeout():
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=2)
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.01)
+
+
+def test_throttle_halves_rate_and_blocks():
+    limiter = AdaptiveRateLimiter(rate=10.0, burst=5, min_rate=1.0)
+    limiter.on_throttled(retry_after=0.2)
+    snap = limiter.snapshot()
+    assert snap["rate_rps"] == 5.0
+    assert snap["blocked_for_sec"] > 0
+    assert not limiter.acquire(timeout=0.05)
+    start = time.monotonic()
+    assert limiter.acquire(timeout=1.0)
+    assert time.monotonic() - start >= 0.1
+    limiter.on_success()
+    assert limiter.snapshot()["rate_rps"] > 5.0
@@ -0,0 +1,74 @@
+import os, sys, stat, textwrap
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils.decode_service import DecodeService  # type: ignore
+from utils.renditions import PreviewRenditions  # type: ignore
+from utils.sample_store import SampleStore  # type: ignore
+
+
+@pytest.fixture
+def fake_encoder(tmp_path):
+    """Stand-in for ffmpeg: "encodes" the -i file to a tenth of its size, logging each call."""
+    calls = tmp_path / "calls.log"
+    script = tmp_path / "ffmpeg"
+    script.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import sys
+        args = sys.argv[1:]
+        data = open(args[args.index("-i") + 1], "rb").read()
+        open({str(calls)!r}, "a").write(" ".join(args) + "\\n")
+        sys.stdout.buffer.write(b"ID3" + data[: len(data) // 10])
+    """))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script), calls
+
+
+def test_preview_built_once_and_cached(tmp_path, fake_encoder):
+    ffmpeg, calls = fake_encoder
+    store = SampleStore(tmp_path / "store")
+    svc = DecodeService(workers=1, queue=2, timeout=10, ffmpeg=ffmpeg)
+    previews = PreviewRenditions(store, bitrate="40k", min_bytes=1000, service=svc)
+    source = store.put(b"RIFF" + b"\x01" * 50_000)
+
+    preview = previews.preview(source, wait=5)
+    assert preview.digest != source.digest and preview.size == 3 + 5000
+    assert previews.mime == "audio/mpeg"
+    args = calls.read_text().split()
+    assert source.path in args and "-b:a" in args and "40k" in args and "-ac" in args
+
+    assert previews.preview(source) == preview
+    assert len(calls.read_text().splitlines()) == 1
+
+
+def test_small_or_unencodable_sources_play_as_is(tmp_path):
+    store = SampleStore(tmp_path / "store")
+    svc = DecodeService(workers=1, queue=1, timeout=10, ffmpeg=None)  # no ffmpeg
+    previews = PreviewRenditions(store, min_bytes=1000, service=svc)
+    small = store.put(b"RIFF" + b"\x00" * 100)
+    assert previews.request(small) is None and previews.preview(small) == small
+
+    big = store.put(b"RIFF" + b"\x02" * 5000)
+    fut = previews.request(big)
+    assert fut is not None and fut.result(timeout=5) == big.digest
+    assert previews.lookup(big) == big  # failure is remembered; not retried every rerun
+
+
+def test_not_ready_falls_back_to_source(tmp_path, fake_encoder):
+    ffmpeg, _ = fake_encoder
+    store = SampleStore(tmp_path / "store")
+    svc = DecodeService(workers=1, queue=1, timeout=10, ffmpeg=ffmpeg)
+    previews = PreviewRenditions(store, min_bytes=10, service=svc)
+    source = store.put(b"RIFF" + b"\x03" * 2000)
+    assert previews.preview(source) == source  # no waiting: the source plays now
+    previews.request(source).result(timeout=5)
+    assert previews.preview(source) != source
+
+
+def test_unsupported_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        PreviewRenditions(SampleStore(tmp_path), fmt="aac")
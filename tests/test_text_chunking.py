@@ -0,0 +1,63 @@
+import io, os, sys, wave
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.text_chunking import split_text  # type: ignore
+import pytest
+from engine import stitch_audio  # type: ignore
+
+
+def test_short_text_single_chunk():
+    assert split_text("Hello there. How are you?", target_chars=600) == ["Hello there. How are you?"]
+
+
+def test_sentence_packing_and_order():
+    sentences = [f"Sentence number {i} is here." for i in range(40)]
+    text = " ".join(sentences)
+    chunks = split_text(text, target_chars=120, max_chars=5000)
+    assert len(chunks) > 1
+    assert all(len(c) <= 120 for c in chunks)
+    assert " ".join(chunks) == text
+    assert all(c.endswith(".") for c in chunks)
+
+
+def test_paragraph_break_ends_chunk():
+    chunks = split_text("First para.\n\nSecond para.", target_chars=600)
+    assert chunks == ["First para.", "Second para."]
+
+
+def test_oversized_sentence_respects_hard_limit():
+    text = "word " * 500
+    chunks = split_text(text, target_chars=600, max_chars=100)
+    assert all(len(c) <= 100 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_stitch_mp3_strips_inner_id3():
+    tag = b"ID3\x04\x00\x00\x00\x00\x00\x02ab"
+    frame = b"\xff\xfb\x90\x00" + b"\x00" * 10
+    out = stitch_audio([tag + frame, tag + frame], "mp3_44100_128")
+    assert out == tag + frame + frame
+
+
+def _wav(frames: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(frames)
+    return buf.getvalue()
+
+
+def test_stitch_wav_keeps_one_header():
+    out = stitch_audio([_wav(b"\x01\x00" * 10), _wav(b"\x02\x00" * 5)], "wav")
+    with wave.open(io.BytesIO(out), "rb") as w:
+        assert w.getframerate() == 16000 and w.readframes(w.getnframes()) == b"\x01\x00" * 10 + b"\x02\x00" * 5
+
+
+def test_stitch_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        stitch_audio([b"a", b"b"], "opus_48000_64")
@@ -0,0 +1,52 @@
+import os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.tts_cache import TTSCache, make_cache_key  # type: ignore
+
+
+def test_key_normalizes_whitespace_only():
+    k1 = make_cache_key("voice", "model", "mp3", "Hello   world\n")
+    k2 = make_cache_key("voice", "model", "mp3", "Hello world")
+    k3 = make_cache_key("voice", "model", "mp3", "hello world")
+    assert k1 == k2
+    assert k1 != k3
+    assert k1 != make_cache_key("voice", "model", "wav", "Hello world")
+
+
+def test_lru_eviction_by_bytes(tmp_path):
+    cache = TTSCache(tmp_path, max_bytes=250)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"y" * 100)
+    assert cache.get("a") == b"x" * 100  # touch a -> b becomes oldest
+    cache.put("c", b"z" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] <= 250
+
+
+def test_reload_keeps_access_order_and_creation_time(tmp_path):
+    cache = TTSCache(tmp_path, max_bytes=250)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"y" * 100)
+    past = time.time() - 60
+    os.utime(tmp_path / "a.audio", (past, past))  # both written a minute ago, "a" first
+    os.utime(tmp_path / "b.audio", (past + 1, past + 1))
+    restarted = TTSCache(tmp_path, max_bytes=250)
+    assert restarted.get("a") is not None  # a hit makes "a" the most recently used
+    assert abs(os.stat(tmp_path / "a.audio").st_mtime - past) < 0.01  # TTL still counts from creation
+    reloaded = TTSCache(tmp_path, max_bytes=250)
+    reloaded.put("c", b"z" * 100)
+    assert reloaded.get("b") is None and reloaded.get("a") == b"x" * 100
+
+
+def test_ttl_and_reload(tmp_path):
+    cache = TTSCache(tmp_path, ttl_seconds=3600)
+    cache.put("k", b"audio" * 20)
+    reloaded = TTSCache(tmp_path, ttl_seconds=3600)
+    assert reloaded.get("k") == b"audio" * 20
+    expired = TTSCache(tmp_path, ttl_seconds=0)
+    time.sleep(0.01)
+    assert expired.get("k") is None
@@ -0,0 +1,176 @@
+"""Process-wide cache of sample analyses keyed by content digest.
+
+Streamlit reruns the whole script on every widget interaction, and the
+recorder/uploader widgets hand back the same bytes each time. Entries hold
+the decoded ``AudioAnalysis`` plus everything derived from it (validation,
+quality, waveform peaks, silence bounds), so a rerun with an unchanged
+sample costs one hash and a dictionary lookup.
+
+Entries are evicted least-recently-used once their estimated memory
+(decoded PCM, float mono buffer, derived payloads) exceeds the bound.
+
+Environment flags:
+    VOCALBRAND_ANALYSIS_CACHE=0        -> disable (every call analyzes afresh)
+    VOCALBRAND_ANALYSIS_CACHE_MAX_MB   -> memory bound (default 256)
+"""
+from __future__ import annotations
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import metrics_collector
+from utils.audio_analysis import PEAKS_BUCKETS, AudioAnalysis, analyze_audio
+
+logger = logging.getLogger("vocalbrand.analysis_cache")
+
+_ENTRY_OVERHEAD = 8 * 1024
+
+
+def sample_digest(data: bytes) -> str:
+    """Content digest used as the cache key (also shown, shortened, as the sample hash)."""
+    return hashlib.sha1(data).hexdigest()
+
+
+class CachedAnalysis:
+    """An ``AudioAnalysis`` plus memoized derived results."""
+
+    def __init__(self, digest: str, analysis: AudioAnalysis):
+        self.digest = digest
+        self.analysis = analysis
+        self._derived: Dict[Hashable, Any] = {}
+        # PCM + the float32 mono buffer most derivations build
+        self.nbytes = int(analysis.pcm.nbytes) + analysis.frames * 4 + _ENTRY_OVERHEAD
+
+    def derive(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self._derived:
+            return self._derived[key]
+        value = compute()
+        self._derived[key] = value
+        return value
+
+    def validation(self, data: bytes) -> Dict[str, Any]:
+        """``validate_audio_bytes`` result (without ``raw_bytes``)."""
+        from utils.audio_utils import validate_audio_bytes
+
+        def compute() -> Dict[str, Any]:
+            res = validate_audio_bytes(data, analysis=self.analysis)
+            return {k: v for k, v in res.items() if k != "raw_bytes"}
+        return dict(self.derive("validation", compute))
+
+    def quality(self) -> Dict[str, Any]:
+        return self.derive("quality", self.analysis.quality)
+
+    def peaks(self, buckets: int = PEAKS_BUCKETS) -> bytes:
+        return self.derive(("peaks", int(buckets)), lambda: self.analysis.peaks(buckets).tobytes())
+
+    def silence_bounds(self, **params: Any) -> Optional[Tuple[int, int]]:
+        key = ("silence_bounds",) + tuple(sorted(params.items()))
+        return self.derive(key, lambda: self.analysis.silence_bounds(**params))
+
+
+class AnalysisCache:
+    """In-memory LRU of ``CachedAnalysis`` bounded by estimated bytes."""
+
+    def __init__(self, *, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, CachedAnalysis]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> Optional[CachedAnalysis]:
+        with self._lock:
+            entry = self._index.get(digest)
+            if entry is None:
+                metrics_collector.incr("analysis_cache_miss")
+                return None
+            self._index.move_to_end(digest)
+        metrics_collector.incr("analysis_cache_hit")
+        return entry
+
+    def put(self, digest: str, analysis: AudioAnalysis) -> CachedAnalysis:
+        entry = CachedAnalysis(digest, analysis)
+        if entry.nbytes > self.max_bytes:
+            return entry  # usable, just not retained
+        with self._lock:
+            old = self._index.pop(digest, None)
+            if old is not None:
+                self._total -= old.nbytes
+            self._index[digest] = entry
+            self._total += entry.nbytes
+            while self._total > self.max_bytes and self._index:
+                _, evicted = self._index.popitem(last=False)
+                self._total -= evicted.nbytes
+                metrics_collector.incr("analysis_cache_evictions")
+            metrics_collector.gauge("analysis_cache_bytes", self._total)
+        return entry
+
+    def analyze(
+        self,
+        data: bytes,
+        *,
+        digest: Optional[str] = None,
+        fmt: Optional[str] = None,
+        analysis: Optional[AudioAnalysis] = None,
+    ) -> CachedAnalysis:
+        """Cached entry for ``data``; decodes (or adopts ``analysis``) only on a miss."""
+        digest = digest or sample_digest(data)
+        entry = self.get(digest)
+        if entry is not None:
+            return entry
+        return self.put(digest, analysis if analysis is not None else analyze_audio(data, fmt=fmt, key=digest))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._index), "bytes": self._total, "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index.clear()
+            self._total = 0
+
+
+_SHARED_CACHE: Optional[AnalysisCache] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """Return the process-wide cache, or None when disabled."""
+    global _SHARED_CACHE
+    if os.getenv("VOCALBRAND_ANALYSIS_CACHE", "1") == "0":
+        return None
+    if _SHARED_CACHE is None:
+        with _SHARED_LOCK:
+            if _SHARED_CACHE is None:
+                _SHARED_CACHE = AnalysisCache(
+                    max_bytes=int(float(os.getenv("VOCALBRAND_ANALYSIS_CACHE_MAX_MB", "256")) * 1024 * 1024)
+                )
+    return _SHARED_CACHE
+
+
+def analyze_cached(
+    data: bytes,
+    *,
+    digest: Optional[str] = None,
+    fmt: Optional[str] = None,
+    analysis: Optional[AudioAnalysis] = None,
+) -> CachedAnalysis:
+    """Analyze ``data`` through the shared cache (raises on undecodable input)."""
+    cache = get_analysis_cache()
+    if cache is None:
+        digest = digest or sample_digest(data)
+        return CachedAnalysis(digest, analysis if analysis is not None else analyze_audio(data, fmt=fmt))
+    return cache.analyze(data, digest=digest, fmt=fmt, analysis=analysis)
+
+
+def waveform_peaks(
+    data: bytes,
+    *,
+    buckets: int = PEAKS_BUCKETS,
+    analysis: Optional[AudioAnalysis] = None,
+    digest: Optional[str] = None,
+) -> bytes:
+    """Interleaved int8 ``min, max`` pairs for ``data``; no audio work on a cache hit."""
+    return analyze_cached(data, digest=digest, analysis=analysis).peaks(buckets)
@@ -0,0 +1,357 @@
+"""Out-of-band HTTP endpoint for spooled audio (playback and downloads).
+
+``st.audio(bytes)`` and ``st.download_button(data=bytes)`` push the whole
+clip through the websocket and keep a copy in Streamlit's media cache, once
+per widget and again on reruns. Clips and samples already live in the
+content-addressed sample store (``utils.sample_store``), so the UI can
+reference them by URL instead and let the browser fetch them directly:
+
+    GET|HEAD /a/<sha1>?sig=<hmac>[&download=<filename>]
+
+URLs are signed with the server's secret (HMAC of the digest) and only
+handed to the session that renders the asset, so knowing a sample's
+digest is not enough to fetch it; unsigned or mis-signed requests get 404.
+Responses carry a strong ``ETag`` (the digest) and long-lived immutable
+cache headers, answer ``If-None-Match`` with 304, and honour single
+``Range`` requests (206/416) so players can seek without refetching. The
+content type is sniffed from the file's leading bytes. Serving an asset
+resets its TTL in the store.
+
+Clips that are still being generated are served from a ``LiveAsset``:
+
+    GET|HEAD /live/<token>
+
+streams the bytes received so far and then follows the buffer as it grows
+(the response ends when the producer finishes), so a plain ``<audio>``
+element starts playing MP3 while the rest is still arriving. Once the clip
+is finished and spooled, new requests are redirected to its ``/a/`` URL and
+the buffer is released when the last reader is done. Tokens are random and
+never reused.
+
+Environment flags:
+    VOCALBRAND_ASSET_SERVER=0          -> disable (UI falls back to inline bytes)
+    VOCALBRAND_ASSET_HOST              -> bind address (default 127.0.0.1)
+    VOCALBRAND_ASSET_PORT              -> port (default 8765)
+    VOCALBRAND_ASSET_BASE_URL          -> URL browsers use to reach it, e.g. behind a
+                                          reverse proxy (default http://localhost:<port>)
+    VOCALBRAND_ASSET_SECRET            -> URL signing key; set the same value on every
+                                          replica behind one base URL (default: random per process)
+"""
+from __future__ import annotations
+import os
+import re
+import hmac
+import time
+import hashlib
+import secrets
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+from metrics import metrics_collector
+from utils.audio_decode import sniff_format
+from utils.sample_store import SampleStore, get_sample_store
+
+logger = logging.getLogger("vocalbrand.asset_server")
+
+_PATH_RE = re.compile(r"^/a/([0-9a-f]{40})$")
+_LIVE_RE = re.compile(r"^/live/([A-Za-z0-9_-]{16,64})$")
+_LIVE_STALL_SEC = 60.0  # a producer silent this long ends the response
+_LIVE_TTL_SEC = 600.0  # live assets are forgotten this long after finishing
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_SEND_BLOCK = 64 * 1024
+_MIME = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "ogg": "audio/ogg",
+    "webm": "audio/webm",
+    "mp4": "audio/mp4",
+    "flac": "audio/flac",
+}
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` for a single-range ``Range`` header.
+
+    Returns None when the header is absent, malformed or multi-range (the
+    whole body is served); raises ValueError when it is unsatisfiable.
+    """
+    m = _RANGE_RE.match((header or "").strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if not m.group(1):  # suffix: last N bytes
+        n = int(m.group(2))
+        if n == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(0, size - n), size - 1
+    start = int(m.group(1))
+    end = int(m.group(2)) if m.group(2) else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def _safe_filename(name: str) -> str:
+    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._")
+    return cleaned[:120] or "audio"
+
+
+class LiveAsset:
+    """A clip still being produced; readers follow the buffer as it grows."""
+
+    def __init__(self, token: str, mime: str):
+        self.token = token
+        self.mime = mime
+        self.digest: Optional[str] = None  # spooled full clip, once finished
+        self.created = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self._buf = bytearray()
+        self._readers = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def append(self, data: bytes) -> None:
+        with self._cond:
+            if not self.finished:
+                self._buf += data
+                self._cond.notify_all()
+
+    def finish(self, digest: Optional[str] = None) -> None:
+        """Mark the clip complete (``digest`` of the spooled file) or abandoned (None)."""
+        with self._cond:
+            if self.finished:
+                return
+            self.digest = digest
+            self.finished_at = time.monotonic()
+            self._release()
+            self._cond.notify_all()
+
+    def read_from(self, pos: int, timeout: float) -> Tuple[bytes, bool]:
+        """Bytes after ``pos`` (waits up to ``timeout`` for more) and whether the clip is complete."""
+        with self._cond:
+            if pos >= len(self._buf) and not self.finished:
+                self._cond.wait(timeout)
+            block = bytes(self._buf[pos:pos + _SEND_BLOCK])
+            return block, self.finished and pos + len(block) >= len(self._buf)
+
+    def attach(self) -> None:
+        with self._cond:
+            self._readers += 1
+
+    def detach(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            self._release()
+
+    def _release(self) -> None:
+        # New requests are redirected to the spooled clip; keep the buffer only for readers mid-stream
+        if self.finished and self._readers <= 0:
+            self._buf = bytearray()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "VocalBrandAssets/1"
+    store: SampleStore  # set on the per-server subclass
+    assets: "AssetServer"  # the owning server (live clips, URL building)
+
+    def log_message(self, fmt: str, *args) -> None:  # route access logs to our logger
+        logger.debug("%s " + fmt, self.address_string(), *args)
+
+    def do_HEAD(self) -> None:
+        self._serve(body=False)
+
+    def do_GET(self) -> None:
+        self._serve(body=True)
+
+    def _serve(self, *, body: bool) -> None:
+        url = urlsplit(self.path)
+        live = _LIVE_RE.match(url.path)
+        if live:
+            self._serve_live(self.assets.get_live(live.group(1)), body=body)
+            return
+        m = _PATH_RE.match(url.path)
+        query = parse_qs(url.query)
+        signed = m is not None and self.assets.verify(m.group(1), (query.get("sig") or [""])[0])
+        handle = self.store.get(m.group(1)) if signed else None
+        if handle is None:
+            self.send_error(404)
+            return
+        etag = f'"{handle.digest}"'
+        if etag in [t.strip() for t in (self.headers.get("If-None-Match") or "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            metrics_collector.incr("asset_server_not_modified")
+            return
+        self.store.touch(handle.digest)
+        size = handle.size
+        try:
+            rng = parse_range(self.headers.get("Range", ""), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.end_headers()
+            return
+        start, end = rng if rng is not None else (0, size - 1)
+        length = end - start + 1 if size else 0
+        with handle.open() as fh:
+            mime = _MIME.get(sniff_format(fh.read(12)) or "", "application/octet-stream")
+            self.send_response(206 if rng is not None else 200)
+            self.send_header("Content-Type", mime)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+            if rng is not None:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            download = query.get("download")
+            if download:
+                self.send_header("Content-Disposition", f'attachment; filename="{_safe_filename(download[0])}"')
+            self.end_headers()
+            if not body:
+                return
+            fh.seek(start)
+            remaining = length
+            try:
+                while remaining > 0:
+                    block = fh.read(min(_SEND_BLOCK, remaining))
+                    if not block:
+                        break
+                    self.wfile.write(block)
+                    remaining -= len(block)
+            except (BrokenPipeError, ConnectionResetError):
+                return  # player seeked or tab closed mid-transfer
+        metrics_collector.incr("asset_server_bytes_sent", length - remaining)
+
+    def _serve_live(self, live: Optional[LiveAsset], *, body: bool) -> None:
+        if live is None:
+            self.send_error(404)
+            return
+        live.attach()  # before looking at the state, so a concurrent finish keeps the buffer
+        pos = 0
+        try:
+            if live.finished:
+                if live.digest is None:
+                    self.send_error(404)
+                else:
+                    self.send_response(302)
+                    self.send_header("Location", self.assets.url(live.digest))
+                    self.end_headers()
+                return
+            # No Content-Length: the body ends when the connection closes (HTTP/1.0)
+            self.send_response(200)
+            self.send_header("Content-Type", live.mime)
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            if not body:
+                return
+            idle_since = time.monotonic()
+            while True:
+                block, done = live.read_from(pos, timeout=1.0)
+                if block:
+                    self.wfile.write(block)
+                    self.wfile.flush()
+                    pos += len(block)
+                    idle_since = time.monotonic()
+                if done or time.monotonic() - idle_since > _LIVE_STALL_SEC:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # player closed or re-requested
+        finally:
+            live.detach()
+        metrics_collector.incr("asset_server_live_bytes_sent", pos)
+
+
+class AssetServer:
+    """Threaded HTTP server over a ``SampleStore``, run in a daemon thread."""
+
+    def __init__(
+        self,
+        store: SampleStore,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        base_url: Optional[str] = None,
+        secret: Optional[bytes] = None,
+    ):
+        self.store = store
+        self._secret = secret or secrets.token_bytes(32)
+        self._live: Dict[str, LiveAsset] = {}
+        self._live_lock = threading.Lock()
+        handler = type("AssetHandler", (_Handler,), {"store": store, "assets": self})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self.public = bool(base_url)  # False: only reachable from this machine
+        self.base_url = (base_url or f"http://localhost:{self.port}").rstrip("/")
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "AssetServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="vb-assets", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread = None
+
+    def sign(self, digest: str) -> str:
+        return hmac.new(self._secret, digest.encode("ascii"), hashlib.sha256).hexdigest()[:32]
+
+    def verify(self, digest: str, sig: str) -> bool:
+        return hmac.compare_digest(self.sign(digest), sig)
+
+    def url(self, digest: str, *, download: Optional[str] = None) -> str:
+        url = f"{self.base_url}/a/{digest}?sig={self.sign(digest)}"
+        return url + (f"&download={quote(download)}" if download else "")
+
+    def open_live(self, mime: str) -> LiveAsset:
+        """Register a clip that is about to be produced; play it via ``live_url``."""
+        now = time.monotonic()
+        with self._live_lock:
+            # Finished (or never finished by a crashed producer) clips expire
+            for token in [t for t, a in self._live.items() if now - (a.finished_at or a.created) > _LIVE_TTL_SEC]:
+                del self._live[token]
+            asset = LiveAsset(secrets.token_urlsafe(16), mime)
+            self._live[asset.token] = asset
+        return asset
+
+    def get_live(self, token: str) -> Optional[LiveAsset]:
+        return self._live.get(token)
+
+    def live_url(self, token: str) -> str:
+        return f"{self.base_url}/live/{token}"
+
+
+_SHARED_SERVER: Optional[AssetServer] = None
+_SHARED_FAILED = False
+_SHARED_LOCK = threading.Lock()
+
+
+def get_asset_server() -> Optional[AssetServer]:
+    """Return the process-wide asset server, or None when disabled or unable to bind."""
+    global _SHARED_SERVER, _SHARED_FAILED
+    if os.getenv("VOCALBRAND_ASSET_SERVER", "1") == "0":
+        return None
+    if _SHARED_SERVER is None and not _SHARED_FAILED:
+        with _SHARED_LOCK:
+            if _SHARED_SERVER is None and not _SHARED_FAILED:
+                try:
+                    _SHARED_SERVER = AssetServer(
+                        get_sample_store(),
+                        host=os.getenv("VOCALBRAND_ASSET_HOST", "127.0.0.1"),
+                        port=int(os.getenv("VOCALBRAND_ASSET_PORT", "8765")),
+                        base_url=os.getenv("VOCALBRAND_ASSET_BASE_URL") or None,
+                        secret=os.getenv("VOCALBRAND_ASSET_SECRET", "").encode() or None,
+                    ).start()
+                except OSError as e:
+                    _SHARED_FAILED = True
+                    logger.warning("Asset server unavailable (%s); serving audio inline", e)
+    return _SHARED_SERVER
@@ -0,0 +1,218 @@
+"""Decode a voice sample once and derive every measurement from that buffer.
+
+Validation, the waveform preview, silence trimming and clone conditioning
+used to decode the same bytes separately (each decode of a compressed file
+is an ffmpeg subprocess). ``analyze_audio`` decodes once into an int16
+NumPy array (natively for WAV, see ``utils.audio_decode``); everything
+else is computed from it.
+
+    analysis = analyze_audio(raw_bytes)
+    analysis.duration, analysis.dbfs, analysis.quality()
+    analysis.envelope(1200)            # downsampled waveform for plotting
+    analysis.peaks(800)                # int8 min/max pairs for the browser renderer
+    analysis.silence_bounds()          # (start_ms, end_ms) of speech (vectorized RMS)
+    analysis.trim(start_ms, end_ms)    # zero-copy slice
+    analysis.to_wav(start_ms, end_ms)  # PCM slice, no re-decode
+
+Results are cached per sample digest by ``utils.analysis_cache``.
+
+Environment flags:
+    VOCALBRAND_PEAKS_BUCKETS           -> waveform resolution in buckets (default 800)
+"""
+from __future__ import annotations
+import os
+import wave
+import logging
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from metrics import metrics_collector
+from utils.audio_decode import WavFormatError, decode_wav, sniff_format
+
+logger = logging.getLogger("vocalbrand.audio_analysis")
+
+_SILENCE_FLOOR_DBFS = -120.0
+PEAKS_BUCKETS = int(os.getenv("VOCALBRAND_PEAKS_BUCKETS", "800"))
+
+
+class AudioAnalysis:
+    """Decoded PCM (int16, shape ``(frames, channels)``) plus derived metrics."""
+
+    def __init__(self, pcm: np.ndarray, sample_rate: int):
+        if pcm.ndim == 1:
+            pcm = pcm.reshape(-1, 1)
+        self.pcm = pcm
+        self.sample_rate = int(sample_rate)
+        self._mono: Optional[np.ndarray] = None
+
+    @property
+    def channels(self) -> int:
+        return int(self.pcm.shape[1])
+
+    @property
+    def frames(self) -> int:
+        return int(self.pcm.shape[0])
+
+    @property
+    def duration(self) -> float:
+        return self.frames / float(self.sample_rate) if self.sample_rate else 0.0
+
+    @property
+    def mono(self) -> np.ndarray:
+        """Channel-averaged float32 samples in [-1, 1] (computed once)."""
+        if self._mono is None:
+            mono = self.pcm.astype(np.float32)
+            mono = mono.mean(axis=1) if self.channels > 1 else mono[:, 0]
+            self._mono = mono / 32768.0
+        return self._mono
+
+    @property
+    def dbfs(self) -> Optional[float]:
+        """RMS loudness over all channels (None for digital silence)."""
+        if not self.frames:
+            return None
+        rms = float(np.sqrt(np.mean(np.square(self.pcm, dtype=np.float64))))
+        return None if rms == 0 else 20 * np.log10(rms / 32768.0)
+
+    @property
+    def peak_dbfs(self) -> float:
+        peak = int(np.max(np.abs(self.pcm.astype(np.int32)))) if self.frames else 0
+        return _SILENCE_FLOOR_DBFS if peak == 0 else float(20 * np.log10(peak / 32768.0))
+
+    def quality(self) -> Dict[str, Any]:
+        from utils.audio_utils import quality_score
+        return quality_score(self.duration, self.dbfs)
+
+    def envelope(self, points: int = 1200) -> np.ndarray:
+        """Bucket-averaged mono waveform normalized to [-1, 1]."""
+        arr = self.mono
+        if len(arr) > points:
+            step = len(arr) // points
+            arr = arr[: points * step].reshape(-1, step).mean(axis=1)
+        maxv = float(np.max(np.abs(arr))) if len(arr) else 0.0
+        return (arr / (maxv or 1.0)).astype(np.float32)
+
+    def peaks(self, buckets: int = PEAKS_BUCKETS) -> np.ndarray:
+        """Per-bucket (min, max) of the mono waveform as int8, shape ``(buckets, 2)``.
+
+        Scaled so the loudest sample maps to +/-127. Short samples yield
+        fewer buckets (one per frame).
+        """
+        arr = self.mono
+        n = min(buckets, len(arr))
+        if not n:
+            return np.zeros((0, 2), dtype=np.int8)
+        step = len(arr) // n
+        frames = arr[: n * step].reshape(n, step)
+        out = np.stack([frames.min(axis=1), frames.max(axis=1)], axis=1)
+        scale = float(np.max(np.abs(out))) or 1.0
+        return np.round(out * (127.0 / scale)).astype(np.int8)
+
+    def segment(self):
+        """Wrap the decoded PCM as a pydub ``AudioSegment`` without decoding again."""
+        from pydub import AudioSegment  # type: ignore
+        return AudioSegment(
+            data=np.ascontiguousarray(self.pcm).tobytes(),
+            sample_width=2,
+            frame_rate=self.sample_rate,
+            channels=self.channels,
+        )
+
+    def frame_dbfs(self, *, window_ms: int = 20, hop_ms: int = 10) -> np.ndarray:
+        """RMS level (dBFS) of each ``window_ms`` frame, one every ``hop_ms``.
+
+        Computed in one vectorized pass from a running sum of squares.
+        """
+        win = max(1, int(self.sample_rate * window_ms / 1000))
+        hop = max(1, int(self.sample_rate * hop_ms / 1000))
+        x = self.mono.astype(np.float64)
+        if len(x) < win:
+            return np.full(1 if len(x) else 0, _SILENCE_FLOOR_DBFS)
+        csum = np.concatenate(([0.0], np.cumsum(x * x)))
+        starts = np.arange(0, len(x) - win + 1, hop)
+        mean_sq = (csum[starts + win] - csum[starts]) / win
+        return 10.0 * np.log10(np.maximum(mean_sq, 1e-12))
+
+    def silence_bounds(
+        self,
+        *,
+        thresh_dbfs: float = -40.0,
+        window_ms: int = 20,
+        pad_ms: int = 20,
+        hysteresis_db: float = 6.0,
+        hop_ms: int = 10,
+        min_speech_ms: int = 60,
+    ) -> Optional[Tuple[int, int]]:
+        """Return ``(start_ms, end_ms)`` spanning all speech (padded), or None if all silent.
+
+        Hysteresis: a region opens on a frame louder than ``thresh_dbfs`` and
+        extends while frames stay above ``thresh_dbfs - hysteresis_db``, so
+        soft word onsets/tails are kept. Regions shorter than
+        ``min_speech_ms`` (clicks, pops) are ignored.
+        """
+        db = self.frame_dbfs(window_ms=window_ms, hop_ms=hop_ms)
+        if not len(db):
+            return None
+        loud = db > thresh_dbfs
+        sustained = db > thresh_dbfs - hysteresis_db
+        if not loud.any():
+            return None
+        # Label runs of sustained frames, keep runs that contain a loud frame and are long enough
+        edges = np.diff(np.concatenate(([0], sustained.astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)  # exclusive
+        run_id = np.cumsum(edges[:-1] == 1) - 1
+        has_loud = np.bincount(run_id[loud], minlength=len(run_starts)) > 0
+        hop = max(1, int(self.sample_rate * hop_ms / 1000)) / self.sample_rate * 1000
+        win = window_ms
+        long_enough = (run_ends - run_starts - 1) * hop + win >= min_speech_ms
+        keep = np.flatnonzero(has_loud & long_enough)
+        if not len(keep):
+            return None
+        dur_ms = int(round(self.duration * 1000))
+        start_ms = int(run_starts[keep[0]] * hop)
+        end_ms = int((run_ends[keep[-1]] - 1) * hop + win)
+        return max(0, start_ms - pad_ms), min(dur_ms, end_ms + pad_ms)
+
+    def trim(self, start_ms: int, end_ms: int) -> "AudioAnalysis":
+        """Slice to ``[start_ms, end_ms)`` without copying or re-encoding."""
+        lo = int(start_ms * self.sample_rate / 1000)
+        hi = int(end_ms * self.sample_rate / 1000)
+        return AudioAnalysis(self.pcm[lo:hi], self.sample_rate)
+
+    def to_wav(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> bytes:
+        """Encode (a slice of) the PCM as 16-bit WAV."""
+        lo = 0 if start_ms is None else int(start_ms * self.sample_rate / 1000)
+        hi = self.frames if end_ms is None else int(end_ms * self.sample_rate / 1000)
+        out = BytesIO()
+        with wave.open(out, "wb") as w:
+            w.setnchannels(self.channels)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(np.ascontiguousarray(self.pcm[lo:hi]).tobytes())
+        return out.getvalue()
+
+
+def analyze_audio(data: bytes, fmt: Optional[str] = None, *, key: Optional[str] = None) -> AudioAnalysis:
+    """Decode ``data`` once (raises on undecodable input).
+
+    The container is sniffed from magic bytes (``fmt`` is only a fallback
+    hint). WAV is parsed natively without copying; compressed formats go
+    through the bounded ffmpeg pool (``utils.decode_service``), where
+    concurrent decodes of the same ``key`` share one job.
+    """
+    sniffed = sniff_format(data)
+    if sniffed == "wav":
+        try:
+            pcm, rate = decode_wav(data)
+            metrics_collector.incr("audio_decode_native")
+            return AudioAnalysis(pcm, rate)
+        except WavFormatError as e:
+            logger.info("Native WAV decode declined (%s); using ffmpeg", e)
+    from utils.decode_service import get_decode_service
+    metrics_collector.incr("audio_decode_ffmpeg")
+    pcm, rate = decode_wav(get_decode_service().decode_to_wav(data, sniffed or fmt, key=key))
+    return AudioAnalysis(pcm, rate)
+
@@ -0,0 +1,121 @@
+"""Condition voice samples before they are uploaded for cloning.
+
+Recorders hand us uncompressed (often stereo 48 kHz) WAV; a 60s sample is
+~11 MB, and uploading it dominates clone latency. Voice cloning does not
+need that: the sample is downmixed to mono, resampled to a speech-friendly
+rate, loudness-normalized (peak-safe) and encoded compactly.
+
+Encoding prefers FLAC (lossless) or high-bitrate MP3, both of which need
+ffmpeg (run through the bounded pool in ``utils.decode_service``); without
+it the conditioned audio is written as mono 16-bit WAV, which is still
+several times smaller than the original.
+
+Environment flags:
+    VOCALBRAND_CLONE_CONDITIONING=0    -> upload samples untouched
+    VOCALBRAND_CLONE_SAMPLE_RATE       -> target sample rate in Hz (default 24000)
+    VOCALBRAND_CLONE_FORMAT            -> flac | mp3 | wav (default flac)
+    VOCALBRAND_CLONE_MP3_BITRATE       -> bitrate when format=mp3 (default 192k)
+    VOCALBRAND_CLONE_TARGET_DBFS       -> loudness target (default -16)
+"""
+from __future__ import annotations
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.audio_conditioning")
+
+PEAK_CEILING_DBFS = -1.0
+_MIME = {"flac": "audio/flac", "mp3": "audio/mpeg", "wav": "audio/wav"}
+
+
+@dataclass
+class ConditionedAudio:
+    data: bytes
+    filename: str
+    mime: str
+    info: Dict[str, Any] = field(default_factory=dict)
+
+
+def _encode(seg, fmt: str, bitrate: str) -> tuple[bytes, str]:
+    """Encode ``seg`` as ``fmt``, falling back to WAV when ffmpeg is unavailable."""
+    out = BytesIO()
+    seg.export(out, format="wav")  # in-process
+    wav = out.getvalue()
+    if fmt in ("flac", "mp3"):
+        try:
+            from utils.decode_service import get_decode_service
+            return get_decode_service().transcode(wav, fmt, bitrate=bitrate if fmt == "mp3" else None), fmt
+        except Exception as e:  # noqa: BLE001
+            logger.info("Encoding %s unavailable (%s); using WAV", fmt, e)
+    return wav, "wav"
+
+
+@metrics_collector.timing("clone_conditioning")
+def condition_for_clone(
+    data: bytes,
+    *,
+    filename: str = "voice.wav",
+    target_rate: Optional[int] = None,
+    fmt: Optional[str] = None,
+    target_dbfs: Optional[float] = None,
+    analysis=None,
+) -> ConditionedAudio:
+    """Return a smaller, upload-ready rendition of ``data``.
+
+    Pass the sample's ``AudioAnalysis`` to reuse its decoded PCM. Never
+    raises: if decoding fails, or the result would not be smaller, the
+    original bytes are returned unchanged (``info['applied']`` is False).
+    """
+    untouched = ConditionedAudio(data=data, filename=filename, mime="application/octet-stream", info={"applied": False})
+    if os.getenv("VOCALBRAND_CLONE_CONDITIONING", "1") == "0" or not data:
+        return untouched
+    target_rate = target_rate or int(os.getenv("VOCALBRAND_CLONE_SAMPLE_RATE", "24000"))
+    fmt = (fmt or os.getenv("VOCALBRAND_CLONE_FORMAT", "flac")).lower()
+    target_dbfs = float(os.getenv("VOCALBRAND_CLONE_TARGET_DBFS", "-16")) if target_dbfs is None else target_dbfs
+    start = time.perf_counter()
+    try:
+        if analysis is None:
+            from utils.audio_analysis import analyze_audio
+            analysis = analyze_audio(data)
+        seg = analysis.segment()
+        orig = {"channels": seg.channels, "rate": seg.frame_rate, "dbfs": seg.dBFS}
+        seg = seg.set_channels(1)
+        if seg.frame_rate > target_rate:
+            seg = seg.set_frame_rate(target_rate)
+        gain = 0.0
+        if seg.dBFS != float("-inf"):
+            gain = min(target_dbfs - seg.dBFS, PEAK_CEILING_DBFS - seg.max_dBFS)
+            seg = seg.apply_gain(gain)
+        encoded, used_fmt = _encode(seg, fmt, os.getenv("VOCALBRAND_CLONE_MP3_BITRATE", "192k"))
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Clone conditioning skipped: %s", e)
+        metrics_collector.incr("clone_conditioning_failed")
+        return untouched
+    elapsed = time.perf_counter() - start
+    if len(encoded) >= len(data):
+        return untouched
+    metrics_collector.incr("clone_conditioning_bytes_in", len(data))
+    metrics_collector.incr("clone_conditioning_bytes_out", len(encoded))
+    metrics_collector.gauge("clone_conditioning_last_ratio", round(len(encoded) / len(data), 3))
+    stem = os.path.splitext(filename or "voice")[0] or "voice"
+    return ConditionedAudio(
+        data=encoded,
+        filename=f"{stem}.{used_fmt}",
+        mime=_MIME[used_fmt],
+        info={
+            "applied": True,
+            "format": used_fmt,
+            "bytes_in": len(data),
+            "bytes_out": len(encoded),
+            "from_channels": orig["channels"],
+            "from_rate": orig["rate"],
+            "rate": seg.frame_rate,
+            "gain_db": round(gain, 2),
+            "elapsed_sec": round(elapsed, 3),
+        },
+    )
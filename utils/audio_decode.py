@@ -0,0 +1,97 @@
+"""Container sniffing and a native RIFF/WAV decoder.
+
+Both recorders produce plain PCM WAV, yet ``AudioSegment.from_file`` starts
+ffmpeg/ffprobe for it. Here the format is identified from magic bytes and
+WAV is parsed directly: 16-bit PCM comes back as a zero-copy NumPy view of
+the caller's buffer (``bytes``, ``memoryview`` or an ``mmap``), so
+ingest-time decoding costs no subprocess and works where ffmpeg is missing.
+Only compressed containers (webm, mp4, mp3, ogg, flac) go through ffmpeg.
+"""
+from __future__ import annotations
+import struct
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(ValueError):
+    """The buffer is not a WAV layout the native decoder handles."""
+
+
+def sniff_format(data: Buffer) -> Optional[str]:
+    """Identify the container from its leading bytes (None if unknown)."""
+    head = bytes(data[:12])
+    if len(head) < 4:
+        return None
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"  # EBML (webm / matroska)
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:3] == b"ID3" or (head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def decode_wav(data: Buffer) -> Tuple[np.ndarray, int]:
+    """Parse a RIFF/WAV buffer into (int16 PCM of shape (frames, channels), sample_rate).
+
+    16-bit PCM is returned as a read-only view of ``data`` (no copy); 8/24/32-bit
+    integer and 32-bit float samples are converted to int16.
+    """
+    view = memoryview(data).cast("B")
+    if len(view) < 12 or bytes(view[:4]) != b"RIFF" or bytes(view[8:12]) != b"WAVE":
+        raise WavFormatError("not a RIFF/WAVE buffer")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(view):
+        chunk_id = bytes(view[pos:pos + 4])
+        size = struct.unpack_from("<I", view, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            if size < 16:
+                raise WavFormatError("truncated fmt chunk")
+            tag, channels, rate, _byte_rate, block_align, bits = struct.unpack_from("<HHIIHH", view, body)
+            if tag == _WAVE_FORMAT_EXTENSIBLE and size >= 40:
+                tag = struct.unpack_from("<H", view, body + 24)[0]  # first two bytes of the SubFormat GUID
+            fmt = (tag, channels, rate, block_align, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavFormatError("data chunk before fmt chunk")
+            # Streaming writers leave size 0 / 0xFFFFFFFF; clamp to what is actually there
+            end = len(view) if size in (0, 0xFFFFFFFF) else min(len(view), body + size)
+            return _to_int16(view[body:end], *fmt)
+        pos = body + size + (size & 1)  # chunks are word-aligned
+    raise WavFormatError("no data chunk")
+
+
+def _to_int16(payload: memoryview, tag: int, channels: int, rate: int, block_align: int, bits: int) -> Tuple[np.ndarray, int]:
+    if channels < 1 or rate < 1 or block_align < 1:
+        raise WavFormatError("invalid fmt chunk")
+    usable = len(payload) - len(payload) % block_align
+    payload = payload[:usable]
+    if tag == _WAVE_FORMAT_PCM and bits == 16:
+        pcm = np.frombuffer(payload, dtype="<i2")
+    elif tag == _WAVE_FORMAT_PCM and bits == 8:
+        pcm = ((np.frombuffer(payload, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    elif tag == _WAVE_FORMAT_PCM and bits == 24:
+        raw = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3)
+        pcm = ((raw[:, 2].astype(np.int16) << 8) | raw[:, 1]).astype(np.int16)  # keep the top 16 bits
+    elif tag == _WAVE_FORMAT_PCM and bits == 32:
+        pcm = (np.frombuffer(payload, dtype="<i4") >> 16).astype(np.int16)
+    elif tag == _WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        pcm = (np.clip(np.frombuffer(payload, dtype="<f4"), -1.0, 1.0) * 32767).astype(np.int16)
+    else:
+        raise WavFormatError(f"unsupported WAV encoding (tag={tag:#x}, bits={bits})")
+    return pcm.reshape(-1, channels), rate
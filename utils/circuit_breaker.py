@@ -0,0 +1,139 @@
+"""Circuit breaker for the ElevenLabs upstream.
+
+When ElevenLabs is degraded every caller would otherwise sit through full
+timeouts and retry sleeps, tying up Streamlit script threads for all users.
+The breaker watches a sliding window of recent calls and trips OPEN when the
+error rate or the slow-call rate crosses its threshold. While open, calls
+fail fast with ``CircuitOpenError``. After ``open_seconds`` it goes HALF_OPEN
+and lets exactly one probe through; a healthy probe closes the circuit, a
+failed one re-opens it.
+
+State is published to ``metrics_collector`` (gauge ``circuit_state``:
+0=closed, 1=half_open, 2=open).
+"""
+from __future__ import annotations
+import time
+import threading
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import requests
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling upstream while the circuit is open."""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"circuit_open: upstream unavailable, retry in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str = "elevenlabs",
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_sec: float = 20.0,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_sec = slow_call_sec
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics_collector.gauge("circuit_state", _STATE_GAUGE[self.state])
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("Circuit %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            metrics_collector.incr("circuit_opened")
+        elif state == CLOSED:
+            self._window.clear()
+        self._publish()
+
+    def retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Return True if a call may go upstream now (claims the probe slot when half-open)."""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self._transition(HALF_OPEN)
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            metrics_collector.incr("circuit_rejections")
+            return False
+
+    def check(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call is allowed."""
+        if not self.allow():
+            raise CircuitOpenError(self.retry_in() or self.open_seconds)
+
+    def release(self) -> None:
+        """Give back a claimed half-open probe slot without recording an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, success: bool, elapsed: float = 0.0, *, count_latency: bool = True) -> None:
+        slow = bool(count_latency and self.slow_call_sec and elapsed >= self.slow_call_sec)
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._transition(CLOSED if (success and not slow) else OPEN)
+                return
+            if self.state == OPEN:
+                return
+            self._window.append((not success, slow))
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for failed, _ in self._window if failed)
+            slow_calls = sum(1 for _, s in self._window if s)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_rate:
+                self._transition(OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._window)
+            failures = sum(1 for failed, _ in self._window if failed)
+            slow_calls = sum(1 for _, s in self._window if s)
+            retry_in: Optional[float] = round(self.retry_in(), 1) if self.state == OPEN else None
+            return {
+                "name": self.name,
+                "state": self.state,
+                "window_calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_rate": round(slow_calls / calls, 3) if calls else 0.0,
+                "retry_in_sec": retry_in,
+            }
@@ -0,0 +1,60 @@
+"""End-to-end time budgets for engine and voice-manager operations.
+
+A ``Deadline`` is created once at the top of an operation and handed down
+to every nested HTTP call, poll loop and sleep. Each step only gets the
+budget that is left (``clip``), so retries, cleanup and quota polling can
+never add up to more than the caller asked for.
+
+Operations accept ``deadline=`` as either a ``Deadline`` or a number of
+seconds; ``None`` keeps the previous unbounded behaviour.
+"""
+from __future__ import annotations
+import time
+from typing import Optional, Union
+
+
+class DeadlineExceeded(Exception):
+    """The operation's time budget ran out."""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.budget = float(seconds)
+        self.expires_at = time.monotonic() + self.budget
+
+    @classmethod
+    def coerce(cls, value: Union["Deadline", float, int, None]) -> Optional["Deadline"]:
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(float(value))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded(f"deadline of {self.budget:.1f}s exceeded")
+
+    def clip(self, seconds: float) -> float:
+        """Return ``seconds`` capped to the remaining budget (raises when none is left)."""
+        self.check()
+        return min(float(seconds), self.remaining())
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep at most the remaining budget; raise if the budget ran out."""
+        time.sleep(self.clip(seconds))
+        self.check()
+
+
+def clip_timeout(deadline: Optional[Deadline], seconds: float) -> float:
+    return seconds if deadline is None else deadline.clip(seconds)
+
+
+def bounded_sleep(deadline: Optional[Deadline], seconds: float) -> None:
+    if deadline is None:
+        time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
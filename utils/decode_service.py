@@ -0,0 +1,203 @@
+"""Bounded decode/transcode service for compressed audio.
+
+pydub starts a fresh ffmpeg (and often ffprobe) per call from whichever
+thread asked, so concurrent users could fork any number of processes and
+every decode ran inline in a Streamlit script thread. All ffmpeg work now
+goes through one process-wide service:
+
+* at most ``workers`` ffmpeg processes run at once (a fixed thread pool,
+  each thread owning one pipe-driven ffmpeg child per job);
+* at most ``queue`` further jobs wait; beyond that ``submit`` fails fast
+  with ``DecodeBusy`` instead of piling up;
+* every job has a timeout after which its process is killed;
+* identical in-flight jobs (same key) share one future, so a rerun while a
+  decode is running waits on it instead of starting another.
+
+Decoding asks ffmpeg for 16-bit WAV on stdout, to be parsed by the native
+reader (``utils.audio_decode``); no ffprobe. Input is piped on stdin except
+for MP4-family containers, whose index may sit at the end of the file and
+need a seekable temp file.
+
+Environment flags:
+    VOCALBRAND_DECODE_WORKERS          -> concurrent ffmpeg processes (default 2)
+    VOCALBRAND_DECODE_QUEUE            -> jobs allowed to wait (default 8)
+    VOCALBRAND_DECODE_TIMEOUT_SEC      -> per-job limit, incl. queueing (default 60)
+"""
+from __future__ import annotations
+import os
+import time
+import shutil
+import logging
+import threading
+import tempfile
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.decode_service")
+
+_SEEKABLE_FORMATS = {"mp4", "m4a", "mov", "3gp"}
+
+
+class DecodeError(RuntimeError):
+    """ffmpeg failed, is unavailable, or rejected the input."""
+
+
+class DecodeBusy(DecodeError):
+    """The queue is full; retry later."""
+
+
+class DecodeTimeout(DecodeError):
+    """The job did not finish within its timeout (its process was killed)."""
+
+
+def find_ffmpeg() -> Optional[str]:
+    candidate = os.getenv("FFMPEG_BINARY")
+    if candidate and Path(candidate).exists():
+        return candidate
+    return shutil.which("ffmpeg")
+
+
+class DecodeService:
+    """Fixed pool of ffmpeg runners with a bounded wait queue."""
+
+    def __init__(self, *, workers: int = 2, queue: int = 8, timeout: float = 60.0, ffmpeg: Optional[str] = None):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.ffmpeg = ffmpeg or find_ffmpeg()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vb-decode")
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, queue))
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    # -- job plumbing -----------------------------------------------------
+    @metrics_collector.timing("decode_service_job")
+    def _run(self, args: List[str], data: Optional[bytes], deadline: float, spill: bool) -> bytes:
+        if not self.ffmpeg:
+            raise DecodeError("ffmpeg not available")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            metrics_collector.incr("decode_service_timeouts")
+            raise DecodeTimeout("timed out in queue")
+        tmp_path = None
+        if spill:
+            with tempfile.NamedTemporaryFile(prefix="vb_decode_", delete=False) as tmp:
+                tmp.write(data)
+                tmp_path = tmp.name
+            args = [tmp_path if a == "pipe:0" else a for a in args]
+        cmd = [self.ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error", *args]
+        piped = not spill and data is not None  # else ffmpeg reads a file path from args
+        try:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE if piped else subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            try:
+                out, err = proc.communicate(input=bytes(data) if piped else None, timeout=remaining)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                metrics_collector.incr("decode_service_timeouts")
+                raise DecodeTimeout(f"ffmpeg exceeded {self.timeout:.0f}s")
+        finally:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        if proc.returncode != 0:
+            raise DecodeError(f"ffmpeg exit {proc.returncode}: {err.decode('utf-8', 'replace').strip()[-300:]}")
+        return out
+
+    def _submit(self, key: Optional[Hashable], args: List[str], data: Optional[bytes], spill: bool = False) -> Future:
+        with self._lock:
+            if key is not None and key in self._inflight:
+                metrics_collector.incr("decode_service_joined")
+                return self._inflight[key]
+            if not self._slots.acquire(blocking=False):
+                metrics_collector.incr("decode_service_rejected")
+                raise DecodeBusy("decoder busy, please retry in a moment")
+            self._pending += 1
+            metrics_collector.gauge("decode_service_pending", self._pending)
+            fut = self._pool.submit(self._run, args, data, time.monotonic() + self.timeout, spill)
+            if key is not None:
+                self._inflight[key] = fut
+        metrics_collector.incr("decode_service_jobs")
+
+        def _done(f: Future) -> None:
+            self._slots.release()
+            with self._lock:
+                self._pending -= 1
+                metrics_collector.gauge("decode_service_pending", self._pending)
+                if key is not None and self._inflight.get(key) is f:
+                    del self._inflight[key]
+        fut.add_done_callback(_done)
+        return fut
+
+    def _wait(self, fut: Future) -> bytes:
+        try:
+            return fut.result(timeout=self.timeout + 5)
+        except FutureTimeout:
+            raise DecodeTimeout(f"decode exceeded {self.timeout:.0f}s") from None
+
+    # -- public API ---------------------------------------------------------
+    def submit_decode(self, data: bytes, fmt: Optional[str] = None, *, key: Optional[Hashable] = None) -> Future:
+        """Queue a decode; the future resolves to 16-bit WAV bytes."""
+        args = (["-f", fmt] if fmt else []) + ["-i", "pipe:0", "-vn", "-acodec", "pcm_s16le", "-f", "wav", "pipe:1"]
+        return self._submit(key, args, data, spill=(fmt or "").lower() in _SEEKABLE_FORMATS)
+
+    def decode_to_wav(self, data: bytes, fmt: Optional[str] = None, *, key: Optional[Hashable] = None) -> bytes:
+        return self._wait(self.submit_decode(data, fmt, key=key))
+
+    def submit_encode(
+        self,
+        data: Optional[bytes],
+        fmt: str,
+        *,
+        path: Optional[str] = None,
+        src_fmt: Optional[str] = None,
+        codec: Optional[str] = None,
+        bitrate: Optional[str] = None,
+        channels: Optional[int] = None,
+        key: Optional[Hashable] = None,
+    ) -> Future:
+        """Queue an encode to ``fmt``; the future resolves to the encoded bytes.
+
+        The source is ``data`` (piped) or a file at ``path`` that ffmpeg reads
+        directly; ``src_fmt`` is only needed for headerless/ambiguous input.
+        """
+        args = (["-f", src_fmt] if src_fmt else []) + ["-i", path or "pipe:0", "-vn"]
+        args += (["-ac", str(channels)] if channels else []) + (["-c:a", codec] if codec else [])
+        args += (["-b:a", bitrate] if bitrate else []) + ["-f", fmt, "pipe:1"]
+        spill = path is None and (src_fmt or "").lower() in _SEEKABLE_FORMATS
+        return self._submit(key, args, None if path else data, spill=spill)
+
+    def transcode(self, wav: bytes, fmt: str, *, bitrate: Optional[str] = None) -> bytes:
+        """Encode WAV bytes to ``fmt`` (e.g. flac, mp3)."""
+        return self._wait(self.submit_encode(wav, fmt, src_fmt="wav", bitrate=bitrate))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "pending": self._pending, "inflight_keys": len(self._inflight)}
+
+
+_SHARED_SERVICE: Optional[DecodeService] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_decode_service() -> DecodeService:
+    """Return the process-wide decode service."""
+    global _SHARED_SERVICE
+    if _SHARED_SERVICE is None:
+        with _SHARED_LOCK:
+            if _SHARED_SERVICE is None:
+                _SHARED_SERVICE = DecodeService(
+                    workers=int(os.getenv("VOCALBRAND_DECODE_WORKERS", "2")),
+                    queue=int(os.getenv("VOCALBRAND_DECODE_QUEUE", "8")),
+                    timeout=float(os.getenv("VOCALBRAND_DECODE_TIMEOUT_SEC", "60")),
+                )
+    return _SHARED_SERVICE
@@ -0,0 +1,266 @@
+"""Shared pooled HTTP transport for ElevenLabs calls.
+
+A single process-wide transport keeps TCP/TLS connections to
+api.elevenlabs.io alive between requests so generations do not pay a fresh
+DNS lookup + handshake every time.
+
+Thread safety: ``requests.Session`` is not guaranteed to be thread-safe
+(cookie jar, adapter mounting), but urllib3's pool manager is. We therefore
+mount ONE shared ``HTTPAdapter`` (the connection pool) into a lightweight
+per-thread ``Session``. Every Streamlit script thread gets its own session
+object while all of them reuse the same pooled sockets.
+
+Environment flags:
+    VOCALBRAND_HTTP_POOL_CONNECTIONS -> number of host pools to cache (default 4)
+    VOCALBRAND_HTTP_POOL_MAXSIZE     -> max keep-alive sockets per host (default 16)
+    VOCALBRAND_HTTP_CONNECT_TIMEOUT  -> connect timeout in seconds (default 5)
+    VOCALBRAND_HTTP_READ_TIMEOUT     -> default read timeout in seconds (default 40)
+    VOCALBRAND_HTTP_PREWARM=1        -> open a connection in the background once per process
+    VOCALBRAND_RATE_LIMIT=0          -> disable the shared adaptive rate limiter
+    VOCALBRAND_RATE_LIMIT_RPS        -> steady-state requests/second ceiling (default 5)
+    VOCALBRAND_RATE_LIMIT_BURST      -> bucket size (default 10)
+    VOCALBRAND_HTTP_429_RETRIES      -> times a 429 is retried after Retry-After (default 2)
+    VOCALBRAND_BREAKER=0             -> disable the upstream circuit breaker
+    VOCALBRAND_BREAKER_FAILURE_RATE  -> error rate that trips the breaker (default 0.5)
+    VOCALBRAND_BREAKER_SLOW_SEC      -> latency counted as a slow call (default 20)
+    VOCALBRAND_BREAKER_OPEN_SEC      -> seconds open before a half-open probe (default 30)
+"""
+from __future__ import annotations
+import os
+import time
+import threading
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from utils.circuit_breaker import CircuitBreaker
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+logger = logging.getLogger("vocalbrand.http")
+
+ELEVEN_API_BASE = "https://api.elevenlabs.io"
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class RateLimitTimeout(requests.exceptions.Timeout):
+    """No rate-limit token became available within the request's timeout."""
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class HttpTransport:
+    """Keep-alive connection pool shared by every engine / voice manager instance."""
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 40.0,
+        pool_block: bool = False,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        max_429_retries: int = 2,
+        breaker: Optional[CircuitBreaker] = None,
+        adapter: Optional[BaseAdapter] = None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # max_retries=0: retry policy lives in the engine, not hidden in urllib3
+        self._adapter = adapter or HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+            pool_block=pool_block,
+        )
+        self.rate_limiter = rate_limiter
+        self.max_429_retries = max_429_retries
+        self.breaker = breaker
+        self._local = threading.local()
+        self._prewarm_thread: Optional[threading.Thread] = None
+        self._prewarmed = False
+        self._prewarm_lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        sess = getattr(self._local, "session", None)
+        if sess is None:
+            sess = requests.Session()
+            sess.mount("https://", self._adapter)
+            sess.mount("http://", self._adapter)
+            self._local.session = sess
+        return sess
+
+    def timeout(self, read_timeout: Optional[float] = None) -> Tuple[float, float]:
+        """Return a (connect, read) timeout tuple for requests."""
+        return (self.connect_timeout, float(read_timeout if read_timeout is not None else self.read_timeout))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: Optional[Timeout] = None,
+        count_latency: bool = True,
+        deadline: Optional[Deadline] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Issue a request over the shared pool.
+
+        ``timeout`` may be a single read timeout (seconds) or an explicit
+        (connect, read) tuple; a bare number keeps the pool's connect timeout.
+        ``count_latency=False`` exempts inherently slow calls (voice cloning)
+        from the breaker's slow-call rule; their errors still count.
+        Raises ``CircuitOpenError`` without touching the network while the
+        upstream circuit is open. With a ``deadline`` every timeout (limiter
+        wait, connect, read, Retry-After pause) is clipped to the budget left
+        and ``DeadlineExceeded`` is raised once it runs out.
+        """
+        if timeout is None or isinstance(timeout, (int, float)):
+            timeout = self.timeout(timeout)
+        base_timeout = timeout
+        attempts = 0
+        while True:
+            if deadline is not None:
+                timeout = (deadline.clip(base_timeout[0]), deadline.clip(base_timeout[1]))
+            if self.breaker is not None:
+                self.breaker.check()
+            resp = self._send(method, url, timeout, count_latency, kwargs, deadline)
+            if self.rate_limiter is None:
+                return resp
+            if resp.status_code != 429:
+                self.rate_limiter.on_success()
+                return resp
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            self.rate_limiter.on_throttled(retry_after)
+            # Hand the 429 back when retries are spent or the pause outlasts the caller's timeout
+            if attempts >= self.max_429_retries or (retry_after or 0) > timeout[1]:
+                return resp
+            attempts += 1
+            resp.close()
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        timeout: Tuple[float, float],
+        count_latency: bool,
+        kwargs: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+    ) -> requests.Response:
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=timeout[1]):
+            if self.breaker is not None:
+                self.breaker.release()  # local congestion says nothing about upstream health
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded("deadline exceeded waiting for a rate-limit slot")
+            raise RateLimitTimeout(f"rate limiter: no slot within {timeout[1]}s")
+        start = time.perf_counter()
+        try:
+            resp = self._session().request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired():
+                # Our own clipped timeout fired; not evidence of a slow upstream
+                if self.breaker is not None:
+                    self.breaker.release()
+                raise DeadlineExceeded(f"deadline exceeded during {method} {url}") from e
+            if self.breaker is not None:
+                self.breaker.record(False, time.perf_counter() - start, count_latency=count_latency)
+            raise
+        except Exception:
+            if self.breaker is not None:
+                self.breaker.record(False, time.perf_counter() - start, count_latency=count_latency)
+            raise
+        if self.breaker is not None:
+            self.breaker.record(resp.status_code < 500, time.perf_counter() - start, count_latency=count_latency)
+        return resp
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def prewarm(self, url: str = ELEVEN_API_BASE, *, background: bool = True) -> None:
+        """Open (and keep) a pooled connection so the first real call skips the handshake.
+
+        Runs once per transport: app.py calls this on every rerun of every
+        session, and later calls are no-ops.
+        """
+        def _run() -> None:
+            try:
+                # Bypasses the rate limiter: a HEAD to the API root costs no quota
+                resp = self._session().request("HEAD", url, timeout=(self.connect_timeout, 5.0), allow_redirects=False)
+                resp.close()
+                logger.info("HTTP pool prewarmed: %s (status=%s)", url, resp.status_code)
+            except Exception as e:  # noqa: BLE001
+                logger.warning("HTTP pool prewarm failed for %s: %s", url, e)
+
+        with self._prewarm_lock:
+            if self._prewarmed:
+                return
+            self._prewarmed = True
+        if not background:
+            _run()
+            return
+        self._prewarm_thread = threading.Thread(target=_run, name="vb-http-prewarm", daemon=True)
+        self._prewarm_thread.start()
+
+    def close(self) -> None:
+        self._adapter.close()
+
+
+_SHARED_TRANSPORT: Optional[HttpTransport] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Return the process-wide transport, creating it from env settings on first use."""
+    global _SHARED_TRANSPORT
+    if _SHARED_TRANSPORT is None:
+        with _SHARED_LOCK:
+            if _SHARED_TRANSPORT is None:
+                limiter = None
+                if os.getenv("VOCALBRAND_RATE_LIMIT", "1") != "0":
+                    limiter = AdaptiveRateLimiter(
+                        rate=_env_float("VOCALBRAND_RATE_LIMIT_RPS", 5.0),
+                        burst=_env_int("VOCALBRAND_RATE_LIMIT_BURST", 10),
+                    )
+                breaker = None
+                if os.getenv("VOCALBRAND_BREAKER", "1") != "0":
+                    breaker = CircuitBreaker(
+                        "elevenlabs",
+                        failure_rate=_env_float("VOCALBRAND_BREAKER_FAILURE_RATE", 0.5),
+                        slow_call_sec=_env_float("VOCALBRAND_BREAKER_SLOW_SEC", 20.0),
+                        open_seconds=_env_float("VOCALBRAND_BREAKER_OPEN_SEC", 30.0),
+                    )
+                transport = HttpTransport(
+                    pool_connections=_env_int("VOCALBRAND_HTTP_POOL_CONNECTIONS", 4),
+                    pool_maxsize=_env_int("VOCALBRAND_HTTP_POOL_MAXSIZE", 16),
+                    connect_timeout=_env_float("VOCALBRAND_HTTP_CONNECT_TIMEOUT", 5.0),
+                    read_timeout=_env_float("VOCALBRAND_HTTP_READ_TIMEOUT", 40.0),
+                    rate_limiter=limiter,
+                    max_429_retries=_env_int("VOCALBRAND_HTTP_429_RETRIES", 2),
+                    breaker=breaker,
+                )
+                _SHARED_TRANSPORT = transport
+    return _SHARED_TRANSPORT
@@ -0,0 +1,227 @@
+"""Background jobs for long upstream operations (voice clones, speech generation).
+
+Cloning can take 30-120 s and used to run inside the Streamlit script
+thread under ``st.spinner``: the session could not rerun meanwhile and a
+browser refresh lost the result. Work is now submitted as a job:
+
+* the job row (``jobs`` table, see ``db_adapter``) is written first, so
+  status, progress and the JSON result survive reruns, reconnects and new
+  sessions of the same user;
+* a fixed pool of worker threads runs the registered handler for the job's
+  ``kind``; handlers get a ``JobContext`` to report progress and must not
+  touch ``st.*`` (they run outside any script context). Handlers are
+  registered once per process; what a job needs from the submitting session
+  (e.g. its engine/API key) travels in the job's ``env``, which is kept in
+  memory only and never written to the table;
+* the UI polls the row (``st.fragment(run_every=...)`` where available)
+  and renders the result once it is terminal.
+
+Handlers signal expected failures with ``JobError`` (its message is shown
+to the user); anything else is logged and reported generically. A job left
+queued/running by a process on this host that no longer exists is reported
+as interrupted when it is read. Rows older than the retention period are
+deleted when the runner starts and then at most hourly on submit.
+
+Environment flags:
+    VOCALBRAND_JOB_WORKERS             -> concurrent jobs per process (default 4)
+    VOCALBRAND_JOB_RETENTION_DAYS      -> delete job rows older than this (default 7)
+"""
+from __future__ import annotations
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.jobs")
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+_PROGRESS_INTERVAL_SEC = 0.5
+_PURGE_INTERVAL_SEC = 3600.0
+
+
+class JobError(RuntimeError):
+    """Expected job failure; the message is shown to the user."""
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # exists but not ours (EPERM), or unsupported platform
+        return True
+    return True
+
+
+@dataclass
+class JobContext:
+    """What a handler sees: its parameters, in-process ``env`` objects and a progress reporter."""
+
+    job_id: str
+    kind: str
+    user_id: Optional[int]
+    params: Dict[str, Any]
+    env: Dict[str, Any] = field(repr=False)
+    _runner: "JobRunner" = field(repr=False)
+    _last_report: float = 0.0
+
+    def progress(self, fraction: Optional[float] = None, message: Optional[str] = None, *, partial: Optional[Dict[str, Any]] = None) -> None:
+        """Report progress (0..1) and a status line; ``partial`` is stored as the interim result.
+
+        Plain progress updates are throttled; ``partial`` results are always written.
+        """
+        now = time.monotonic()
+        if partial is None and now - self._last_report < _PROGRESS_INTERVAL_SEC:
+            return
+        self._last_report = now
+        self._runner.repo.update_job(
+            self.job_id,
+            progress=None if fraction is None else max(0.0, min(1.0, float(fraction))),
+            message=message,
+            result=None if partial is None else json.dumps(partial),
+        )
+
+
+class JobRunner:
+    """Runs registered handlers on a worker pool; state lives in the ``jobs`` table."""
+
+    def __init__(self, *, workers: int = 4, repo: Any = None, retention_seconds: float = 7 * 86400):
+        if repo is None:
+            import auth as repo  # data access for the jobs table
+        self.repo = repo
+        self.workers = max(1, workers)
+        self.retention_seconds = retention_seconds
+        self._last_purge = 0.0
+        self.owner = _owner()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vb-job")
+        self._handlers: Dict[str, Callable[[JobContext], Dict[str, Any]]] = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: Callable[[JobContext], Dict[str, Any]]) -> None:
+        """Set the handler for ``kind`` (re-registering replaces it)."""
+        self._handlers[kind] = handler
+
+    def handles(self, kind: str) -> bool:
+        return kind in self._handlers
+
+    def submit(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        *,
+        user_id: Optional[int] = None,
+        env: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Persist a queued job and schedule it; returns the job id.
+
+        ``params`` must be JSON-serialisable (it is stored); ``env`` holds
+        in-process objects for the handler and is not.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"no handler registered for job kind {kind!r}")
+        self._maybe_purge()
+        job_id = f"{time.time_ns() // 1_000_000:013x}{uuid.uuid4().hex[:12]}"  # sorts by submission
+        self.repo.create_job(job_id, user_id, kind, json.dumps(params), self.owner)
+        with self._lock:
+            self._active += 1
+            metrics_collector.gauge("jobs_active", self._active)
+        metrics_collector.incr(f"jobs_submitted_{kind}")
+        self._pool.submit(self._run, job_id, kind, user_id, params, dict(env or {}))
+        return job_id
+
+    def purge_expired(self) -> None:
+        """Delete job rows not updated within the retention period."""
+        self._last_purge = time.monotonic()
+        try:
+            self.repo.purge_jobs(self.retention_seconds)
+            metrics_collector.incr("jobs_purges")
+        except Exception:  # noqa: BLE001
+            logger.exception("Job retention purge failed")
+
+    def _maybe_purge(self) -> None:
+        if time.monotonic() - self._last_purge >= _PURGE_INTERVAL_SEC:
+            self.purge_expired()
+
+    def _run(self, job_id: str, kind: str, user_id: Optional[int], params: Dict[str, Any], env: Dict[str, Any]) -> None:
+        try:
+            self.repo.update_job(job_id, status="running")
+            handler = metrics_collector.timing(f"job_{kind}")(self._handlers[kind])
+            result = handler(JobContext(job_id, kind, user_id, params, env, self))
+            self.repo.update_job(job_id, status="succeeded", progress=1.0, message="", result=json.dumps(result or {}))
+            metrics_collector.incr(f"jobs_succeeded_{kind}")
+        except JobError as e:
+            self._fail(job_id, kind, str(e))
+        except Exception as e:  # noqa: BLE001
+            logger.exception("Job %s (%s) crashed", job_id, kind)
+            self._fail(job_id, kind, f"Unexpected error: {e}")
+        finally:
+            with self._lock:
+                self._active -= 1
+                metrics_collector.gauge("jobs_active", self._active)
+
+    def _fail(self, job_id: str, kind: str, message: str) -> None:
+        metrics_collector.incr(f"jobs_failed_{kind}")
+        try:
+            self.repo.update_job(job_id, status="failed", message=message)
+        except Exception:  # noqa: BLE001
+            logger.exception("Could not record failure of job %s", job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job row with ``params``/``result`` decoded, or None."""
+        job = self.repo.get_job(job_id)
+        if job is None:
+            return None
+        if job["status"] not in TERMINAL_STATUSES and self._orphaned(job.get("owner") or ""):
+            message = "Interrupted by a server restart; please try again."
+            self.repo.update_job(job_id, status="failed", message=message)
+            job.update(status="failed", message=message)
+        for key in ("params", "result"):
+            try:
+                job[key] = json.loads(job[key]) if job[key] else {}
+            except (TypeError, ValueError):
+                job[key] = {}
+        return job
+
+    def _orphaned(self, owner: str) -> bool:
+        host, _, pid = owner.rpartition(":")
+        if owner == self.owner or host != socket.gethostname() or not pid.isdigit():
+            return False  # ours, or another host's (cannot check)
+        return not _pid_alive(int(pid))
+
+    def mark_delivered(self, job_id: str) -> None:
+        self.repo.mark_job_delivered(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "active": self._active}
+
+
+_SHARED_RUNNER: Optional[JobRunner] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner."""
+    global _SHARED_RUNNER
+    if _SHARED_RUNNER is None:
+        with _SHARED_LOCK:
+            if _SHARED_RUNNER is None:
+                _SHARED_RUNNER = JobRunner(
+                    workers=int(os.getenv("VOCALBRAND_JOB_WORKERS", "4")),
+                    retention_seconds=float(os.getenv("VOCALBRAND_JOB_RETENTION_DAYS", "7")) * 86400,
+                )
+                _SHARED_RUNNER.purge_expired()
+    return _SHARED_RUNNER
@@ -0,0 +1,130 @@
+"""Incremental ingestion of PCM chunks streamed while the user records.
+
+The Pro Recorder posts 16-bit PCM every couple of seconds during a take
+(see ``utils.pro_recorder``). Each chunk is appended to a growable buffer
+and folded into running statistics (duration, loudness, peak, first/last
+speech window), so when the user stops, the sample is already decoded and
+measured: ingest is a WAV header plus a memcpy instead of an ffmpeg decode.
+
+Chunks are addressed by frame offset, which makes delivery idempotent: a
+re-sent or overlapping chunk only contributes frames not yet received, and
+the running frame count doubles as the acknowledgement sent back to the
+browser.
+"""
+from __future__ import annotations
+import time
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from utils.audio_analysis import AudioAnalysis
+
+_INITIAL_FRAMES = 1 << 18
+
+
+class LiveRecording:
+    """PCM buffer plus running measurements for one in-progress take."""
+
+    def __init__(
+        self,
+        rec_id: str,
+        sample_rate: int,
+        channels: int = 1,
+        *,
+        max_frames: Optional[int] = None,
+        window_ms: int = 20,
+        thresh_dbfs: float = -40.0,
+    ):
+        self.rec_id = rec_id
+        self.sample_rate = int(sample_rate)
+        self.channels = int(channels)
+        self.max_frames = max_frames
+        self.updated_at = time.time()
+        self._buf = np.zeros((_INITIAL_FRAMES, self.channels), dtype=np.int16)
+        self._frames = 0
+        self._sum_sq = 0.0
+        self._peak = 0
+        self._window = max(1, int(self.sample_rate * window_ms / 1000))
+        self._window_ms = window_ms
+        self._thresh_ms = (10 ** (thresh_dbfs / 20) * 32768) ** 2  # mean-square threshold
+        self._windows_done = 0
+        self._first_loud: Optional[int] = None
+        self._last_loud: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    @property
+    def full(self) -> bool:
+        return self.max_frames is not None and self._frames >= self.max_frames
+
+    def append(self, start: int, data: Any) -> int:
+        """Add interleaved int16 frames beginning at frame ``start``; return frames held.
+
+        Frames already received are skipped; a chunk starting past the end
+        (a gap) is ignored, and the returned count tells the sender where to
+        resume. Frames beyond ``max_frames`` are dropped.
+        """
+        pcm = np.frombuffer(data, dtype="<i2")
+        pcm = pcm[: len(pcm) - len(pcm) % self.channels].reshape(-1, self.channels)
+        with self._lock:
+            self.updated_at = time.time()
+            if start > self._frames:
+                return self._frames
+            new = pcm[self._frames - start:]
+            if self.max_frames is not None:
+                new = new[: max(0, self.max_frames - self._frames)]
+            if len(new):
+                self._grow(self._frames + len(new))
+                self._buf[self._frames:self._frames + len(new)] = new
+                self._frames += len(new)
+                wide = new.astype(np.float64)
+                self._sum_sq += float(np.sum(wide * wide))
+                self._peak = max(self._peak, int(np.max(np.abs(wide))))
+                self._scan_windows()
+            return self._frames
+
+    def _grow(self, needed: int) -> None:
+        if needed <= len(self._buf):
+            return
+        size = len(self._buf)
+        while size < needed:
+            size *= 2
+        grown = np.zeros((size, self.channels), dtype=np.int16)
+        grown[: self._frames] = self._buf[: self._frames]
+        self._buf = grown
+
+    def _scan_windows(self) -> None:
+        """Classify complete, not yet seen windows as speech/silence (vectorized)."""
+        total = self._frames // self._window
+        if total <= self._windows_done:
+            return
+        lo, hi = self._windows_done * self._window, total * self._window
+        block = self._buf[lo:hi].astype(np.float64).mean(axis=1).reshape(-1, self._window)
+        loud = np.flatnonzero(np.mean(block * block, axis=1) > self._thresh_ms)
+        if len(loud):
+            if self._first_loud is None:
+                self._first_loud = self._windows_done + int(loud[0])
+            self._last_loud = self._windows_done + int(loud[-1])
+        self._windows_done = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self._frames * self.channels
+            rms = (self._sum_sq / n) ** 0.5 if n else 0.0
+            return {
+                "frames": self._frames,
+                "duration": self._frames / float(self.sample_rate),
+                "loudness_dbfs": None if rms == 0 else float(20 * np.log10(rms / 32768.0)),
+                "peak_dbfs": None if self._peak == 0 else float(20 * np.log10(self._peak / 32768.0)),
+                "speech_start_ms": None if self._first_loud is None else self._first_loud * self._window_ms,
+                "speech_end_ms": None if self._last_loud is None else (self._last_loud + 1) * self._window_ms,
+            }
+
+    def analysis(self) -> AudioAnalysis:
+        """The received audio as an ``AudioAnalysis`` (a compact copy; no decode)."""
+        with self._lock:
+            return AudioAnalysis(self._buf[: self._frames].copy(), self.sample_rate)
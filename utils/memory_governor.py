@@ -0,0 +1,308 @@
+"""Per-session and process-wide accounting of heavy session-state values.
+
+Streamlit keeps every session's ``st.session_state`` in the server process
+for as long as the tab lives, including widget values such as the Pro
+Recorder's last binary frame or a mic recorder's WAV. Nothing bounded that.
+The app now calls ``MemoryGovernor.observe`` once per run with the session
+id and its state; the governor measures the governed keys and, when a
+session or the whole process is over budget, frees the largest *idle*
+values first (unchanged for ``idle_seconds``), according to each key's
+policy:
+
+* ``"spill"``  - bytes-like values move to the sample store and the key
+  holds a ``SampleHandle`` instead;
+* ``"evict"``  - the key is deleted (widget payloads that were already
+  ingested, and that the browser resends if needed);
+* ``"keep"``   - measured and reported, never touched.
+
+Sessions are tracked by id across reruns, so values stay "idle" even though
+Streamlit hands each run a fresh ``SafeSessionState`` wrapper. Widget values
+are re-deserialized on each rerun, so a value is recognised as unchanged by
+its size and content sample rather than its identity.
+
+The governor only writes to the state it was handed by the observing run,
+through that wrapper's locked API. When the whole process is over budget,
+other sessions' largest idle keys are marked instead, and each session frees
+its marked keys at the start of its next run. Sessions that ``is_alive``
+reports closed, or that have not run for ``stale_seconds``, are forgotten.
+
+Environment flags:
+    VOCALBRAND_SESSION_BUDGET_MB       -> resident bytes allowed per session (default 64)
+    VOCALBRAND_MEMORY_BUDGET_MB        -> resident bytes allowed across sessions (default 1024)
+    VOCALBRAND_MEMORY_IDLE_SEC         -> a value must be unchanged this long to be freed (default 30)
+    VOCALBRAND_MEMORY_STALE_SEC        -> sessions not seen for this long are forgotten (default 86400)
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, MutableMapping, Optional, Set, Tuple
+
+import numpy as np
+
+from metrics import metrics_collector
+from utils.sample_store import SampleHandle
+
+logger = logging.getLogger("vocalbrand.memory_governor")
+
+POLICIES = ("keep", "evict", "spill")
+_MAX_DEPTH = 4
+
+
+def measure(value: Any, _depth: int = 0) -> Tuple[int, int]:
+    """Return ``(resident_bytes, spilled_bytes)`` held by ``value``."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return 0, 0
+    if isinstance(value, SampleHandle):
+        return 0, value.size
+    if isinstance(value, (bytes, bytearray)):
+        return len(value), 0
+    if isinstance(value, memoryview):
+        return value.nbytes, 0
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes), 0
+    if isinstance(value, str):
+        return len(value), 0
+    if hasattr(value, "getbuffer"):  # BytesIO, Streamlit UploadedFile
+        with value.getbuffer() as buf:
+            return buf.nbytes, 0
+    if _depth < _MAX_DEPTH and isinstance(value, (list, tuple, set, dict)):
+        items = value.values() if isinstance(value, dict) else value
+        resident, spilled = sys.getsizeof(value), 0
+        for item in items:
+            r, s = measure(item, _depth + 1)
+            resident += r
+            spilled += s
+        return resident, spilled
+    return sys.getsizeof(value), 0
+
+
+def _fingerprint(value: Any, _depth: int = 0) -> Any:
+    """Cheap identity of a value's content; changes when the key gets a new value."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        view = memoryview(value).cast("B")
+        return ("buf", len(view), bytes(view[:64]), bytes(view[-64:]))
+    if getattr(value, "file_id", None):  # Streamlit UploadedFile
+        return ("file", value.file_id)
+    if _depth < _MAX_DEPTH and isinstance(value, dict):
+        return tuple((k, _fingerprint(v, _depth + 1)) for k, v in value.items())
+    if value is None or isinstance(value, (bool, int, float, str, SampleHandle)):
+        return value
+    return ("id", id(value))
+
+
+@dataclass
+class _Blob:
+    fingerprint: Any  # see _fingerprint - changes when the key is reassigned
+    resident: int
+    spilled: int
+    since: float  # when this fingerprint was first seen
+
+
+@dataclass
+class _Session:
+    blobs: Dict[str, _Blob] = field(default_factory=dict)
+    last_seen: float = 0.0
+    pending: Set[str] = field(default_factory=set)  # keys to free at the start of the next run
+
+    @property
+    def resident(self) -> int:
+        return sum(b.resident for b in self.blobs.values())
+
+    @property
+    def spilled(self) -> int:
+        return sum(b.spilled for b in self.blobs.values())
+
+    @property
+    def pending_resident(self) -> int:
+        return sum(self.blobs[k].resident for k in self.pending if k in self.blobs)
+
+
+class MemoryGovernor:
+    """Measures governed session keys and enforces per-session/global budgets."""
+
+    def __init__(
+        self,
+        policies: Mapping[str, str],
+        *,
+        session_budget: int = 64 * 1024 * 1024,
+        global_budget: int = 1024 * 1024 * 1024,
+        idle_seconds: float = 30.0,
+        stale_seconds: float = 24 * 3600.0,
+        spill: Optional[Callable[[Any], SampleHandle]] = None,
+        is_alive: Optional[Callable[[str], bool]] = None,
+    ):
+        unknown = {p for p in policies.values() if p not in POLICIES}
+        if unknown:
+            raise ValueError(f"unknown memory policies: {sorted(unknown)}")
+        self.policies = dict(policies)
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.idle_seconds = idle_seconds
+        self.stale_seconds = stale_seconds
+        self._spill = spill
+        self._is_alive = is_alive
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.spills = 0
+
+    def observe(self, session_id: str, state: MutableMapping[str, Any], *, now: Optional[float] = None) -> Dict[str, Any]:
+        """Measure ``state``, enforce budgets, and return this session's usage.
+
+        Must be called from the session's own script run: ``state`` is the
+        only session state the governor writes to.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            sess = self._sessions.setdefault(session_id, _Session())
+            sess.last_seen = now
+            self._measure(sess, state, now)
+            for key in sorted(sess.pending):
+                self._free(sess, state, key, now)
+            sess.pending.clear()
+            self._drop_dead(session_id, now)
+            self._enforce(session_id, sess, state, now)
+            metrics_collector.gauge("memory_sessions_resident_bytes", self._total_resident())
+            return {"resident": sess.resident, "spilled": sess.spilled}
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _measure(self, sess: _Session, state: Mapping[str, Any], now: float) -> None:
+        blobs: Dict[str, _Blob] = {}
+        for key in self.policies:
+            if key not in state:
+                continue
+            value = state[key]
+            resident, spilled = measure(value)
+            fingerprint = _fingerprint(value)
+            prev = sess.blobs.get(key)
+            since = prev.since if prev is not None and prev.fingerprint == fingerprint else now
+            blobs[key] = _Blob(fingerprint, resident, spilled, since)
+        sess.blobs = blobs
+
+    def _drop_dead(self, current: str, now: float) -> None:
+        for sid, sess in list(self._sessions.items()):
+            if sid == current:
+                continue
+            closed = self._is_alive is not None and not self._is_alive(sid)
+            if closed or now - sess.last_seen > self.stale_seconds:
+                del self._sessions[sid]
+
+    def _total_resident(self) -> int:
+        return sum(s.resident for s in self._sessions.values())
+
+    def _candidates(self, sessions: List[Tuple[str, _Session]], now: float) -> List[Tuple[int, str, str]]:
+        out = []
+        for sid, sess in sessions:
+            for key, blob in sess.blobs.items():
+                if key not in sess.pending and self._idle(blob, key, now) and blob.resident:
+                    out.append((blob.resident, sid, key))
+        return sorted(out, reverse=True)
+
+    def _idle(self, blob: _Blob, key: str, now: float) -> bool:
+        return self.policies[key] != "keep" and now - blob.since >= self.idle_seconds
+
+    def _enforce(self, session_id: str, sess: _Session, state: MutableMapping[str, Any], now: float) -> None:
+        if sess.resident > self.session_budget:
+            for _, _, key in self._candidates([(session_id, sess)], now):
+                self._free(sess, state, key, now)
+                if sess.resident <= self.session_budget:
+                    break
+
+        def over() -> bool:
+            flagged = sum(s.pending_resident for s in self._sessions.values())
+            return self._total_resident() - flagged > self.global_budget
+
+        if not over():
+            return
+        # Other sessions may be mid-run on their own threads: only mark their
+        # keys here; each frees its own at the start of its next run.
+        for _, sid, key in self._candidates(list(self._sessions.items()), now):
+            if sid == session_id:
+                self._free(sess, state, key, now)
+            else:
+                self._sessions[sid].pending.add(key)
+            if not over():
+                break
+
+    def _free(self, sess: _Session, state: MutableMapping[str, Any], key: str, now: float) -> None:
+        blob = sess.blobs.get(key)
+        if blob is None or not blob.resident or not self._idle(blob, key, now) or key not in state:
+            return  # reassigned or already freed since it was marked
+        value = state[key]
+        try:
+            if self.policies[key] == "spill" and isinstance(value, (bytes, bytearray, memoryview)):
+                spill = self._spill
+                if spill is None:
+                    from utils.sample_store import get_sample_store
+                    spill = get_sample_store().put
+                handle = spill(value)
+                state[key] = handle
+                sess.blobs[key] = _Blob(_fingerprint(handle), 0, handle.size, blob.since)
+                self.spills += 1
+                metrics_collector.incr("memory_governor_spills")
+            else:
+                del state[key]
+                del sess.blobs[key]
+                self.evictions += 1
+                metrics_collector.incr("memory_governor_evictions")
+        except Exception as e:  # noqa: BLE001 - widget-owned keys may refuse the write
+            logger.info("Could not free session key %s: %s", key, e)
+            sess.blobs.pop(key, None)
+            return
+        metrics_collector.incr("memory_governor_freed_bytes", blob.resident)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Usage per session (largest first) and totals, for the admin page."""
+        with self._lock:
+            sessions = [
+                {
+                    "session": sid[:8],
+                    "resident_bytes": s.resident,
+                    "spilled_bytes": s.spilled,
+                    "keys": {k: b.resident or b.spilled for k, b in s.blobs.items() if b.resident or b.spilled},
+                    "pending": sorted(s.pending),
+                    "last_seen": round(time.time() - s.last_seen, 1),
+                }
+                for sid, s in self._sessions.items()
+            ]
+            sessions.sort(key=lambda s: s["resident_bytes"], reverse=True)
+            return {
+                "sessions": sessions,
+                "total_resident_bytes": sum(s["resident_bytes"] for s in sessions),
+                "total_spilled_bytes": sum(s["spilled_bytes"] for s in sessions),
+                "session_budget_bytes": self.session_budget,
+                "global_budget_bytes": self.global_budget,
+                "evictions": self.evictions,
+                "spills": self.spills,
+            }
+
+
+_SHARED_GOVERNOR: Optional[MemoryGovernor] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_memory_governor(
+    policies: Mapping[str, str], is_alive: Optional[Callable[[str], bool]] = None
+) -> MemoryGovernor:
+    """Return the process-wide governor (``policies`` and ``is_alive`` apply on first call)."""
+    global _SHARED_GOVERNOR
+    if _SHARED_GOVERNOR is None:
+        with _SHARED_LOCK:
+            if _SHARED_GOVERNOR is None:
+                mb = 1024 * 1024
+                _SHARED_GOVERNOR = MemoryGovernor(
+                    policies,
+                    session_budget=int(float(os.getenv("VOCALBRAND_SESSION_BUDGET_MB", "64")) * mb),
+                    global_budget=int(float(os.getenv("VOCALBRAND_MEMORY_BUDGET_MB", "1024")) * mb),
+                    idle_seconds=float(os.getenv("VOCALBRAND_MEMORY_IDLE_SEC", "30")),
+                    stale_seconds=float(os.getenv("VOCALBRAND_MEMORY_STALE_SEC", "86400")),
+                    is_alive=is_alive,
+                )
+    return _SHARED_GOVERNOR
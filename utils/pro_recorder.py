@@ -0,0 +1,124 @@
+"""Binary transport for the Pro Recorder (HTML5 MediaRecorder component).
+
+The recorder used to post the recording as a base64 data URL, which the
+app re-hashed and re-decoded on every rerun. It is now a declared
+component that posts one binary frame through Streamlit's bytes channel:
+
+    b"VBR1" | uint32 LE header length | UTF-8 JSON header | audio bytes
+
+The header carries a per-recording ``seq`` (set in the browser when the
+recording stops), so reruns that return the same widget value are
+recognised by that number alone; the content digest is computed once, when
+a new ``seq`` arrives. The server acknowledges an ingested recording by
+passing ``ingested_seq`` back as a component arg, which stops the
+browser's auto-resend and clears its stored copy.
+
+While a take is in progress the browser also streams ``kind="pcm"`` frames:
+mono int16 PCM from frame offset ``start`` (every ``chunk_ms``), ending
+with a ``final`` frame carrying the ``total`` frame count. The server
+acknowledges with ``live_ack = {"rec": ..., "frames": n}`` and the browser
+drops everything before ``n`` (see ``utils.live_recording``).
+
+Environment flags:
+    VOCALBRAND_PRO_CHUNK_MS            -> live chunk interval in ms (default 2000; 0 = send only on stop)
+"""
+from __future__ import annotations
+import os
+import json
+import struct
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("vocalbrand.pro_recorder")
+
+FRAME_MAGIC = b"VBR1"
+_COMPONENT_DIR = Path(__file__).parent / "components" / "pro_recorder"
+_DIGEST_BLOCK = 1 << 20
+CHUNK_MS = int(os.getenv("VOCALBRAND_PRO_CHUNK_MS", "2000"))
+_component = None
+
+
+@dataclass
+class RecorderPayload:
+    seq: int
+    mime: str
+    filename: str
+    data: memoryview  # audio bytes, a view into the widget value (no copy)
+    kind: str = "recording"  # "recording" (encoded file) | "pcm" (live int16 chunk)
+    rec: str = ""
+    start: int = 0
+    rate: int = 0
+    channels: int = 1
+    final: bool = False
+    total: int = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def parse_frame(buf: Any) -> RecorderPayload:
+    """Split a recorder frame into header fields and a zero-copy audio view."""
+    view = memoryview(buf).cast("B")
+    if len(view) < 8 or bytes(view[:4]) != FRAME_MAGIC:
+        raise ValueError("not a recorder frame")
+    header_len = struct.unpack_from("<I", view, 4)[0]
+    if 8 + header_len > len(view):
+        raise ValueError("truncated recorder frame header")
+    header = json.loads(bytes(view[8:8 + header_len]).decode("utf-8"))
+    data = view[8 + header_len:]
+    if int(header.get("size", len(data))) != len(data):
+        raise ValueError("recorder frame size mismatch")
+    return RecorderPayload(
+        seq=int(header.get("seq") or 0),
+        mime=str(header.get("mime") or "audio/webm"),
+        filename=str(header.get("filename") or "recording"),
+        data=data,
+        kind=str(header.get("kind") or "recording"),
+        rec=str(header.get("rec") or ""),
+        start=int(header.get("start") or 0),
+        rate=int(header.get("rate") or 0),
+        channels=int(header.get("channels") or 1),
+        final=bool(header.get("final")),
+        total=int(header.get("total") or 0),
+    )
+
+
+def payload_digest(data: Any) -> str:
+    """BLAKE2b content digest, fed incrementally in 1 MiB slices of a memoryview."""
+    view = memoryview(data).cast("B")
+    h = hashlib.blake2b(digest_size=20)
+    for pos in range(0, len(view), _DIGEST_BLOCK):
+        h.update(view[pos:pos + _DIGEST_BLOCK])
+    return h.hexdigest()
+
+
+def _get_component():
+    global _component
+    if _component is None:
+        import streamlit.components.v1 as components
+        _component = components.declare_component("vb_pro_recorder", path=str(_COMPONENT_DIR))
+    return _component
+
+
+def pro_recorder(
+    *,
+    key: str,
+    ingested_seq: Optional[int] = None,
+    live_ack: Optional[Dict[str, Any]] = None,
+    height: int = 420,
+) -> Optional[RecorderPayload]:
+    """Render the recorder; return the latest frame (recording or live chunk), or None."""
+    value = _get_component()(
+        key=key, ingested_seq=ingested_seq, live_ack=live_ack, chunk_ms=CHUNK_MS, height=height, default=None
+    )
+    if not value:
+        return None
+    try:
+        return parse_frame(value)
+    except (ValueError, TypeError) as e:
+        logger.warning("Discarding malformed recorder frame: %s", e)
+        return None
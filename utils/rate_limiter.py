@@ -0,0 +1,137 @@
+"""Process-wide adaptive token-bucket limiter for ElevenLabs calls.
+
+Every Streamlit session shares the module-global engine, so without a
+shared limiter concurrent users burst into the upstream rate limit together.
+The bucket refills at ``rate`` tokens/second up to ``burst``. It adapts AIMD
+style: a 429 halves the rate and pauses all callers for ``Retry-After``;
+each success nudges the rate back up towards ``max_rate``.
+
+Current rate, queue depth and throttle counts are published to
+``metrics_collector`` (gauges ``rate_limit_rps`` / ``rate_limit_queue_depth``).
+"""
+from __future__ import annotations
+import time
+import threading
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.rate_limiter")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Blocking token bucket whose refill rate adapts to upstream 429s."""
+
+    def __init__(
+        self,
+        *,
+        rate: float = 5.0,
+        burst: int = 10,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        increase_step: float = 0.05,
+        decrease_factor: float = 0.5,
+    ):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._publish()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def _publish(self) -> None:
+        metrics_collector.gauge("rate_limit_rps", round(self.rate, 3))
+        metrics_collector.gauge("rate_limit_queue_depth", self._waiting)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, blocking up to ``timeout`` seconds (None = forever)."""
+        give_up_at = None if timeout is None else time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            self._waiting += 1
+            self._publish()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    elif self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return True
+                    else:
+                        wait = (1.0 - self._tokens) / self.rate
+                    if give_up_at is not None:
+                        remaining = give_up_at - now
+                        if remaining <= 0:
+                            metrics_collector.incr("rate_limit_timeouts")
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting -= 1
+                self._publish()
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Upstream answered 429: back off multiplicatively and honour Retry-After."""
+        with self._cond:
+            now = time.monotonic()
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = 0.0
+            self._last = now
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._publish()
+            self._cond.notify_all()
+        metrics_collector.incr("rate_limit_429")
+        logger.warning("ElevenLabs 429: rate lowered to %.2f rps (retry_after=%s)", self.rate, retry_after)
+
+    def on_success(self) -> None:
+        """Additive increase back towards the configured ceiling."""
+        if self.rate >= self.max_rate:
+            return
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self._publish()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate_rps": round(self.rate, 3),
+                "max_rate_rps": self.max_rate,
+                "tokens": round(self._tokens, 2),
+                "queue_depth": self._waiting,
+                "blocked_for_sec": round(max(0.0, self._blocked_until - now), 2),
+            }
@@ -0,0 +1,91 @@
+"""Process-wide state shared between the recorder components and the app.
+
+Streamlit re-executes ``app.py`` as a fresh ``__main__`` on every rerun, so
+module globals there start empty each time. Anything that must outlive a
+single run - the ingest history shown on the admin page and the Pro
+Recorder's in-progress takes, which receive one PCM chunk per rerun - lives
+here and is reached through ``get_recorder_bridge()``.
+
+Environment flags:
+    VOCALBRAND_BRIDGE_HISTORY_LIMIT    -> ingests kept for the admin page (default 25)
+    VOCALBRAND_LIVE_RECORDING_TTL_SEC  -> abandoned streamed takes expire after this (default 600)
+    VOCALBRAND_LIVE_RECORDING_MAX_SEC  -> longer streamed takes are cut off (default 180)
+"""
+from __future__ import annotations
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.live_recording import LiveRecording
+
+
+class RecorderBridge:
+    """Ingest history plus the buffers of streamed takes, keyed by take id."""
+
+    def __init__(self, *, history_limit: int = 25, live_ttl: float = 600.0, live_max_seconds: float = 180.0):
+        self.history_limit = history_limit
+        self.live_ttl = live_ttl
+        self.live_max_seconds = live_max_seconds
+        self.latest: Dict[str, Any] = {}
+        self.history: List[Dict[str, Any]] = []
+        self.hits = 0
+        self._live: Dict[str, LiveRecording] = {}
+        self._lock = threading.Lock()
+
+    def push(self, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self.latest = payload
+            self.history.append(payload)
+            del self.history[:-self.history_limit]
+            self.hits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.latest)
+
+    def recent(self, n: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.history[-n:])
+
+    def live_recording(self, rec_id: str, sample_rate: int, channels: int = 1) -> LiveRecording:
+        """Get or start the buffer for a streamed take (abandoned takes expire)."""
+        if sample_rate <= 0 or channels <= 0:
+            raise ValueError(f"invalid live recording format: rate={sample_rate} channels={channels}")
+        with self._lock:
+            now = time.time()
+            for stale in [k for k, rec in self._live.items() if now - rec.updated_at > self.live_ttl]:
+                del self._live[stale]
+            rec = self._live.get(rec_id)
+            if rec is None:
+                rec = self._live[rec_id] = LiveRecording(
+                    rec_id, sample_rate, channels, max_frames=int(sample_rate * self.live_max_seconds)
+                )
+            return rec
+
+    def receive_chunk(self, rec_id: str, sample_rate: int, channels: int, start: int, data: Any) -> Tuple[LiveRecording, int]:
+        """Fold one streamed PCM chunk into its take; returns the take and the frames held (the ack)."""
+        live = self.live_recording(rec_id, sample_rate, channels)
+        return live, live.append(start, data)
+
+    def finish_live(self, rec_id: str) -> None:
+        with self._lock:
+            self._live.pop(rec_id, None)
+
+
+_SHARED_BRIDGE: Optional[RecorderBridge] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_recorder_bridge() -> RecorderBridge:
+    """Return the process-wide recorder bridge."""
+    global _SHARED_BRIDGE
+    if _SHARED_BRIDGE is None:
+        with _SHARED_LOCK:
+            if _SHARED_BRIDGE is None:
+                _SHARED_BRIDGE = RecorderBridge(
+                    history_limit=int(os.getenv("VOCALBRAND_BRIDGE_HISTORY_LIMIT", "25")),
+                    live_ttl=float(os.getenv("VOCALBRAND_LIVE_RECORDING_TTL_SEC", "600")),
+                    live_max_seconds=float(os.getenv("VOCALBRAND_LIVE_RECORDING_MAX_SEC", "180")),
+                )
+    return _SHARED_BRIDGE
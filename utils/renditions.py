@@ -0,0 +1,165 @@
+"""Low-bitrate preview renditions for on-page players.
+
+In-page players only need a quick listen, yet they were handed the
+full-quality file (PCM WAV samples, 192 kbps generated MP3). Each spooled
+asset now gets a small mono preview (48 kbps MP3 by default, or Opus),
+encoded in the background by the shared ffmpeg pool
+(``utils.decode_service``) and spooled in the sample store. Previews are
+indexed by the source digest, so every asset is encoded at most once per
+process; downloads keep pointing at the full-quality source.
+
+``preview()`` never blocks longer than ``wait``: until the rendition is
+ready (or when it cannot be built, e.g. no ffmpeg) the source is played.
+Sources that are already small, or whose preview would not be smaller,
+map to themselves.
+
+Environment flags:
+    VOCALBRAND_PREVIEWS=0              -> play full-quality files
+    VOCALBRAND_PREVIEW_FORMAT          -> mp3 | opus (default mp3)
+    VOCALBRAND_PREVIEW_BITRATE         -> preview bitrate (default 48k)
+    VOCALBRAND_PREVIEW_MIN_KB          -> smaller sources are played as-is (default 256)
+"""
+from __future__ import annotations
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from typing import Dict, Optional
+
+from metrics import metrics_collector
+from utils.decode_service import DecodeBusy, DecodeService, get_decode_service
+from utils.sample_store import SampleHandle, SampleStore, get_sample_store
+
+logger = logging.getLogger("vocalbrand.renditions")
+
+# format -> (ffmpeg muxer, codec, mime)
+PREVIEW_FORMATS = {
+    "mp3": ("mp3", "libmp3lame", "audio/mpeg"),
+    "opus": ("ogg", "libopus", "audio/ogg"),
+}
+
+
+class PreviewRenditions:
+    """Background-built, digest-indexed preview encodings of spooled assets."""
+
+    def __init__(
+        self,
+        store: SampleStore,
+        *,
+        fmt: str = "mp3",
+        bitrate: str = "48k",
+        min_bytes: int = 256 * 1024,
+        max_entries: int = 4096,
+        service: Optional[DecodeService] = None,
+    ):
+        if fmt not in PREVIEW_FORMATS:
+            raise ValueError(f"unsupported preview format: {fmt}")
+        self.store = store
+        self.fmt = fmt
+        self.bitrate = bitrate
+        self.min_bytes = min_bytes
+        self.max_entries = max_entries
+        self.mime = PREVIEW_FORMATS[fmt][2]
+        self._service = service
+        self._index: "OrderedDict[str, str]" = OrderedDict()  # source digest -> preview digest
+        self._pending: Dict[str, Future] = {}  # resolves once the index is updated
+        self._lock = threading.Lock()
+
+    def lookup(self, source: SampleHandle) -> Optional[SampleHandle]:
+        """The finished preview (possibly ``source`` itself), or None if not built yet."""
+        with self._lock:
+            target = self._index.get(source.digest)
+            if target is None:
+                return None
+            self._index.move_to_end(source.digest)
+        if target == source.digest:
+            return source
+        preview = self.store.get(target)
+        if preview is None:  # swept from the store; rebuild on request
+            with self._lock:
+                self._index.pop(source.digest, None)
+            return None
+        metrics_collector.incr("preview_rendition_hit")
+        return preview
+
+    def request(self, source: SampleHandle) -> Optional[Future]:
+        """Start building the preview unless it exists or is already under way.
+
+        The returned future resolves after the preview has been indexed.
+        """
+        with self._lock:
+            if source.digest in self._index:
+                return None
+            if source.digest in self._pending:
+                return self._pending[source.digest]
+            if source.size < self.min_bytes:
+                self._remember(source.digest, source.digest)
+                return None
+            muxer, codec, _ = PREVIEW_FORMATS[self.fmt]
+            try:
+                # ffmpeg reads the spooled file itself; nothing is piped
+                job = (self._service or get_decode_service()).submit_encode(
+                    None, muxer, path=source.path, codec=codec, bitrate=self.bitrate, channels=1,
+                    key=("preview", self.fmt, self.bitrate, source.digest),
+                )
+            except DecodeBusy:
+                return None  # try again on a later rerun
+            done: Future = Future()
+            self._pending[source.digest] = done
+        job.add_done_callback(lambda f: self._finish(source, f, done))
+        return done
+
+    def preview(self, source: SampleHandle, *, wait: float = 0.0) -> SampleHandle:
+        """What on-page players should load for ``source`` (waits up to ``wait`` seconds)."""
+        found = self.lookup(source)
+        if found is not None:
+            return found
+        fut = self.request(source)
+        if fut is not None and wait > 0:
+            wait_futures([fut], timeout=wait)
+        return self.lookup(source) or source
+
+    def _finish(self, source: SampleHandle, job: Future, done: Future) -> None:
+        target = source.digest
+        try:
+            encoded = job.result()
+            if len(encoded) < source.size:
+                target = self.store.put(encoded).digest
+                metrics_collector.incr("preview_rendition_built")
+                metrics_collector.incr("preview_rendition_bytes_saved", source.size - len(encoded))
+        except Exception as e:  # noqa: BLE001 - no ffmpeg/codec: keep playing the source
+            logger.info("Preview rendition failed for %s: %s", source.digest[:12], e)
+            metrics_collector.incr("preview_rendition_failed")
+        with self._lock:
+            self._pending.pop(source.digest, None)
+            self._remember(source.digest, target)
+        done.set_result(target)
+
+    def _remember(self, source_digest: str, target: str) -> None:
+        self._index[source_digest] = target
+        self._index.move_to_end(source_digest)
+        while len(self._index) > self.max_entries:
+            self._index.popitem(last=False)
+
+
+_SHARED_RENDITIONS: Optional[PreviewRenditions] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_preview_renditions() -> Optional[PreviewRenditions]:
+    """Return the process-wide preview builder, or None when disabled."""
+    global _SHARED_RENDITIONS
+    if os.getenv("VOCALBRAND_PREVIEWS", "1") == "0":
+        return None
+    if _SHARED_RENDITIONS is None:
+        with _SHARED_LOCK:
+            if _SHARED_RENDITIONS is None:
+                _SHARED_RENDITIONS = PreviewRenditions(
+                    get_sample_store(),
+                    fmt=os.getenv("VOCALBRAND_PREVIEW_FORMAT", "mp3").lower(),
+                    bitrate=os.getenv("VOCALBRAND_PREVIEW_BITRATE", "48k"),
+                    min_bytes=int(float(os.getenv("VOCALBRAND_PREVIEW_MIN_KB", "256")) * 1024),
+                )
+    return _SHARED_RENDITIONS
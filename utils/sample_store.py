@@ -0,0 +1,199 @@
+"""Disk spool for voice samples, keyed by content digest.
+
+Uploads and recordings used to live in ``st.session_state`` as ``bytes``
+(plus ``BytesIO`` copies for cloning), so every concurrent user pinned one
+or more full samples in process memory. Samples are now streamed into a
+temp directory as ``<sha1>.sample`` and sessions keep only a small
+``SampleHandle``. Readers get a read-only ``mmap`` view: the native WAV
+decoder, analysis, trimming and hashing all work on it without a heap copy,
+and the pages belong to the OS cache rather than the Python heap.
+
+Generated clips are spooled the same way so the asset server
+(``utils.asset_server``) can serve them by URL. Identical samples share one
+file. Files not touched within the TTL are removed by a periodic sweep (at
+most every ``sweep_interval`` seconds, on writes).
+
+Environment flags:
+    VOCALBRAND_SAMPLE_STORE_DIR        -> spool directory (default: <tmp>/vocalbrand_samples)
+    VOCALBRAND_SAMPLE_TTL_HOURS        -> remove samples idle this long (default 6)
+"""
+from __future__ import annotations
+import io
+import os
+import mmap
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.sample_store")
+
+_SUFFIX = ".sample"
+_COPY_BLOCK = 1 << 20
+
+
+@dataclass(frozen=True)
+class SampleHandle:
+    """What a session keeps for a spooled sample."""
+
+    digest: str  # sha1 hex, same key as the analysis cache
+    size: int
+    path: str
+
+    def view(self) -> memoryview:
+        """Read-only memory-mapped view of the sample (no heap copy)."""
+        if not self.size:
+            return memoryview(b"")
+        with open(self.path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mm)
+
+    def open(self, name: Optional[str] = None) -> BinaryIO:
+        """Binary reader over the file; ``name`` overrides the reported filename (for uploads)."""
+        raw = io.FileIO(self.path, "r")
+        if name:
+            raw.name = name
+        return io.BufferedReader(raw)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+
+class SampleStore:
+    """Content-addressed sample files with TTL-based cleanup."""
+
+    def __init__(self, root: Union[str, Path], *, ttl_seconds: float = 6 * 3600, sweep_interval: float = 600):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / f"{digest}{_SUFFIX}"
+
+    def put(self, data: Union[bytes, bytearray, memoryview, BinaryIO]) -> SampleHandle:
+        """Spool ``data`` (bytes-like, or a file object streamed in 1 MiB blocks).
+
+        Bytes already on disk (same digest) are not written again, so a widget
+        handing back the same recording on every rerun costs one hash.
+        """
+        self._maybe_sweep()
+        if not hasattr(data, "read"):
+            view = memoryview(data).cast("B")
+            digest = hashlib.sha1(view).hexdigest()
+            existing = self._existing(digest)
+            if existing is not None:
+                return existing
+            return self._write(lambda tmp: tmp.write(view), digest, len(view))
+        h = hashlib.sha1()
+        size = 0
+
+        def stream(tmp) -> None:
+            nonlocal size
+            if hasattr(data, "seek"):
+                data.seek(0)
+            for block in iter(lambda: data.read(_COPY_BLOCK), b""):
+                h.update(block)
+                tmp.write(block)
+                size += len(block)
+        return self._write(stream, None, 0, h, lambda: size)
+
+    def _existing(self, digest: str) -> Optional[SampleHandle]:
+        handle = self.get(digest)
+        if handle is not None:
+            self.touch(digest)
+            metrics_collector.incr("sample_store_dedup")
+        return handle
+
+    def _write(self, fill, digest: Optional[str], size: int, hasher=None, sized=None) -> SampleHandle:
+        with tempfile.NamedTemporaryFile(dir=self.root, prefix=".incoming_", delete=False) as tmp:
+            try:
+                fill(tmp)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        if digest is None:
+            digest, size = hasher.hexdigest(), sized()
+            existing = self._existing(digest)
+            if existing is not None:
+                os.unlink(tmp.name)
+                return existing
+        path = self._path(digest)
+        os.replace(tmp.name, path)
+        metrics_collector.incr("sample_store_bytes_written", size)
+        return SampleHandle(digest=digest, size=size, path=str(path))
+
+    def get(self, digest: str) -> Optional[SampleHandle]:
+        path = self._path(digest)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        return SampleHandle(digest=digest, size=size, path=str(path))
+
+    def touch(self, digest: str) -> None:
+        """Mark a sample as in use (resets its TTL)."""
+        try:
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+        self.sweep(now)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete samples (and abandoned partial writes) idle longer than the TTL."""
+        now = now or time.time()
+        removed = 0
+        for p in list(self.root.glob(f"*{_SUFFIX}")) + list(self.root.glob(".incoming_*")):
+            try:
+                if now - p.stat().st_mtime > self.ttl_seconds:
+                    p.unlink()
+                    removed += 1
+            except OSError:
+                continue  # already gone, or still mapped on platforms that forbid unlinking
+        if removed:
+            metrics_collector.incr("sample_store_expired", removed)
+        return removed
+
+    def stats(self) -> dict:
+        files = list(self.root.glob(f"*{_SUFFIX}"))
+        total = 0
+        for p in files:
+            try:
+                total += p.stat().st_size
+            except OSError:
+                pass
+        return {"files": len(files), "bytes": total, "root": str(self.root)}
+
+
+_SHARED_STORE: Optional[SampleStore] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_sample_store() -> SampleStore:
+    """Return the process-wide sample store."""
+    global _SHARED_STORE
+    if _SHARED_STORE is None:
+        with _SHARED_LOCK:
+            if _SHARED_STORE is None:
+                root = os.getenv("VOCALBRAND_SAMPLE_STORE_DIR") or os.path.join(tempfile.gettempdir(), "vocalbrand_samples")
+                _SHARED_STORE = SampleStore(
+                    root, ttl_seconds=float(os.getenv("VOCALBRAND_SAMPLE_TTL_HOURS", "6")) * 3600
+                )
+    return _SHARED_STORE
+
@@ -0,0 +1,68 @@
+"""Split long scripts into synthesis-sized chunks.
+
+Chunks break at paragraph boundaries first, then sentence boundaries, and
+only fall back to clause punctuation / whitespace for sentences that are
+longer than the hard per-model character limit on their own.
+"""
+from __future__ import annotations
+import re
+from typing import List
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?…。！？])[\"')\]»”’]*\s+")
+_CLAUSE_RE = re.compile(r"(?<=[,;:—–])\s+")
+
+
+def _split_oversized(sentence: str, max_chars: int) -> List[str]:
+    """Break a single over-long sentence at clause marks, then whitespace."""
+    pieces: List[str] = []
+    current = ""
+    for clause in _CLAUSE_RE.split(sentence):
+        candidate = f"{current} {clause}".strip() if current else clause
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        current = ""
+        # Clause itself too long: hard-wrap on whitespace (or raw slice)
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        current = clause
+    if current:
+        pieces.append(current)
+    return [p for p in pieces if p]
+
+
+def split_text(text: str, *, target_chars: int = 600, max_chars: int = 5000) -> List[str]:
+    """Return ordered chunks of ``text``.
+
+    Sentences are packed greedily up to ``target_chars`` (the parallelism
+    knob); no chunk ever exceeds ``max_chars`` (the model's hard limit).
+    A paragraph break always ends the current chunk.
+    """
+    target_chars = max(1, min(target_chars, max_chars))
+    chunks: List[str] = []
+    for paragraph in _PARAGRAPH_RE.split((text or "").strip()):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        current = ""
+        for sentence in _SENTENCE_RE.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            parts = [sentence] if len(sentence) <= max_chars else _split_oversized(sentence, max_chars)
+            for part in parts:
+                if current and len(current) + 1 + len(part) > target_chars:
+                    chunks.append(current)
+                    current = part
+                else:
+                    current = f"{current} {part}" if current else part
+        if current:
+            chunks.append(current)
+    return chunks
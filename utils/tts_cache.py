@@ -0,0 +1,180 @@
+"""Content-addressed cache for generated speech.
+
+Re-generating the same prompt with the same voice/model/format is a paid,
+slow upstream call. Results are stored on local disk (one file per entry)
+with an in-memory LRU index bounded by total bytes and a TTL.
+
+Each file's mtime is its creation time (the TTL clock) and its atime is
+set explicitly on every hit, so a restart rebuilds the LRU order from
+atime instead of evicting recently used clips first.
+
+Key = sha256(voice_id | model_id | output_format | sha256(normalized text)).
+Text normalization only folds unicode form and whitespace, so punctuation
+and casing (which shape prosody) still produce distinct entries.
+
+Environment flags:
+    VOCALBRAND_TTS_CACHE=0             -> disable the cache
+    VOCALBRAND_TTS_CACHE_DIR           -> storage directory (default: <tmp>/vocalbrand_tts_cache)
+    VOCALBRAND_TTS_CACHE_MAX_MB        -> total size bound (default 256)
+    VOCALBRAND_TTS_CACHE_TTL_HOURS     -> entry lifetime (default 168 = 7 days)
+"""
+from __future__ import annotations
+import os
+import time
+import hashlib
+import tempfile
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from metrics import metrics_collector
+
+logger = logging.getLogger("vocalbrand.tts_cache")
+
+_ENTRY_SUFFIX = ".audio"
+
+
+def normalize_text(text: str) -> str:
+    """Fold unicode form and collapse whitespace runs."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def make_cache_key(voice_id: str, model_id: str, output_format: str, text: str) -> str:
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    raw = "|".join((voice_id or "", model_id or "", output_format or "", text_hash))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Entry:
+    size: int
+    created_at: float
+
+
+class TTSCache:
+    """Disk-backed LRU cache bounded by total bytes with per-entry TTL."""
+
+    def __init__(self, root: str | Path, *, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 7 * 24 * 3600):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._index: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{_ENTRY_SUFFIX}"
+
+    def _load_index(self) -> None:
+        """Rebuild the index from disk, least recently used first (by atime)."""
+        entries = []
+        for p in self.root.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_mtime, p.name[: -len(_ENTRY_SUFFIX)], st.st_size))
+        for _, mtime, key, size in sorted(entries):
+            self._index[key] = _Entry(size=size, created_at=mtime)
+            self._total += size
+        self._evict_locked()
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self._total -= entry.size
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        while self._total > self.max_bytes and self._index:
+            oldest = next(iter(self._index))
+            self._drop_locked(oldest)
+            metrics_collector.incr("tts_cache_evictions")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                metrics_collector.incr("tts_cache_miss")
+                return None
+            if time.time() - entry.created_at > self.ttl_seconds:
+                self._drop_locked(key)
+                metrics_collector.incr("tts_cache_expired")
+                metrics_collector.incr("tts_cache_miss")
+                return None
+            try:
+                data = self._path(key).read_bytes()
+            except OSError:
+                self._drop_locked(key)
+                metrics_collector.incr("tts_cache_miss")
+                return None
+            self._index.move_to_end(key)
+            try:
+                # Persist the access for the next restart; mtime keeps the creation time
+                os.utime(self._path(key), (time.time(), entry.created_at))
+            except OSError:
+                pass
+        metrics_collector.incr("tts_cache_hit")
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("TTS cache write failed for %s: %s", key[:12], e)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._total -= old.size
+            self._index[key] = _Entry(size=len(data), created_at=time.time())
+            self._total += len(data)
+            self._evict_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._index), "bytes": self._total, "max_bytes": self.max_bytes}
+
+
+_SHARED_CACHE: Optional[TTSCache] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """Return the process-wide cache, or None when disabled/unavailable."""
+    global _SHARED_CACHE
+    if os.getenv("VOCALBRAND_TTS_CACHE", "1") == "0":
+        return None
+    if _SHARED_CACHE is None:
+        with _SHARED_LOCK:
+            if _SHARED_CACHE is None:
+                root = os.getenv("VOCALBRAND_TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "vocalbrand_tts_cache")
+                try:
+                    _SHARED_CACHE = TTSCache(
+                        root,
+                        max_bytes=int(float(os.getenv("VOCALBRAND_TTS_CACHE_MAX_MB", "256")) * 1024 * 1024),
+                        ttl_seconds=float(os.getenv("VOCALBRAND_TTS_CACHE_TTL_HOURS", "168")) * 3600,
+                    )
+                except Exception as e:  # noqa: BLE001
+                    logger.warning("TTS cache disabled (%s)", e)
+                    return None
+    return _SHARED_CACHE
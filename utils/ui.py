@@ -4085,3 +4085,41 @@ def inject_tiktok_browser_fix():
             st.markdown(html, unsafe_allow_html=True)
     except Exception:
         st.markdown(html, unsafe_allow_html=True)
+
+
+def render_waveform(peaks: bytes, height: int = 120, color: str = "#1a365d") -> None:
+    """Draw a waveform in the browser from interleaved int8 ``min, max`` pairs.
+
+    Only the compact peaks payload (~2 KB base64) crosses the websocket; the
+    canvas is painted client-side and scales to the frame width.
+    """
+    import base64
+    import streamlit.components.v1 as components
+
+    b64 = base64.b64encode(peaks).decode("ascii")
+    html = f"""
+<canvas id="vb-wave" style="width:100%;height:{height}px;display:block"></canvas>
+<script>
+(function() {{
+  var raw = atob("{b64}"), n = raw.length >> 1;
+  var peaks = new Int8Array(raw.length);
+  for (var i = 0; i < raw.length; i++) peaks[i] = raw.charCodeAt(i);
+  var c = document.getElementById("vb-wave");
+  function draw() {{
+    var dpr = window.devicePixelRatio || 1, w = c.clientWidth, h = c.clientHeight;
+    c.width = w * dpr; c.height = h * dpr;
+    var ctx = c.getContext("2d");
+    ctx.scale(dpr, dpr);
+    ctx.fillStyle = "{color}";
+    var mid = h / 2, bw = w / Math.max(n, 1);
+    for (var j = 0; j < n; j++) {{
+      var lo = peaks[2 * j] / 127, hi = peaks[2 * j + 1] / 127;
+      ctx.fillRect(j * bw, mid - hi * mid, Math.max(bw, 1), Math.max((hi - lo) * mid, 1));
+    }}
+  }}
+  draw();
+  window.addEventListener("resize", draw);
+}})();
+</script>
+"""
+    components.html(html, height=height + 8)
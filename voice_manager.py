@@ -1,14 +1,20 @@
 """ElevenLabs voice management utilities for VocalBrand.
 
 Handles voice cleanup, quota management, and voice lifecycle.
+
+Every network-bound method takes an optional ``deadline`` (a
+``utils.deadline.Deadline`` or seconds). Nested calls share it, so a
+cleanup's listing, deletes and quota polling all fit inside one budget.
 """
 from __future__ import annotations
 import os
-import requests
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.http_transport import HttpTransport, get_transport
+
 logger = logging.getLogger("vocalbrand.voice_manager")
 
 ELEVEN_VOICES_URL = "https://api.elevenlabs.io/v1/voices"
@@ -18,23 +24,26 @@ ELEVEN_VOICE_DELETE_URL = "https://api.elevenlabs.io/v1/voices/{voice_id}"
 class VoiceManager:
     """Manages ElevenLabs voice quotas and cleanup."""
     
-    def __init__(self, api_key: str, *, timeout: int = 30):
+    def __init__(self, api_key: str, *, timeout: int = 30, transport: Optional[HttpTransport] = None):
         self.api_key = api_key
         self.timeout = timeout
+        # Shares the engine's keep-alive pool by default
+        self.transport = transport or get_transport()
         # include Accept to avoid some proxies returning HTML
         self._headers = {"xi-api-key": api_key, "accept": "application/json"}
     
-    def get_all_voices(self) -> Dict[str, Any]:
+    def get_all_voices(self, *, deadline: Deadline | float | None = None) -> Dict[str, Any]:
         """Get all voices in the account.
         
         Returns:
             Dict with 'voices' list and 'success' bool
         """
         try:
-            resp = requests.get(
+            resp = self.transport.get(
                 ELEVEN_VOICES_URL,
                 headers=self._headers,
-                timeout=self.timeout
+                timeout=self.timeout,
+                deadline=Deadline.coerce(deadline),
             )
             
             if resp.status_code == 200:
@@ -50,6 +59,13 @@ class VoiceManager:
                     "voices": [],
                     "error": f"API error: {resp.status_code}"
                 }
+        except DeadlineExceeded:
+            logger.warning("Voice listing abandoned: deadline exceeded")
+            return {
+                "success": False,
+                "voices": [],
+                "error": "deadline_exceeded"
+            }
         except Exception as e:
             logger.error(f"Error fetching voices: {e}")
             return {
@@ -58,13 +74,13 @@ class VoiceManager:
                 "error": str(e)
             }
     
-    def get_custom_voices(self) -> List[Dict[str, Any]]:
+    def get_custom_voices(self, *, deadline: Deadline | float | None = None) -> List[Dict[str, Any]]:
         """Get only custom (cloned) voices, not pre-made ones.
         
         Returns:
             List of custom voice dicts with: voice_id, name, category, date_unix
         """
-        result = self.get_all_voices()
+        result = self.get_all_voices(deadline=deadline)
         if not result["success"]:
             return []
         
@@ -76,7 +92,7 @@ class VoiceManager:
         
         return custom_voices
     
-    def delete_voice(self, voice_id: str) -> bool:
+    def delete_voice(self, voice_id: str, *, deadline: Deadline | float | None = None) -> bool:
         """Delete a voice from ElevenLabs account.
         
         Args:
@@ -86,10 +102,11 @@ class VoiceManager:
             True if successfully deleted, False otherwise
         """
         try:
-            resp = requests.delete(
+            resp = self.transport.delete(
                 ELEVEN_VOICE_DELETE_URL.format(voice_id=voice_id),
                 headers=self._headers,
-                timeout=self.timeout
+                timeout=self.timeout,
+                deadline=Deadline.coerce(deadline),
             )
             
             # ElevenLabs may return 200 OK, 202 Accepted (async), or 204 No Content
@@ -105,22 +122,65 @@ class VoiceManager:
                     body = "<no-body>"
                 logger.warning(f"Failed to delete voice {voice_id}: status={resp.status_code} body={body}")
                 return False
+        except DeadlineExceeded:
+            logger.warning(f"Delete of voice {voice_id} abandoned: deadline exceeded")
+            return False
         except Exception as e:
             logger.error(f"Error deleting voice {voice_id}: {e}")
             return False
     
-    def cleanup_oldest_voices(self, keep_count: int = 25) -> Dict[str, Any]:
+    def voice_exists(self, voice_id: str, *, deadline: Deadline | float | None = None) -> Optional[bool]:
+        """Cheap upstream check that a voice is still in the account.
+        
+        Returns:
+            True if it exists, False if ElevenLabs reports it gone, None if unknown (network/API error)
+        """
+        if not voice_id:
+            return False
+        try:
+            resp = self.transport.get(
+                ELEVEN_VOICE_DELETE_URL.format(voice_id=voice_id),
+                headers=self._headers,
+                timeout=min(self.timeout, 10),
+                deadline=Deadline.coerce(deadline),
+            )
+            if resp.status_code == 200:
+                return True
+            body = ""
+            try:
+                body = resp.text[:300]
+            except Exception:
+                pass
+            if resp.status_code == 404 or "voice_not_found" in body:
+                return False
+            logger.warning(f"Voice existence check inconclusive for {voice_id}: status={resp.status_code}")
+            return None
+        except Exception as e:
+            logger.warning(f"Voice existence check failed for {voice_id}: {e}")
+            return None
+    
+    def cleanup_oldest_voices(self, keep_count: int = 25, *, deadline: Deadline | float | None = None) -> Dict[str, Any]:
         """Delete oldest custom voices to free up quota.
         
         Args:
             keep_count: How many voices to keep (delete the rest)
+            deadline: Optional overall budget for listing, deletes and confirmation
             
         Returns:
-            Dict with deletion results
+            Dict with deletion results (``deadline_exceeded`` is set when the budget ran out)
         """
         logger.info(f"Starting voice cleanup - target: keep {keep_count} voices")
+        deadline = Deadline.coerce(deadline)
         
-        custom_voices = self.get_custom_voices()
+        custom_voices = self.get_custom_voices(deadline=deadline)
+        
+        if deadline is not None and deadline.expired():
+            return {
+                "success": False,
+                "deleted": 0,
+                "error": "deadline_exceeded",
+                "deadline_exceeded": True
+            }
         
         if not custom_voices:
             logger.warning("No custom voices found!")
@@ -161,9 +221,13 @@ class VoiceManager:
             voice_id = voice.get("voice_id")
             voice_name = voice.get("name", "Unknown")
             
+            if deadline is not None and deadline.expired():
+                logger.warning("Cleanup deadline exceeded; remaining deletions skipped")
+                break
+            
             if voice_id:
                 logger.info(f"Attempting to delete: {voice_name} ({voice_id})")
-                if self.delete_voice(voice_id):
+                if self.delete_voice(voice_id, deadline=deadline):
                     deleted_count += 1
                     deleted_ids.append({"id": voice_id, "name": voice_name})
                     logger.info(f"✅ Deleted old voice: {voice_name} ({voice_id})")
@@ -174,7 +238,7 @@ class VoiceManager:
         logger.info(f"Cleanup requests complete: {deleted_count} requested deletions, {len(failed_ids)} failed")
         
         # After issuing deletes, poll until the quota reflects deletions (eventual consistency)
-        confirmation = self.wait_until_quota_below(keep_count=keep_count, timeout=25, interval=1.5)
+        confirmation = self.wait_until_quota_below(keep_count=keep_count, timeout=25, interval=1.5, deadline=deadline)
         logger.info(
             "Post-cleanup quota check: within_limit=%s final_count=%s attempts=%s",
             confirmation.get("within_limit"), confirmation.get("final_count"), confirmation.get("attempts")
@@ -188,38 +252,67 @@ class VoiceManager:
             "failed_voices": failed_ids,
             "confirmed": confirmation.get("within_limit"),
             "final_count": confirmation.get("final_count"),
+            "deadline_exceeded": bool(deadline is not None and deadline.expired()),
             "message": f"Cleaned up {deleted_count} old voices (confirmed={confirmation.get('within_limit')})"
         }
 
-    def wait_until_quota_below(self, *, keep_count: int, timeout: int = 20, interval: float = 1.5) -> Dict[str, Any]:
+    def wait_until_quota_below(
+        self,
+        *,
+        keep_count: int,
+        timeout: int = 20,
+        interval: float = 1.5,
+        deadline: Deadline | float | None = None,
+    ) -> Dict[str, Any]:
         """Poll ElevenLabs until the number of custom voices is <= keep_count or timeout.
 
-        Returns dict with keys: within_limit, final_count, attempts, success
+        The poll stops at ``timeout`` or the caller's ``deadline``, whichever
+        comes first; each listing call and sleep is clipped to what is left.
+        Only a successful listing counts: one abandoned at the deadline ends
+        the poll unconfirmed rather than reading as zero voices.
+
+        Returns dict with keys: within_limit, final_count, attempts, success,
+        deadline_exceeded and (when not confirmed) reason
         """
-        import time as _time
+        deadline = Deadline.coerce(deadline)
+        budget = Deadline(timeout)
+        if deadline is not None and deadline.remaining() < budget.remaining():
+            budget = deadline
         attempts = 0
-        deadline = _time.time() + timeout
         final_count = None
-        while _time.time() < deadline:
-            attempts += 1
-            try:
-                custom_voices = self.get_custom_voices()
-                final_count = len(custom_voices)
-                if final_count <= keep_count:
-                    return {"success": True, "within_limit": True, "final_count": final_count, "attempts": attempts}
-            except Exception as e:  # noqa: BLE001
-                logger.warning(f"Quota poll failed (attempt {attempts}): {e}")
-            _time.sleep(interval)
-        # Timed out
-        return {"success": False, "within_limit": False, "final_count": final_count, "attempts": attempts}
+        try:
+            while not budget.expired():
+                attempts += 1
+                result = self.get_all_voices(deadline=budget)
+                if result["success"]:
+                    final_count = len([v for v in result["voices"] if v.get("category") != "premade"])
+                    if final_count <= keep_count:
+                        return {"success": True, "within_limit": True, "final_count": final_count, "attempts": attempts}
+                elif result.get("error") == "deadline_exceeded":
+                    break
+                else:
+                    logger.warning(f"Quota poll failed (attempt {attempts}): {result.get('error')}")
+                budget.sleep(interval)
+        except DeadlineExceeded:
+            pass
+        # Only the caller's deadline counts; running out of our own ``timeout`` is a timeout
+        deadline_exceeded = bool(deadline is not None and deadline.expired())
+        return {
+            "success": False,
+            "within_limit": False,
+            "final_count": final_count,
+            "attempts": attempts,
+            "deadline_exceeded": deadline_exceeded,
+            "reason": "deadline_exceeded" if deadline_exceeded else "timeout",
+        }
     
-    def get_quota_info(self) -> Dict[str, Any]:
+    def get_quota_info(self, *, deadline: Deadline | float | None = None) -> Dict[str, Any]:
         """Get current voice quota usage.
         
         Returns:
             Dict with: custom_count, premade_count, total, has_space
         """
-        result = self.get_all_voices()
+        result = self.get_all_voices(deadline=deadline)
         
         if not result["success"]:
             return {
@@ -247,16 +340,18 @@ class VoiceManager:
             "space_remaining": max_voices - len(custom)
         }
     
-    def auto_cleanup_if_needed(self, keep_count: int = 25) -> Dict[str, Any]:
+    def auto_cleanup_if_needed(self, keep_count: int = 25, *, deadline: Deadline | float | None = None) -> Dict[str, Any]:
         """Automatically clean up if quota is full or nearly full.
         
         Args:
             keep_count: Target number of voices to keep
+            deadline: Optional overall budget shared by the quota check and cleanup
             
         Returns:
             Dict with cleanup results
         """
-        quota = self.get_quota_info()
+        deadline = Deadline.coerce(deadline)
+        quota = self.get_quota_info(deadline=deadline)
         
         if not quota["success"]:
             return {
@@ -279,7 +374,7 @@ class VoiceManager:
         # Cleanup needed
         logger.warning(f"Voice quota full ({custom_count}/{quota['max_voices']}), initiating cleanup...")
         
-        cleanup_result = self.cleanup_oldest_voices(keep_count)
+        cleanup_result = self.cleanup_oldest_voices(keep_count, deadline=deadline)
         
         return {
             "success": True,